@@ -0,0 +1,157 @@
+"""
+Adaptive admission control for pipeline runs.
+
+The number of pipelines allowed to run at once (the scheduler's slot pool)
+follows observed stage latency with AIMD:
+
+- every stage that finishes within ADMISSION_TARGET_RATIO of its budget
+  (fallbacks.STAGE_BUDGETS) adds 1/limit, so the limit grows by about one
+  per `limit` healthy stages;
+- a stage that is slower than that, or that fell back to its template
+  because it timed out or Gemini's breaker was open, multiplies the limit
+  by ADMISSION_BACKOFF (at most once per
+  ADMISSION_COOLDOWN_SECONDS, because runs already in flight report the
+  same slowdown). A malformed or failed answer that came back in time is
+  an ordinary latency sample: it says nothing about capacity.
+
+New work is checked against the queue before it joins it. When the queue
+for its priority already holds ADMISSION_QUEUE_FACTOR x limit runs, or the
+estimated wait exceeds the scheduler's queue timeout, the run is shed:
+interactive requests get the template pipeline straight away (marked
+degraded and shed), batch work is refused with a Retry-After. Queues
+therefore stay bounded when Gemini slows down, and `/api/health` reports
+readiness from this state.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from fallbacks import STAGE_BUDGETS
+from scheduler import MAX_CONCURRENT, QUEUE_TIMEOUT, pipeline_scheduler
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_CONTROL", "true").lower() not in ("0", "false", "no")
+# Two, so that batch runs keep a slot even at the floor (the scheduler reserves one for interactive)
+MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "16"))
+TARGET_RATIO = float(os.getenv("ADMISSION_TARGET_RATIO", "0.5"))
+BACKOFF = float(os.getenv("ADMISSION_BACKOFF", "0.7"))
+COOLDOWN = float(os.getenv("ADMISSION_COOLDOWN_SECONDS", "5"))
+QUEUE_FACTOR = float(os.getenv("ADMISSION_QUEUE_FACTOR", "2"))
+
+
+class AdmissionController:
+    """AIMD concurrency limit driven by stage latency, plus queue-based load shedding."""
+
+    def __init__(self, scheduler=pipeline_scheduler, initial: int = MAX_CONCURRENT,
+                 min_limit: int = MIN_LIMIT, max_limit: int = MAX_LIMIT, window: int = 100):
+        self.scheduler = scheduler
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        self._latency = deque(maxlen=window)  # (stage, seconds, over_target)
+        self.decisions = Counter()
+        self.increases = 0
+        self.decreases = 0
+        scheduler.set_limit(int(self.limit))
+
+    # ------------------------------------------------------------------
+    # Limit (AIMD)
+    # ------------------------------------------------------------------
+
+    def observe(self, stage: str, elapsed: float, overloaded: bool = False) -> None:
+        """Feed one finished stage into the limit (`overloaded`: it timed out or hit an open breaker)."""
+        target = STAGE_BUDGETS.get(stage, 30.0) * TARGET_RATIO
+        congested = overloaded or elapsed > target
+        with self._lock:
+            self._latency.append((stage, elapsed, congested))
+            before = int(self.limit)
+            now = time.monotonic()
+            if congested:
+                if now - self._last_decrease < COOLDOWN:
+                    return
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * BACKOFF)
+                self.decreases += 1
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.increases += 1
+            after = int(self.limit)
+        if after != before:
+            print(f"{'📉' if after < before else '📈'} Pipeline concurrency limit {before} -> {after}"
+                  f" ({stage} took {elapsed:.1f}s, target {target:.1f}s)")
+            self.scheduler.set_limit(after)
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def admit(self, priority: str = "interactive") -> str:
+        """"admit", or "shed" when the queue for `priority` is already too long to serve in time."""
+        if not ADMISSION_ENABLED:
+            return "admit"
+        load = self.scheduler.load()
+        limit = load["limit"]
+        # Interactive runs only wait behind interactive ones; batch waits behind both
+        queued = load["queued"]["interactive"]
+        if priority == "batch":
+            queued += load["queued"]["batch"]
+        runtime = self.scheduler.stats()["priorities"][priority]["avg_runtime_seconds"]
+        estimated_wait = (queued // max(limit, 1)) * runtime if load["running"] >= limit else 0.0
+        shed = queued >= max(1, limit * QUEUE_FACTOR) or estimated_wait > QUEUE_TIMEOUT
+        decision = "shed" if shed else "admit"
+        with self._lock:
+            self.decisions[f"{priority}:{decision}"] += 1
+        if shed:
+            print(f"🚦 Shedding {priority} run ({queued} queued, limit {limit}, ~{estimated_wait:.0f}s wait)")
+        return decision
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying."""
+        load = self.scheduler.load()
+        runtime = self.scheduler.stats()["priorities"]["batch"]["avg_runtime_seconds"]
+        backlog = sum(load["queued"].values())
+        return max(1, round(runtime * (backlog // max(load["limit"], 1) + 1)))
+
+    # ------------------------------------------------------------------
+    # Readiness
+    # ------------------------------------------------------------------
+
+    def health(self) -> dict:
+        """Readiness: "ready", "degraded" (limit cut or queue building) or "overloaded" (shedding new work)."""
+        load = self.scheduler.load()
+        with self._lock:
+            recent = list(self._latency)
+            limit = self.limit
+            stats = {
+                "limit": int(limit),
+                "limit_exact": round(limit, 2),
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "decisions": dict(self.decisions),
+            }
+        queued = sum(load["queued"].values())
+        congested = sum(1 for _, _, over in recent if over)
+        if ADMISSION_ENABLED and load["queued"]["interactive"] >= max(1, int(limit) * QUEUE_FACTOR):
+            status = "overloaded"
+        elif int(limit) < MAX_CONCURRENT or queued > 0 or (recent and congested / len(recent) > 0.5):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "in_flight": load["running"],
+            "queued": load["queued"],
+            "recent_stages": len(recent),
+            "recent_congested": congested,
+            "recent_avg_seconds": round(sum(s for _, s, _ in recent) / len(recent), 2) if recent else 0.0,
+            **stats,
+        }
+
+
+admission_controller = AdmissionController()
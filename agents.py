@@ -1,17 +1,23 @@
 import os
-import requests
+import json
+import time
 from dotenv import load_dotenv
 from langchain_core.tools import tool
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.agents import create_tool_calling_agent, AgentExecutor
-from typing import TypedDict, List
+from typing import TypedDict, List, Optional
 from langchain_core.messages import HumanMessage
 # FIX: Import GitHubAPIWrapper from the correct module
 from langchain_community.utilities.github import GitHubAPIWrapper
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.types import interrupt
 from pydantic import BaseModel, Field
 from enum import Enum
+from deployments import deployment_stage, deployment_tracker, hook_configured
+from fallbacks import PIPELINE_BUDGET
+from github_batch import GitHubClient
+from prompts import OUTPUT_TOKEN_BUDGETS, prompt_registry, with_output_budget
+from tool_executor import ToolExecutor
+from web_research import research_digest, tavily_search
 
 load_dotenv()
 
@@ -30,8 +36,12 @@ llm = ChatGoogleGenerativeAI(
     convert_system_message_to_human=True
 )
 
-# Web search tool using Tavily
-web_search_tool = TavilySearchResults()
+# Web search tool using Tavily (shares the disk cache with web_research)
+@tool("web_search")
+def web_search_tool(query: str) -> str:
+    """Searches the web and returns the top results as title, URL and snippet."""
+    results = tavily_search(query)
+    return "\n".join(f"{r['title']} — {r['url']}\n{r['content'][:500]}" for r in results) or "No results."
 
 # GitHub tools (using a simplified API wrapper for demonstration)
 # Instantiate only if env vars are present to avoid import-time failures
@@ -83,25 +93,65 @@ def github_commit_file(repo: str, file_path: str, content: str, message: str) ->
         { "action": "commit_file", "repo": repo, "file_path": file_path, "content": content, "message": message }
     )
 
+class FileSpec(BaseModel):
+    path: str = Field(description="File path relative to the repository root")
+    content: str = Field(description="Full file content")
+
+@tool
+def github_commit_files(repo: str, files: List[FileSpec], message: str, branch: str,
+                        pr_title: Optional[str] = None) -> str:
+    """Commits a whole set of files to a new branch of a GitHub repository as one commit and opens a pull request.
+    Prefer this over github_commit_file when adding more than one file."""
+    if not github_token:
+        return "GitHub not configured. Set GITHUB_TOKEN in your environment/.env."
+    files = [f.model_dump() if isinstance(f, BaseModel) else f for f in files]
+    result = GitHubClient(github_token).commit_files(
+        repo, files, message, branch=branch, pull_request={"title": pr_title or message}
+    )
+    return (
+        f"Committed {result['files']} files to {result['branch']} ({result['commit_sha'][:7]}); "
+        f"pull request: {result.get('pull_request_url')}"
+    )
+
 # Vercel Deployment Hook tool
 @tool
 def vercel_deploy_hook() -> str:
-    """Triggers a deployment on Vercel using a pre-configured Deploy Hook."""
-    deploy_hook_url = os.getenv("VERCEL_DEPLOY_HOOK_URL")
-    if not deploy_hook_url:
+    """Triggers a deployment on Vercel using a pre-configured Deploy Hook and returns a tracking id."""
+    if not hook_configured():
         return "Error: VERCEL_DEPLOY_HOOK_URL is not set."
-    response = requests.post(deploy_hook_url)
-    if response.status_code == 201 or response.status_code == 200:
-        return "Deployment triggered successfully on Vercel."
-    else:
-        return f"Error triggering deployment: {response.text}"
+    deployment_id = deployment_tracker.trigger("hackathon-project")
+    return f"Deployment queued (id {deployment_id}); status at /api/deployments/{deployment_id}."
 
 # =====================================================================
 # === Helper to create a worker agent ===
 # =====================================================================
 
-def create_worker_agent(role: str, tools: list, instruction: str = ""):
-    """Creates a simple agent that directly uses the LLM without complex tool calling."""
+def create_worker_agent(role: str, tools: list, instruction: str = "", context=None, max_output_tokens: int = 0):
+    """Creates an agent that runs the LLM with its tools (see tool_executor.ToolExecutor).
+
+    `context(topic) -> str` can add grounding text (e.g. a web research digest) to the prompt; the
+    topic is the state's `search_topic` when set, else the user input.
+    `max_output_tokens` caps each model response (0 = model default).
+    """
+    executor = ToolExecutor(with_output_budget(llm, max_output_tokens), tools)
+    # Role and instruction never change, so they form the cached static prefix
+    prompt_name = f"worker:{role}"
+    prompt_registry.register(
+        prompt_name,
+        f"""You are a helpful AI assistant specialized in {role}.
+        You have access to a set of tools to perform your tasks.
+        Prefer deterministic, concise outputs. If some information is missing, assume reasonable defaults or ask one concise question, then proceed.
+
+        Output policy: Unless explicitly told otherwise, RETURN ONLY JSON with no extra prose.
+        Follow the exact JSON shape requested by the user/task.
+        {instruction.strip()}""",
+        """{extra}
+        User input: {user_input}
+
+        Please provide your response as JSON only.""",
+        max_output_tokens=max_output_tokens,
+    )
+
     def agent_func(state):
         # Get the last user message
         messages = state.get("messages", [])
@@ -121,21 +171,18 @@ def create_worker_agent(role: str, tools: list, instruction: str = ""):
         if not user_input:
             user_input = "AI recipe generator web app"  # fallback
         
-        # Create the prompt based on role
-        system_prompt = f"""You are a helpful AI assistant specialized in {role}. 
-        You have access to a set of tools to perform your tasks. 
-        Prefer deterministic, concise outputs. If some information is missing, assume reasonable defaults or ask one concise question, then proceed.
-
-        Output policy: Unless explicitly told otherwise, RETURN ONLY JSON with no extra prose. 
-        Follow the exact JSON shape requested by the user/task. 
-        {instruction}
+        extra = ""
+        if context is not None:
+            try:
+                extra = context(state.get("search_topic") or user_input)
+            except Exception as e:
+                print(f"⚠️ Context for {role} failed: {e}")
+            if extra:
+                extra = f"Use these sources where relevant:\n{extra}\n"
 
-        User input: {user_input}
-        
-        Please provide your response as JSON only."""
-        
         try:
-            response = llm.invoke([HumanMessage(content=system_prompt)])
+            response = executor.invoke(prompt_registry.messages(prompt_name, extra=extra, user_input=user_input))
+            prompt_registry.record_usage(prompt_name, response)
             content = response.content.strip()
             
             # Clean up JSON if wrapped in markdown
@@ -157,46 +204,60 @@ ideation_agent = create_worker_agent(
     "ideation and brainstorming",
     tools=[web_search_tool],
     instruction=(
-        "\nExpected JSON shape: [{{\"title\", \"pitch\", \"tech\", \"novelty\"}}] for one idea."
+        "\nExpected JSON: an array of 3-6 ideas, each {\"title\", \"pitch\", \"tech\", \"novelty\"}."
     ),
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["ideation"],
 )
 
 research_planning_agent = create_worker_agent(
     "market research and project planning",
     tools=[web_search_tool],
     instruction=(
-        "\nExpected JSON: {{\"papers\": [ {\"title\", \"url\", \"summary\"} x5 ], "
-        "\"apis\": [ {\"name\", \"url\", \"summary\"} x3 ], "
-        "\"libraries\": [ {\"name\", \"url\", \"summary\"} x3 ]}}"
+        "\nExpected JSON: {\"market_analysis\": {\"target_audience\", \"market_size\", \"competition\", \"opportunities\"}, "
+        "\"technical_requirements\": {\"scalability\", \"security\", \"performance\", \"integrations\"}, "
+        "\"project_timeline\": {\"phase1\", \"phase2\", \"phase3\"}} with a string for every field."
     ),
+    context=research_digest,
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["research"],
 )
 
 coding_agent = create_worker_agent(
     "writing and managing code",
-    tools=[web_search_tool, github_create_branch, github_create_pull_request, github_commit_file],
+    tools=[web_search_tool, github_commit_files, github_create_branch, github_create_pull_request, github_commit_file],
     instruction=(
-        "\nExpected JSON: {{\"files\": [ {\"path\", \"content\"} ], \"readme\": string, \"requirements\": [string] }}."
+        "\nExpected JSON: {\"files\": [ {\"path\", \"content\"} ], \"readme\": string, \"requirements\": [string] }."
     ),
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["coding"],
 )
 
-deployment_agent = create_worker_agent(
-    "deploying web applications",
-    tools=[vercel_deploy_hook],
-    instruction=(
-        "\nExpected JSON: {{\"deploy_triggered\": boolean, \"url\": string | null, \"notes\": string }}."
-    ),
-)
+def deployment_agent(state):
+    """Deployment stage without an LLM: reports (or triggers and tracks) the real deployment."""
+    messages = state.get("messages", [])
+    project = next(
+        (m.get("content", "") for m in messages if isinstance(m, dict) and m.get("role") == "user"),
+        "hackathon-project",
+    )
+    return {"messages": [{"role": "assistant", "content": json.dumps(deployment_stage(project))}]}
 
 presentation_agent = create_worker_agent(
     "generating presentation content",
     tools=[web_search_tool],
     instruction=(
-        "\nExpected JSON: {{\"slides_outline\": [string], \"pitch\": string, \"demo_script\": string, \"resources\": [string], \"slides_link\": string | null }}."
+        "\nExpected JSON: {\"slides_outline\": [string], \"pitch\": string, \"demo_script\": string, \"resources\": [string], \"slides_link\": string | null }."
     ),
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["presentation"],
 )
 
+# Tool-using workers by pipeline stage; PIPELINE_AGENTS=tools runs the engine's stages on these (pipeline.py)
+WORKER_AGENTS = {
+    "ideation": ideation_agent,
+    "research": research_planning_agent,
+    "coding": coding_agent,
+    "presentation": presentation_agent,
+}
+
 # =====================================================================
-# === Supervisor Agent logic remains the same ===
+# === Supervisor Agent (LLM routing, see routing.py) ===
 # =====================================================================
 class AgentName(str, Enum):
     SUPERVISOR = "supervisor"
@@ -252,13 +313,42 @@ Always respond in **structured JSON** matching this schema:
     ]
 )
 
-# The supervisor uses the same LLM
-supervisor_chain = (
-    supervisor_prompt
-    | llm.with_structured_output(SupervisorOutput)
-)
+# The supervisor uses the same LLM. Routing is normally decided by the transition
+# table in routing.py, so the structured-output chain is only built on first use.
+_supervisor_chain = None
 
-# Simple human-in-the-loop node placeholder used by the graph
+def get_supervisor_chain():
+    global _supervisor_chain
+    if _supervisor_chain is None:
+        _supervisor_chain = supervisor_prompt | llm.with_structured_output(SupervisorOutput)
+    return _supervisor_chain
+
+# Human-in-the-loop approval after research
 def human_in_the_loop_node(state):
-    # In a real app, you would pause for human approval. Here we auto-route to coding.
-    return {"next_agent": AgentName.CODING.value}
+    """
+    Suspend the run until a human approves the research.
+
+    interrupt() checkpoints the run and ends the current invocation, so a
+    paused run holds no thread or memory; it is resumed later with
+    Command(resume={"approved": bool, "feedback": str}) (see jobs.py).
+    """
+    if not state.get("require_approval"):
+        return {"next_agent": AgentName.CODING.value}
+
+    decision = interrupt({
+        "stage": AgentName.RESEARCH_PLANNING.value,
+        "question": "Approve the research and continue to coding?",
+        "research": state.get("research"),
+    })
+    if not isinstance(decision, dict):
+        decision = {"approved": bool(decision)}
+
+    feedback = (decision.get("feedback") or "").strip() or None
+    update = {"human_feedback": feedback, "last_agent": AgentName.HUMAN_IN_THE_LOOP.value}
+    if decision.get("approved"):
+        # Time spent waiting for the reviewer isn't pipeline latency: the resumed stages get a new budget
+        update.update(status="approved", next_agent=AgentName.CODING.value,
+                      pipeline_expires_at=time.time() + PIPELINE_BUDGET)
+    else:
+        update.update(status="rejected", next_agent=AgentName.FINISH.value)
+    return update
@@ -0,0 +1,158 @@
+"""
+Compact API responses.
+
+- Field selection over pipeline results (`?fields=ideas,presentation`), with
+  generated files reduced to a manifest that clients page through separately.
+- orjson-backed JSON serialization for Flask.
+- Negotiated zstd/gzip compression of larger responses.
+"""
+
+import gzip
+import os
+
+import orjson
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from artifacts import file_content
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip only
+    zstandard = None
+
+# Order matches the positional `generated_content` array the frontend reads
+RESULT_FIELDS = ("ideas", "research", "code", "deployment", "presentation")
+
+MIN_COMPRESS_BYTES = int(os.getenv("RESPONSE_MIN_COMPRESS_BYTES", "1024"))
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+
+
+# =====================================================================
+# === Field selection & lazy files ===
+# =====================================================================
+
+def parse_fields(raw: str):
+    """Parse `?fields=` into a tuple of known result fields, or None for the full payload."""
+    if not raw:
+        return None
+    requested = [f.strip() for f in raw.split(",") if f.strip()]
+    return tuple(f for f in RESULT_FIELDS if f in requested)
+
+
+def _file_size(f: dict) -> int:
+    # Session files are blob manifests that already carry their size
+    return f["size"] if "size" in f else len(f.get("content", ""))
+
+
+def file_manifest(code: dict) -> list:
+    """Paths and sizes of generated files, without their content."""
+    return [
+        {"path": f.get("path", ""), "size": _file_size(f)}
+        for f in code.get("files", [])
+    ]
+
+
+def select_fields(result: dict, fields: tuple, files_url: str) -> dict:
+    """Pick the requested sections of a pipeline result; code files become a manifest."""
+    content = {}
+    for field in fields:
+        value = result.get(field)
+        if field == "code" and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k != "files"}
+            value["files"] = file_manifest(result["code"])
+            value["files_url"] = files_url
+        content[field] = value
+    return content
+
+
+def paginate_files(code: dict, args) -> dict:
+    """One page of generated files; `?paths=a,b` filters, `?content=false` returns only metadata."""
+    files = code.get("files", [])
+    paths = args.get("paths")
+    if paths:
+        wanted = set(p.strip() for p in paths.split(","))
+        files = [f for f in files if f.get("path") in wanted]
+
+    offset = max(0, args.get("offset", 0, type=int))
+    limit = min(MAX_PAGE_SIZE, max(1, args.get("limit", DEFAULT_PAGE_SIZE, type=int)))
+    include_content = args.get("content", "true").lower() not in ("0", "false", "no")
+
+    page = []
+    for f in files[offset:offset + limit]:
+        entry = {"path": f.get("path", ""), "size": _file_size(f)}
+        if include_content:
+            entry["content"] = file_content(f)
+        page.append(entry)
+
+    next_offset = offset + limit if offset + limit < len(files) else None
+    return {"files": page, "total": len(files), "offset": offset, "limit": limit, "next_offset": next_offset}
+
+
+# =====================================================================
+# === Serialization & compression ===
+# =====================================================================
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _choose_encoding(request):
+    accepted = request.accept_encodings
+    if _zstd_compressor is not None and accepted["zstd"]:
+        return "zstd"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response, request):
+    """Compress a buffered response body with the client's preferred encoding."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype != "application/json"  # static assets carry their own variants
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding(request)
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+
+    if encoding == "zstd":
+        compressed = _zstd_compressor.compress(body)
+    else:
+        compressed = gzip.compress(body, compresslevel=6)
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_app(app):
+    """Install orjson serialization and response compression on a Flask app."""
+    app.json = OrjsonProvider(app)
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, request)
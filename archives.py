@@ -0,0 +1,224 @@
+"""
+Streaming zip / tar.gz export of a session's generated project.
+
+Archives are written incrementally. Each file is read from the blob store in
+chunks and compressed straight into the response, so memory stays constant
+whatever the project size. Output is deterministic (fixed timestamps, manifest
+order), which gives every archive a stable ETag: the hash of the format, the
+project name and the blob keys. The first full download is copied to
+ARCHIVE_CACHE_DIR as it streams. Later requests, and any Range request, are
+served from that file with `send_file(conditional=True)`, which handles
+If-None-Match, If-Range and byte ranges at disk speed.
+"""
+
+import gzip
+import os
+import re
+import tarfile
+import threading
+import zipfile
+
+import xxhash
+
+from artifacts import ARTIFACT_DIR, blob_store
+
+ARCHIVE_CACHE_DIR = os.getenv("ARCHIVE_CACHE_DIR", os.path.join(ARTIFACT_DIR, "archives"))
+CHUNK_SIZE = 64 * 1024
+
+# format -> (mimetype, file extension)
+ARCHIVE_FORMATS = {
+    "zip": ("application/zip", ".zip"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+}
+
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def project_slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (name or "").lower()).strip("-")[:60] or "hackathon-project"
+
+
+def archive_entries(code: dict) -> list:
+    """(path, source) pairs: manifest blobs, plus README.md and requirements.txt when not already generated.
+
+    `source` is ("blob", key, size) or ("bytes", data).
+    """
+    entries = []
+    paths = set()
+    for f in code.get("files", []):
+        path = f.get("path", "").lstrip("/")
+        if not path or ".." in path.split("/") or path in paths:
+            continue
+        paths.add(path)
+        if "blob" in f:
+            entries.append((path, ("blob", f["blob"], f["size"])))
+        else:
+            entries.append((path, ("bytes", f.get("content", "").encode("utf-8"))))
+    if code.get("readme") and "README.md" not in paths:
+        entries.append(("README.md", ("bytes", code["readme"].encode("utf-8"))))
+    requirements = code.get("requirements")
+    if requirements and "requirements.txt" not in paths:
+        text = "\n".join(requirements) + "\n" if isinstance(requirements, list) else str(requirements)
+        entries.append(("requirements.txt", ("bytes", text.encode("utf-8"))))
+    return entries
+
+
+def archive_etag(entries: list, fmt: str, name: str) -> str:
+    digest = xxhash.xxh3_128()
+    digest.update(f"{fmt}\0{name}\0".encode("utf-8"))
+    for path, source in entries:
+        digest.update(path.encode("utf-8") + b"\0")
+        digest.update(source[1].encode("ascii") if source[0] == "blob" else xxhash.xxh3_128_digest(source[1]))
+    return digest.hexdigest()
+
+
+def _source_chunks(source):
+    if source[0] == "blob":
+        yield from blob_store.iter_chunks(source[1], CHUNK_SIZE)
+    else:
+        data = source[1]
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield data[offset:offset + CHUNK_SIZE]
+
+
+def _source_size(source) -> int:
+    return source[2] if source[0] == "blob" else len(source[1])
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object; the archive generator drains what was written."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ChunkReader:
+    """Read-only file object over a chunk iterator (tarfile.addfile pulls from it)."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _zip_chunks(entries, root):
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+        for path, source in entries:
+            info = zipfile.ZipInfo(f"{root}/{path}", date_time=_ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with archive.open(info, "w") as member:
+                for chunk in _source_chunks(source):
+                    member.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _tar_gz_chunks(entries, root):
+    sink = _ChunkSink()
+    # gzip with mtime=0 and a plain streaming tar inside: byte-identical output for the same files
+    with gzip.GzipFile(filename="", fileobj=sink, mode="wb", compresslevel=6, mtime=0) as compressed:
+        with tarfile.open(fileobj=compressed, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+            for path, source in entries:
+                info = tarfile.TarInfo(f"{root}/{path}")
+                info.size = _source_size(source)
+                info.mode = 0o644
+                info.mtime = 0
+                archive.addfile(info, _ChunkReader(_source_chunks(source)))
+                yield sink.drain()
+    yield sink.drain()
+
+
+def stream_archive(entries: list, fmt: str, root: str):
+    """Yield the archive bytes incrementally (empty chunks skipped)."""
+    chunks = _zip_chunks(entries, root) if fmt == "zip" else _tar_gz_chunks(entries, root)
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+
+
+# =====================================================================
+# === Disk cache ===
+# =====================================================================
+
+_building = set()
+_building_lock = threading.Lock()
+
+
+def cache_path(etag: str, fmt: str) -> str:
+    return os.path.join(ARCHIVE_CACHE_DIR, f"{etag}{ARCHIVE_FORMATS[fmt][1]}")
+
+
+def _claim(path: str) -> bool:
+    """Only one writer per archive; others just stream without caching."""
+    with _building_lock:
+        if path in _building:
+            return False
+        _building.add(path)
+        return True
+
+
+def _release(path: str) -> None:
+    with _building_lock:
+        _building.discard(path)
+
+
+def stream_and_cache(chunks, path: str, exclusive: bool = True):
+    """Pass chunks through while writing them to `path`; the file appears only when the stream completes."""
+    if exclusive and not _claim(path):
+        yield from chunks
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    complete = False
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp, path)
+        complete = True
+    finally:
+        if not complete and os.path.exists(tmp):
+            os.remove(tmp)  # client went away mid-download
+        if exclusive:
+            _release(path)
+
+
+def build_cached(entries: list, fmt: str, root: str, path: str) -> str:
+    """Write the archive to the cache (streaming, constant memory) unless it is there; returns the path."""
+    if not os.path.exists(path):
+        # Not exclusive: a concurrent streaming download may be caching the same bytes; the last rename wins
+        for _ in stream_and_cache(stream_archive(entries, fmt, root), path, exclusive=False):
+            pass
+    return path
@@ -0,0 +1,238 @@
+"""
+Content-addressed stores.
+
+- Stage artifacts: graph state only carries small `ArtifactRef`s; the
+  payloads live here, keyed by the xxhash of their content, so checkpoints
+  don't re-serialize agent output on every step and identical outputs are
+  stored once.
+- Generated files (`BlobStore`): every file the coding stage produces is a
+  zstd-compressed blob on disk, keyed by the xxhash of its content. Sessions
+  keep only a manifest of {path, blob, size}. Boilerplate shared between
+  sessions (package.json, App.tsx, server/app.js...) is stored once, and
+  exports stream blobs straight from disk.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import xxhash
+import zstandard
+
+from state import ArtifactRef
+
+ARTIFACT_DIR = os.getenv(
+    "ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".artifacts"),
+)
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(ARTIFACT_DIR, "blobs"))
+BLOB_ZSTD_LEVEL = int(os.getenv("BLOB_ZSTD_LEVEL", "9"))
+# Payloads kept in memory (most recently used first); the rest are read back from disk
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class ArtifactStore:
+    """Artifacts on disk (when a directory is set) behind an in-memory LRU of at most `max_bytes`.
+
+    Without a directory the memory copy is the only one, so nothing is evicted.
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _remember(self, key: str, content: str, size: int) -> None:
+        """Cache a payload as most recently used and evict the least recent ones over the limit (lock held)."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = content
+        self._bytes += size
+        while self.root and self._bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= len(evicted.encode("utf-8"))
+
+    def put(self, stage: str, content: str, content_type: str = "application/json") -> ArtifactRef:
+        data = content.encode("utf-8")
+        key = xxhash.xxh3_128_hexdigest(data)
+        with self._lock:
+            if key not in self._memory and self.root:
+                path = self._path(key)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp, path)
+            self._remember(key, content, len(data))
+        return ArtifactRef(stage=stage, key=key, size=len(data), content_type=content_type)
+
+    def get(self, ref: ArtifactRef):
+        """Return the artifact content, or None if it is unknown."""
+        if ref is None:
+            return None
+        with self._lock:
+            content = self._memory.get(ref.key)
+            if content is not None:
+                self._memory.move_to_end(ref.key)
+                return content
+        if not self.root:
+            return None
+        try:
+            with open(self._path(ref.key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        content = data.decode("utf-8")
+        with self._lock:
+            self._remember(ref.key, content, len(data))
+        return content
+
+
+artifact_store = ArtifactStore(ARTIFACT_DIR)
+
+
+def load_artifact(ref: ArtifactRef):
+    """Resolve a ref to its payload (parsed JSON when possible)."""
+    content = artifact_store.get(ref)
+    if content is None or ref.content_type != "application/json":
+        return content
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content
+
+
+# =====================================================================
+# === Generated file blobs ===
+# =====================================================================
+
+class BlobStore:
+    """Write-once, zstd-compressed blobs on disk, keyed by the xxhash of their uncompressed content."""
+
+    def __init__(self, root: str = BLOB_DIR, level: int = BLOB_ZSTD_LEVEL):
+        self.root = root
+        self.level = level
+        self._known = set()
+        self._lock = threading.Lock()
+        self._scanned = False
+        self.blobs = 0
+        self.disk_bytes = 0
+        self.puts = 0
+        self.dedup_hits = 0
+        self.logical_bytes = 0
+        self.written_bytes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.zst")
+
+    def _scan(self) -> None:
+        """Count the blobs already on disk, once; after that put() keeps the counters (lock held)."""
+        if self._scanned:
+            return
+        self._scanned = True
+        if not os.path.isdir(self.root):
+            return
+        for entry in os.scandir(self.root):
+            if entry.is_dir():
+                for blob in os.scandir(entry.path):
+                    if blob.name.endswith(".zst"):
+                        self._known.add(blob.name[:-4])
+                        self.blobs += 1
+                        self.disk_bytes += blob.stat().st_size
+
+    def put(self, data: bytes) -> str:
+        """Store `data` unless an identical blob exists; returns its key."""
+        key = xxhash.xxh3_128_hexdigest(data)
+        path = self._path(key)
+        with self._lock:
+            self._scan()
+            self.puts += 1
+            self.logical_bytes += len(data)
+            if key in self._known or os.path.exists(path):
+                self._known.add(key)
+                self.dedup_hits += 1
+                return key
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp, path)
+        with self._lock:
+            if key not in self._known:  # not raced by another thread writing the same blob
+                self._known.add(key)
+                self.blobs += 1
+                self.disk_bytes += len(compressed)
+            self.written_bytes += len(compressed)
+        return key
+
+    def open(self, key: str):
+        """Decompressing reader over a blob (close it when done); FileNotFoundError if unknown."""
+        return zstandard.ZstdDecompressor().stream_reader(open(self._path(key), "rb"), closefd=True)
+
+    def read(self, key: str) -> bytes:
+        with self.open(key) as reader:
+            return reader.read()
+
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024):
+        """Yield a blob's content in chunks, without holding it all in memory."""
+        with self.open(key) as reader:
+            while True:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._scan()
+            return {
+                "blobs": self.blobs,
+                "disk_bytes": self.disk_bytes,
+                "files_stored": self.puts,
+                "dedup_hits": self.dedup_hits,
+                "logical_bytes": self.logical_bytes,
+                "written_bytes": self.written_bytes,
+                "dedup_ratio": round(self.dedup_hits / self.puts, 3) if self.puts else 0.0,
+            }
+
+
+blob_store = BlobStore()
+
+
+def store_files(files: list) -> list:
+    """Put generated files ([{path, content}]) into the blob store; returns the manifest [{path, blob, size}]."""
+    manifest = []
+    for f in files:
+        if not isinstance(f, dict):
+            continue
+        data = str(f.get("content") or "").encode("utf-8")
+        manifest.append({"path": f.get("path", ""), "blob": blob_store.put(data), "size": len(data)})
+    return manifest
+
+
+def file_content(entry: dict) -> str:
+    """Content of a generated file, whether inline or a manifest entry."""
+    if "blob" in entry:
+        return blob_store.read(entry["blob"]).decode("utf-8")
+    return entry.get("content", "")
+
+
+def load_files(files: list) -> list:
+    """Manifest entries back to [{path, content}] (inline entries pass through)."""
+    return [{"path": f.get("path", ""), "content": file_content(f)} for f in files]
+
+
+def store_code(code: dict) -> dict:
+    """The coding stage result with its files replaced by a blob manifest (what sessions keep)."""
+    if not isinstance(code, dict):
+        return code
+    return {**code, "files": store_files(code.get("files", []))}
@@ -7,15 +7,30 @@ Provides REST endpoints for the hackathon workflow.
 import os
 import json
 import uuid
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-from simple_agents import run_hackathon_pipeline
+from pipeline import run_pipeline
+from semantic_cache import semantic_cache
+from scheduler import pipeline_scheduler, client_id, request_priority, QueueFull, QueueTimeout
+from admission import admission_controller
+from idempotency import idempotent, idempotency_store
+from static_assets import StaticAssetIndex
+import api_responses
+from api_responses import parse_fields, select_fields, paginate_files, RESULT_FIELDS
 
 load_dotenv()
 
-app = Flask(__name__, static_folder='frontend/out', static_url_path='')
+# CASSETTE_MODE=record|replay|once records/replays LLM and HTTP calls (cassettes.py)
+from cassettes import install_from_env
+install_from_env("backend")
+
+# Static files are served by static_assets (precompressed, indexed at startup), not Flask's static route
+app = Flask(__name__, static_folder=None)
 CORS(app)  # Enable CORS for frontend communication
+api_responses.init_app(app)  # orjson + negotiated zstd/gzip compression
+
+static_assets = StaticAssetIndex(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'out'))
 
 # Store sessions in memory (in production, use Redis or database)
 sessions = {}
@@ -23,26 +38,17 @@ sessions = {}
 @app.route('/')
 def serve_frontend():
     """Serve the Next.js frontend."""
-    try:
-        return send_from_directory('frontend/out', 'index.html')
-    except FileNotFoundError:
-        return "Frontend not built. Please run 'npm run build' in the frontend directory.", 404
+    return static_assets.serve('', request)
 
 @app.route('/<path:path>')
 def serve_static(path):
-    """Serve static files from the frontend build."""
-    try:
-        return send_from_directory('frontend/out', path)
-    except FileNotFoundError:
-        # Try to serve index.html for SPA routing
-        if not path.startswith('api/'):
-            try:
-                return send_from_directory('frontend/out', 'index.html')
-            except FileNotFoundError:
-                return "Frontend not found. Please build the frontend first.", 404
+    """Serve static files from the frontend build (SPA routes fall back to index.html)."""
+    if path.startswith('api/'):
         return "File not found", 404
+    return static_assets.serve(path, request)
 
 @app.route('/api/start-hackathon', methods=['POST'])
+@idempotent
 def start_hackathon():
     """Start a new hackathon project."""
     try:
@@ -55,125 +61,74 @@ def start_hackathon():
         # Create a new session
         session_id = str(uuid.uuid4())
         
-        # Run the hackathon pipeline
-        print(f"🚀 Starting hackathon for: {user_input}")
-        result = run_hackathon_pipeline(user_input)
+        # Run the hackathon pipeline once the scheduler grants a slot
+        # (interactive; a client may lower its own runs with {"priority": "batch"} or X-Priority: batch).
+        # When admission control sheds the run, interactive callers get the templates
+        # immediately and batch callers are told to retry later.
+        priority = request_priority(request, data)
+        if admission_controller.admit(priority) == 'shed':
+            if priority == 'batch':
+                return overloaded()
+            result = run_pipeline(user_input, shed=True)
+            queue_info = {'priority': priority, 'waited_seconds': 0.0, 'shed': True}
+        else:
+            try:
+                with pipeline_scheduler.slot(client_id(request), priority) as ticket:
+                    print(f"🚀 Starting hackathon for: {user_input}")
+                    result = run_pipeline(user_input)
+            except (QueueFull, QueueTimeout) as e:
+                return queue_error(e)
+            queue_info = {'priority': priority, 'waited_seconds': round(ticket.waited, 2), 'shed': False}
         
-        # Store the session
+        # Store the session; generated files go to the blob store and the session keeps their manifest
+        from artifacts import store_code
         sessions[session_id] = {
             'idea': user_input,
-            'result': result,
+            'result': {**result, 'code': store_code(result['code'])},
             'status': 'completed'
         }
         
-        # Extract the generated content from simple_agents.py result
-        generated_content = []
-        
-        # Add ideas (index 0)
-        if result.get('ideas'):
-            generated_content.append(result['ideas'])
-        
-        # Add research (index 1) 
-        if result.get('research'):
-            generated_content.append(result['research'])
-        
-        # Add code (index 2)
-        if result.get('code'):
-            generated_content.append(result['code'])
+        # Every stage is filled (degraded stages come from fallbacks.py templates),
+        # so the frontend can rely on the positional layout
+        generated_content = [
+            result['ideas'],         # index 0
+            result['research'],      # index 1
+            result['code'],          # index 2
+            result['deployment'],    # index 3
+            result['presentation'],  # index 4
+        ]
+        degraded = result.get('degraded', [])
+        if degraded:
+            print(f"⚠️ Degraded stages served from templates: {', '.join(degraded)}")
         
-        # Add deployment (index 3)
-        if result.get('deployment'):
-            generated_content.append(result['deployment'])
-        else:
-            generated_content.append({
-                "deployment_url": "https://hackathon-demo.example.com",
-                "deployment_status": "pending"
+        # ?fields=ideas,presentation returns only those sections; file contents are
+        # then fetched lazily from /api/session/<id>/files
+        fields = parse_fields(request.args.get('fields'))
+        if fields is not None:
+            return jsonify({
+                'session_id': session_id,
+                'status': 'completed',
+                'idea': user_input,
+                'degraded': degraded,
+                'content': select_fields(result, fields, f'/api/session/{session_id}/files'),
             })
         
-        # Add presentation (index 4)
-        if result.get('presentation'):
-            generated_content.append(result['presentation'])
-        
-        # If no content was extracted, create mock data for demo
-        if not generated_content:
-            print("⚠️ No content extracted, using mock data for demo")
-            generated_content = [
-                # Ideation output
-                [
-                    {
-                        "title": f"{user_input} - Smart Solution",
-                        "pitch": f"A revolutionary {user_input.lower()} that leverages AI to solve real-world problems.",
-                        "tech": "React, Node.js, Python, PostgreSQL, Docker",
-                        "novelty": "First-of-its-kind integration of machine learning with intuitive user interface"
-                    },
-                    {
-                        "title": f"{user_input} - Enterprise Edition", 
-                        "pitch": f"An enterprise-grade {user_input.lower()} solution designed for scalability.",
-                        "tech": "Next.js, TypeScript, AWS, Kubernetes, Redis",
-                        "novelty": "Advanced microservices architecture with real-time analytics"
-                    }
-                ],
-                # Research output
-                {
-                    "market_analysis": {
-                        "target_audience": "Tech-savvy professionals aged 25-45",
-                        "market_size": "$2.5B",
-                        "competition": "3 major competitors identified",
-                        "opportunities": "Growing demand for AI-powered solutions"
-                    },
-                    "technical_requirements": {
-                        "scalability": "Support for 10,000+ concurrent users",
-                        "security": "End-to-end encryption, GDPR compliance", 
-                        "performance": "Sub-200ms response times",
-                        "integrations": "REST APIs, webhooks, third-party services"
-                    },
-                    "project_timeline": {
-                        "phase1": "MVP development (2 weeks)",
-                        "phase2": "Feature enhancement (1 week)",
-                        "phase3": "Testing and deployment (1 week)"
-                    }
-                },
-                # Coding output
-                {
-                    "files": [
-                        {
-                            "path": "src/App.tsx",
-                            "content": f"import React from 'react';\n\nfunction App() {{\n  return (\n    <div className=\"App\">\n      <header className=\"App-header\">\n        <h1>{user_input}</h1>\n      </header>\n    </div>\n  );\n}}\n\nexport default App;"
-                        },
-                        {
-                            "path": "src/components/Dashboard.tsx", 
-                            "content": f"import React from 'react';\n\nconst Dashboard = () => {{\n  return (\n    <div className=\"dashboard\">\n      <h2>{user_input} Dashboard</h2>\n    </div>\n  );\n}};\n\nexport default Dashboard;"
-                        }
-                    ]
-                },
-                # Deployment output
-                {
-                    "deployment_url": "https://hackathon-demo.example.com",
-                    "status": "deployed"
-                },
-                # Presentation output
-                {
-                    "slides_outline": [
-                        {"title": "Problem Statement", "content": f"The challenge with {user_input.lower()}"},
-                        {"title": "Our Solution", "content": f"How we solve {user_input.lower()} with AI"},
-                        {"title": "Demo", "content": "Live demonstration of the solution"},
-                        {"title": "Impact", "content": "Real-world impact and benefits"},
-                        {"title": "Next Steps", "content": "Future roadmap and scaling plans"}
-                    ]
-                }
-            ]
-        
         return jsonify({
             'session_id': session_id,
             'status': 'completed',
             'idea': user_input,
             'generated_content': generated_content,
+            'degraded': degraded,
+            'timings': result.get('timings', {}),
+            'validation': result.get('validation', {}),
+            'queue': queue_info,
             'summary': {
                 'ideation': 'Project ideas generated',
                 'research': 'Research and planning completed', 
                 'coding': 'Codebase generated',
                 'deployment': 'Deployment configured',
-                'presentation': 'Presentation materials created'
+                'presentation': 'Presentation materials created',
+                'validation': 'Generated files checked',
             }
         })
         
@@ -181,6 +136,50 @@ def start_hackathon():
         print(f"Error in start_hackathon: {e}")
         return jsonify({'error': str(e)}), 500
 
+def queue_error(e):
+    """429 (per-client queue full) or 503 (waited too long for a slot), with Retry-After."""
+    if isinstance(e, QueueFull):
+        response = jsonify({'error': str(e), 'retry_after': round(e.retry_after)})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, round(e.retry_after)))
+    else:
+        response = jsonify({'error': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+    return response
+
+def breaker_open(e):
+    """503 while a dependency's circuit breaker is open."""
+    response = jsonify({'error': str(e), 'dependency': e.name})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, round(e.retry_after)))
+    return response
+
+def overloaded():
+    """503 for work shed by admission control."""
+    response = jsonify({'error': 'Server overloaded, retry later', 'admission': admission_controller.health()})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(admission_controller.retry_after())
+    return response
+
+@app.route('/api/queue', methods=['GET'])
+def queue_status():
+    """The caller's queued/running pipeline runs (position, estimated wait) and scheduler totals."""
+    client = client_id(request)
+    return jsonify({
+        'client': client,
+        'runs': pipeline_scheduler.client_tickets(client),
+        'scheduler': pipeline_scheduler.stats(),
+    })
+
+@app.route('/api/queue/<ticket_id>', methods=['GET'])
+def queue_ticket(ticket_id):
+    """Position and estimated wait of one queued run."""
+    info = pipeline_scheduler.position(ticket_id)
+    if info is None:
+        return jsonify({'error': 'Ticket not found'}), 404
+    return jsonify(info)
+
 @app.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id):
     """Get session details."""
@@ -188,9 +187,114 @@ def get_session(session_id):
         return jsonify({'error': 'Session not found'}), 404
     
     session = sessions[session_id]
-    return jsonify(session)
+    fields = parse_fields(request.args.get('fields')) or RESULT_FIELDS
+    result = session['result']
+    return jsonify({
+        'idea': session['idea'],
+        'status': session['status'],
+        'degraded': result.get('degraded', []),
+        'selected_idea': result.get('selected_idea'),
+        'validation': result.get('validation', {}),
+        'result': select_fields(result, fields, f'/api/session/{session_id}/files'),
+    })
+
+@app.route('/api/session/<session_id>/files', methods=['GET'])
+def get_session_files(session_id):
+    """Page through a session's generated files (?offset=&limit=&paths=&content=)."""
+    if session_id not in sessions:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    code = sessions[session_id]['result'].get('code') or {}
+    return jsonify(paginate_files(code, request.args))
+
+@app.route('/api/session/<session_id>/archive', methods=['GET'])
+def get_session_archive(session_id):
+    """Download the generated project as ?format=zip (default) or tar.gz, streamed; supports ETag and Range."""
+    from flask import send_file, stream_with_context
+    from archives import ARCHIVE_FORMATS, archive_entries, archive_etag, build_cached, cache_path, project_slug, stream_and_cache, stream_archive
+
+    fmt = request.args.get('format', 'zip')
+    if fmt not in ARCHIVE_FORMATS:
+        return jsonify({'error': f"Unknown format '{fmt}' (use {' or '.join(ARCHIVE_FORMATS)})"}), 400
+    if session_id not in sessions:
+        return jsonify({'error': 'Session not found'}), 404
+
+    session = sessions[session_id]
+    result = session['result']
+    name = project_slug((result.get('selected_idea') or {}).get('title') or session['idea'])
+    entries = archive_entries(result.get('code') or {})
+    etag = archive_etag(entries, fmt, name)
+    path = cache_path(etag, fmt)
+    mimetype, ext = ARCHIVE_FORMATS[fmt]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    # Cached (or a Range request, which needs the finished file): let send_file do ranges/conditionals
+    if os.path.exists(path) or request.range is not None:
+        build_cached(entries, fmt, name, path)
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=f'{name}{ext}',
+                         conditional=True, etag=etag, max_age=0)
+
+    # First download: stream as it is built (chunked, no Content-Length) and cache on the way
+    response = Response(stream_with_context(stream_and_cache(stream_archive(entries, fmt, name), path)),
+                        mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}{ext}"'
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+# Jobs run on the LangGraph app and pause for approval after research.
+# jobs (and the graph) are imported on first use so each server process opens
+# its own checkpoint connection after forking.
+@app.route('/api/jobs', methods=['POST'])
+@idempotent
+def create_job():
+    """Start a background pipeline job."""
+    from jobs import start_job
+    
+    data = request.get_json() or {}
+    idea = data.get('idea', '').strip()
+    if not idea:
+        return jsonify({'error': 'Project idea is required'}), 400
+    
+    priority = request_priority(request, data, default='batch')
+    if admission_controller.admit(priority) == 'shed':
+        return overloaded()
+    try:
+        job_id = start_job(idea, require_approval=data.get('require_approval', True),
+                           client=client_id(request), priority=priority)
+    except QueueFull as e:
+        return queue_error(e)
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Job status; includes the research to review while awaiting approval."""
+    from jobs import get_job
+    
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/approve', methods=['POST'])
+def approve_job_route(job_id):
+    """Approve (or reject with {"approved": false}) a job paused after research."""
+    from jobs import approve_job
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        if not approve_job(job_id, approved=data.get('approved', True), feedback=data.get('feedback', '')):
+            return jsonify({'error': 'Job not found or not awaiting approval'}), 409
+    except QueueFull as e:
+        return queue_error(e)
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
 
 @app.route('/api/create-github-repo', methods=['POST'])
+@idempotent
 def create_github_repo():
     """Create a real GitHub repository."""
     try:
@@ -203,15 +307,19 @@ def create_github_repo():
         if not repo_name:
             return jsonify({'error': 'Repository name is required'}), 400
         
+        # {"session_id": ...} instead of "files" commits that session's generated files from the blob store
+        session = sessions.get(data.get('session_id') or '')
+        if not files and session:
+            from artifacts import load_files
+            files = load_files((session['result'].get('code') or {}).get('files', []))
+        
         # Get GitHub token from environment
         github_token = os.getenv('GITHUB_TOKEN')
         if not github_token:
             return jsonify({'error': 'GitHub token not configured. Please set GITHUB_TOKEN environment variable.'}), 500
         
-        import requests
-        
-        # GitHub API endpoint
-        github_api_url = 'https://api.github.com/user/repos'
+        from github_batch import GitHubClient, GitHubError
+        from circuit_breakers import CircuitOpen
         
         # Repository data
         repo_data = {
@@ -221,46 +329,35 @@ def create_github_repo():
             'auto_init': True
         }
         
-        # Headers with authentication
-        headers = {
-            'Authorization': f'token {github_token}',
-            'Accept': 'application/vnd.github.v3+json',
-            'Content-Type': 'application/json'
-        }
-        
-        # Create repository
+        # Create repository (through the GitHub circuit breaker: fails fast while GitHub is down)
         print(f"🚀 Creating GitHub repository: {repo_name}")
-        response = requests.post(github_api_url, json=repo_data, headers=headers)
+        client = GitHubClient(github_token)
+        try:
+            repo_info = client.request('POST', '/user/repos', json=repo_data)
+        except CircuitOpen as e:
+            return breaker_open(e)
+        except GitHubError as e:
+            print(f"❌ Failed to create repository: {e.message}")
+            return jsonify({'error': f'Failed to create repository: {e.message}'}), e.status
         
-        if response.status_code == 201:
-            repo_info = response.json()
+        if repo_info:
             repo_url = repo_info['html_url']
             clone_url = repo_info['clone_url']
             
             print(f"✅ Repository created successfully: {repo_url}")
             
-            # If files are provided, we can create them using the GitHub Contents API
+            # All files go into a single commit on the default branch (Git Data API)
+            commit = None
             if files:
                 print(f"📁 Adding {len(files)} files to repository...")
-                for file_info in files:
-                    file_path = file_info.get('path', '')
-                    file_content = file_info.get('content', '')
-                    
-                    if file_path and file_content:
-                        # Create file using GitHub Contents API
-                        file_url = f"https://api.github.com/repos/{repo_info['full_name']}/contents/{file_path}"
-                        
-                        import base64
-                        file_data = {
-                            'message': f'Add {file_path}',
-                            'content': base64.b64encode(file_content.encode('utf-8')).decode('utf-8')
-                        }
-                        
-                        file_response = requests.put(file_url, json=file_data, headers=headers)
-                        if file_response.status_code in [200, 201]:
-                            print(f"✅ Added file: {file_path}")
-                        else:
-                            print(f"⚠️ Failed to add file {file_path}: {file_response.text}")
+                try:
+                    commit = client.commit_files(
+                        repo_info['full_name'], files, 'Add generated project files',
+                        base=repo_info.get('default_branch'),
+                    )
+                    print(f"✅ Committed {commit['files']} files in {client.calls} API calls")
+                except (GitHubError, CircuitOpen, ValueError) as e:
+                    print(f"⚠️ Failed to add files: {e}")
             
             return jsonify({
                 'success': True,
@@ -268,65 +365,123 @@ def create_github_repo():
                 'clone_url': clone_url,
                 'name': repo_name,
                 'full_name': repo_info['full_name'],
+                'commit_sha': commit['commit_sha'] if commit else None,
+                'files_committed': commit['files'] if commit else 0,
                 'message': f'Repository created successfully at {repo_url}'
             })
         else:
-            error_msg = response.json().get('message', 'Unknown error')
-            print(f"❌ Failed to create repository: {error_msg}")
-            return jsonify({'error': f'Failed to create repository: {error_msg}'}), response.status_code
+            print("❌ Failed to create repository: empty response")
+            return jsonify({'error': 'Failed to create repository: empty response from GitHub'}), 502
             
     except Exception as e:
         print(f"Error in create_github_repo: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/deploy-to-vercel', methods=['POST'])
+@idempotent
 def deploy_to_vercel():
-    """Deploy project to Vercel using deploy hook."""
-    try:
-        data = request.get_json()
-        project_name = data.get('name', 'hackathon-project')
-        
-        # Get Vercel deploy hook URL from environment
-        vercel_deploy_hook = os.getenv('VERCEL_DEPLOY_HOOK_URL')
-        if not vercel_deploy_hook:
-            return jsonify({'error': 'Vercel deploy hook not configured. Please set VERCEL_DEPLOY_HOOK_URL environment variable.'}), 500
-        
-        import requests
-        
-        # Trigger Vercel deployment
-        print(f"🚀 Triggering Vercel deployment for: {project_name}")
-        response = requests.post(vercel_deploy_hook)
-        
-        if response.status_code in [200, 201]:
-            # Parse the response to get deployment URL
-            try:
-                deployment_data = response.json()
-                deployment_url = deployment_data.get('url', f'https://{project_name}.vercel.app')
-            except:
-                # If response is not JSON, construct URL from project name
-                deployment_url = f'https://{project_name.lower().replace(" ", "-")}.vercel.app'
-            
-            print(f"✅ Vercel deployment triggered successfully: {deployment_url}")
-            
-            return jsonify({
-                'success': True,
-                'deployment_url': deployment_url,
-                'status': 'deployed',
-                'message': f'Project deployed successfully to {deployment_url}'
-            })
-        else:
-            error_msg = response.text
-            print(f"❌ Failed to trigger Vercel deployment: {error_msg}")
-            return jsonify({'error': f'Failed to trigger deployment: {error_msg}'}), response.status_code
-            
-    except Exception as e:
-        print(f"Error in deploy_to_vercel: {e}")
-        return jsonify({'error': str(e)}), 500
+    """Trigger a Vercel deployment; the build is tracked in the background."""
+    from deployments import deployment_tracker, hook_configured
+    from circuit_breakers import CircuitOpen, vercel_breaker
+
+    data = request.get_json(silent=True) or {}
+    project_name = data.get('name', 'hackathon-project')
+    if not hook_configured():
+        return jsonify({'error': 'Vercel deploy hook not configured. Please set VERCEL_DEPLOY_HOOK_URL environment variable.'}), 500
+    if vercel_breaker.state == 'open':
+        return breaker_open(CircuitOpen('vercel', vercel_breaker.retry_after()))
+
+    print(f"🚀 Triggering Vercel deployment for: {project_name}")
+    deployment_id = deployment_tracker.trigger(project_name)
+    return jsonify({
+        'success': True,
+        'deployment_id': deployment_id,
+        'deployment_url': None,
+        'status': 'pending',
+        'status_url': f'/api/deployments/{deployment_id}',
+        'events_url': f'/api/deployments/{deployment_id}/events',
+        'message': 'Deployment triggered; the URL is available once the build is ready',
+    }), 202
+
+@app.route('/api/deployments/<deployment_id>', methods=['GET'])
+def get_deployment(deployment_id):
+    """Latest known state of a deployment (status, URL once ready, events)."""
+    from deployments import deployment_tracker
+
+    deployment = deployment_tracker.get(deployment_id)
+    if deployment is None:
+        return jsonify({'error': 'Deployment not found'}), 404
+    return jsonify(deployment)
+
+@app.route('/api/deployments/<deployment_id>/events', methods=['GET'])
+def stream_deployment(deployment_id):
+    """Server-sent events with the deployment state on every change, until it is final."""
+    from deployments import FINAL_STATES, deployment_tracker
+
+    deployment = deployment_tracker.get(deployment_id)
+    if deployment is None:
+        return jsonify({'error': 'Deployment not found'}), 404
+
+    def events():
+        current = deployment
+        yield f"data: {json.dumps(current)}\n\n"
+        while current['status'] not in FINAL_STATES:
+            latest = deployment_tracker.wait_for_change(deployment_id, current['version'], timeout=15)
+            if latest is None:
+                return
+            if latest['version'] == current['version']:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(latest)}\n\n"
+            current = latest
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'message': 'HackathonAgent API is running'})
+    """Readiness: 200 while new pipelines are admitted ("ready" or "degraded"), 503 while shedding."""
+    from circuit_breakers import breaker_stats
+
+    health = admission_controller.health()
+    breakers = breaker_stats()
+    status = health['status']
+    # Pipelines still answer (from templates) while a dependency is down, but not at full quality
+    if status == 'ready' and any(b['state'] != 'closed' for b in breakers.values()):
+        status = 'degraded'
+    return jsonify({
+        'status': status,
+        'message': 'HackathonAgent API is running',
+        'admission': health,
+        'breakers': {name: b['state'] for name, b in breakers.items()},
+    }), 503 if status == 'overloaded' else 200
+
+@app.route('/api/breakers', methods=['GET'])
+def breakers():
+    """Circuit breaker state and counters per external dependency (gemini, tavily, github, vercel)."""
+    from circuit_breakers import breaker_stats
+    return jsonify(breaker_stats())
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Semantic cache hit rates and hit-quality metrics, plus the web search disk cache."""
+    from web_research import search_cache
+    from artifacts import blob_store
+    return jsonify({**semantic_cache.stats(), "web_search": search_cache.stats(), "blobs": blob_store.stats(),
+                    "idempotency": idempotency_store.stats()})
+
+@app.route('/api/prompts/stats', methods=['GET'])
+def prompt_stats():
+    """Per-template token counts: static (cacheable) prefix, variable suffix and provider-reported usage."""
+    from prompts import prompt_registry
+    return jsonify(prompt_registry.stats())
+
+@app.route('/api/agents/stats', methods=['GET'])
+def agent_stats():
+    """LangGraph agent metrics: supervisor routing decisions and tool-call latency."""
+    from routing import routing_metrics
+    from tool_executor import tool_metrics
+    return jsonify({"routing": routing_metrics.snapshot(), "recent_routes": routing_metrics.recent_decisions(),
+                    "tools": tool_metrics.snapshot()})
 
 if __name__ == '__main__':
     print("🚀 Starting HackathonAgent Backend API...")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark LangGraph orchestration overhead per pipeline run.
+
+Worker agents are replaced by instant fake agents, so the numbers are pure
+graph cost: node transitions, checkpoint writes and state handling. Compares
+the supervisor (hub-and-spoke) topology against the linear pipeline graph.
+
+    python3 bench_graph.py --runs 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# The agents module builds its clients at import time; no calls are made here
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents import AgentName
+from graph import _make_worker_node, build_supervisor_workflow, build_linear_workflow
+from state import get_initial_state
+
+
+class CountingSaver(MemorySaver):
+    """MemorySaver that counts checkpoint writes."""
+
+    def __init__(self):
+        super().__init__()
+        self.checkpoint_count = 0
+        self.write_count = 0
+
+    def put(self, *args, **kwargs):
+        self.checkpoint_count += 1
+        return super().put(*args, **kwargs)
+
+    def put_writes(self, *args, **kwargs):
+        self.write_count += 1
+        return super().put_writes(*args, **kwargs)
+
+
+def fake_agent(state):
+    return {"messages": [{"role": "assistant", "content": '{"ok": true}'}]}
+
+
+FAKE_WORKERS = {
+    stage: _make_worker_node(stage, fake_agent)
+    for stage in (
+        AgentName.IDEATION.value,
+        AgentName.RESEARCH_PLANNING.value,
+        AgentName.CODING.value,
+        AgentName.DEPLOYMENT.value,
+        AgentName.PRESENTATION.value,
+    )
+}
+
+
+def bench(name: str, builder, runs: int) -> dict:
+    saver = CountingSaver()
+    graph = builder(FAKE_WORKERS).compile(checkpointer=saver)
+
+    durations = []
+    transitions = 0
+    for _ in range(runs):
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": 100}
+        started = time.perf_counter()
+        for _step in graph.stream(get_initial_state("AI recipe generator web app"), config=config):
+            transitions += 1
+        durations.append(time.perf_counter() - started)
+
+    durations.sort()
+    return {
+        "name": name,
+        "mean_ms": statistics.mean(durations) * 1000,
+        "p95_ms": durations[max(0, int(len(durations) * 0.95) - 1)] * 1000,
+        "transitions": transitions / runs,
+        "checkpoints": saver.checkpoint_count / runs,
+        "writes": saver.write_count / runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph overhead per run (fake LLM)")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    # Silence the per-node debug prints while timing
+    devnull = open(os.devnull, "w")
+    stdout = sys.stdout
+    sys.stdout = devnull
+    try:
+        results = [
+            bench("supervisor", build_supervisor_workflow, args.runs),
+            bench("linear", build_linear_workflow, args.runs),
+        ]
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    print(f"🧪 Graph overhead over {args.runs} runs (fake agents)")
+    print("=" * 72)
+    print(f"{'topology':<12}{'mean ms':>10}{'p95 ms':>10}{'steps/run':>12}{'checkpoints':>13}{'writes':>10}")
+    for r in results:
+        print(f"{r['name']:<12}{r['mean_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['transitions']:>12.1f}"
+              f"{r['checkpoints']:>13.1f}{r['writes']:>10.1f}")
+    base, linear = results
+    print("-" * 72)
+    print(f"linear is {base['mean_ms'] / linear['mean_ms']:.1f}x faster per run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pipeline executors on the same work.
+
+Stage agents are replaced by fakes that sleep for a typical LLM latency
+(scaled by --scale) and return a valid payload. Ideation, research and
+coding form a chain; after coding, presentation overlaps validation and
+deployment. threaded and asyncio can therefore get down to the critical
+path, which is printed next to the serial total that sync takes. langgraph
+runs in supersteps, and each step waits for its slowest node. Here that means
+deployment waits for presentation, so it gains little.
+
+    python3 bench_pipeline.py --runs 5 --scale 0.1
+"""
+
+import argparse
+import dataclasses
+import os
+import statistics
+import sys
+import time
+
+# simple_agents builds its client at import time; no calls are made here
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+import fallbacks
+from pipeline import EXECUTORS, STAGES, run_pipeline
+
+# Typical seconds per stage with gemini-1.5-flash
+STAGE_LATENCY = {"ideation": 4.0, "research": 6.0, "coding": 12.0, "deployment": 3.0, "presentation": 5.0,
+                 "validation": 0.5}
+
+
+def fake_stages(scale: float):
+    def make_agent(stage):
+        payload = fallbacks.FALLBACKS[stage.name]("AI recipe generator web app")
+
+        def agent(text):
+            time.sleep(STAGE_LATENCY[stage.name] * scale)
+            return {"success": True, stage.result_key: payload}
+        return agent
+
+    return tuple(dataclasses.replace(stage, agent=make_agent(stage)) for stage in STAGES)
+
+
+def critical_path(stages, scale: float) -> float:
+    """Seconds of the longest dependency chain: the best any parallel executor can do."""
+    finish = {}
+    for stage in stages:  # declaration order is topological
+        finish[stage.name] = max((finish[dep] for dep in stage.deps), default=0.0) + STAGE_LATENCY[stage.name] * scale
+    return max(finish.values())
+
+
+def bench(name: str, stages, runs: int) -> dict:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = run_pipeline("AI recipe generator web app", executor=name, stages=stages)
+        durations.append(time.perf_counter() - started)
+        assert not result["degraded"], result["degraded"]
+    return {"name": name, "mean_s": statistics.mean(durations), "min_s": min(durations)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline executors compared (fake LLM latency)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier on STAGE_LATENCY")
+    args = parser.parse_args()
+
+    stages = fake_stages(args.scale)
+    serial = sum(STAGE_LATENCY.values()) * args.scale
+    critical = critical_path(stages, args.scale)
+
+    # Silence the per-stage prints while timing
+    devnull = open(os.devnull, "w")
+    stdout = sys.stdout
+    sys.stdout = devnull
+    try:
+        results = [bench(name, stages, args.runs) for name in EXECUTORS]
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    print(f"🧪 Pipeline executors over {args.runs} runs (fake stages, {serial:.2f}s of work each)")
+    print(f"📐 Critical path {critical:.2f}s: threaded/asyncio can be up to {serial / critical:.2f}x faster than sync")
+    print("=" * 52)
+    print(f"{'executor':<12}{'mean s':>10}{'min s':>10}{'vs sync':>10}")
+    base = results[0]["mean_s"]
+    for r in results:
+        print(f"{r['name']:<12}{r['mean_s']:>10.3f}{r['min_s']:>10.3f}{base / r['mean_s']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
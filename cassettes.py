@@ -0,0 +1,312 @@
+"""
+Record/replay cassettes for LLM and HTTP calls.
+
+While a cassette is active, chat model calls (`invoke`, `ainvoke`, `stream`
+on every LangChain chat model) and `requests` calls (everything goes
+through `requests.Session.request`) are looked up by a fingerprint of the
+request. The fingerprint is an xxhash of the model and messages, or of the
+method, URL and body. A hit returns the recorded response without touching
+the network. Cassettes are stored as one zstd-compressed JSON document, so
+a whole pipeline run fits in a few KB and replays in milliseconds. Set
+`latency=1.0` (CASSETTE_LATENCY) to sleep for the originally recorded
+duration when profiling.
+
+Modes: "record" always calls through and stores, "replay" never touches
+the network (a miss raises CassetteMiss), and "once" replays hits and
+records misses.
+
+    CASSETTE_MODE=record python3 test_integration.py   # live, writes the cassette
+    CASSETTE_MODE=replay python3 test_integration.py   # offline, milliseconds
+"""
+
+import asyncio
+import base64
+import os
+import threading
+import time
+
+import orjson
+import requests
+import xxhash
+import zstandard
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+CASSETTE_DIR = os.getenv(
+    "CASSETTE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes"),
+)
+MODES = ("record", "replay", "once")
+
+# Never part of a fingerprint (and never written to a cassette)
+SECRET_KEYS = {"api_key", "key", "token", "access_token", "authorization", "google_api_key"}
+
+
+class CassetteMiss(LookupError):
+    """Replay mode found no recording for a request."""
+
+
+def _scrub(value):
+    if isinstance(value, dict):
+        return {k: _scrub(v) for k, v in value.items() if str(k).lower() not in SECRET_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_scrub(v) for v in value]
+    return value
+
+
+def fingerprint(kind: str, payload) -> str:
+    data = orjson.dumps(_scrub(payload), option=orjson.OPT_SORT_KEYS, default=str)
+    return f"{kind}:{xxhash.xxh3_128_hexdigest(data)}"
+
+
+def _llm_request(model, messages, kwargs) -> dict:
+    if isinstance(messages, str):
+        messages = [{"type": "human", "data": {"content": messages}}]
+    else:
+        messages = [
+            message_to_dict(m) if hasattr(m, "type") else {"type": "raw", "data": m}
+            for m in (messages.to_messages() if hasattr(messages, "to_messages") else messages)
+        ]
+    for m in messages:
+        # ids and metadata differ between runs; only the conversation matters
+        data = m.get("data", {})
+        if isinstance(data, dict):
+            for volatile in ("id", "response_metadata", "usage_metadata", "additional_kwargs"):
+                data.pop(volatile, None)
+    params = {k: v for k, v in model._identifying_params.items() if isinstance(v, (str, int, float, bool, type(None)))}
+    options = {k: v for k, v in kwargs.items() if k not in ("config", "run_manager")}
+    return {"model": params, "messages": messages, "options": options}
+
+
+def _http_request(method, url, kwargs) -> dict:
+    body = kwargs.get("json")
+    if body is None and kwargs.get("data") is not None:
+        data = kwargs["data"]
+        body = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+    params = kwargs.get("params")
+    return {"method": method.upper(), "url": url, "params": params, "body": body}
+
+
+class Cassette:
+    """A set of recorded interactions, keyed by request fingerprint."""
+
+    def __init__(self, path: str, mode: str = "once", latency: float = 0.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r} (expected one of {MODES})")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.interactions: dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self._cursor: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._patches = []
+        self._dirty = False
+        if mode != "record" and os.path.exists(path):
+            self.load()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        with open(self.path, "rb") as f:
+            self.interactions = orjson.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            data = orjson.dumps(self.interactions, option=orjson.OPT_SORT_KEYS)
+            self._dirty = False
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(zstandard.ZstdCompressor(level=19).compress(data))
+        os.replace(tmp, self.path)
+
+    # ------------------------------------------------------------------
+    # Lookup / record
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key: str):
+        """Next recording for `key` (repeated identical requests replay in order), or None."""
+        if self.mode == "record":
+            return None
+        with self._lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                self.misses += 1
+                if self.mode == "replay":
+                    raise CassetteMiss(f"No recording for {key} in {self.path}")
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            self.hits += 1
+            return recorded[min(index, len(recorded) - 1)]
+
+    def _record(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self.interactions.setdefault(key, []).append(entry)
+            self._dirty = True
+
+    def _wait(self, entry: dict) -> None:
+        if self.latency > 0:
+            time.sleep(entry.get("elapsed", 0.0) * self.latency)
+
+    async def _await(self, entry: dict) -> None:
+        if self.latency > 0:
+            await asyncio.sleep(entry.get("elapsed", 0.0) * self.latency)
+
+    # ------------------------------------------------------------------
+    # Patched call sites
+    # ------------------------------------------------------------------
+
+    def _patch(self, owner, name, replacement) -> None:
+        original = getattr(owner, name)
+        self._patches.append((owner, name, original))
+        setattr(owner, name, replacement(original))
+
+    def _wrap_invoke(self, original):
+        cassette = self
+
+        def invoke(model, input, config=None, **kwargs):
+            key = fingerprint("llm", _llm_request(model, input, kwargs))
+            entry = cassette._lookup(key)
+            if entry is not None:
+                cassette._wait(entry)
+                return messages_from_dict([entry["message"]])[0]
+            started = time.perf_counter()
+            result = original(model, input, config, **kwargs)
+            cassette._record(key, {"message": message_to_dict(result), "elapsed": time.perf_counter() - started})
+            return result
+
+        return invoke
+
+    def _wrap_ainvoke(self, original):
+        cassette = self
+
+        async def ainvoke(model, input, config=None, **kwargs):
+            key = fingerprint("llm", _llm_request(model, input, kwargs))
+            entry = cassette._lookup(key)
+            if entry is not None:
+                await cassette._await(entry)
+                return messages_from_dict([entry["message"]])[0]
+            started = time.perf_counter()
+            result = await original(model, input, config, **kwargs)
+            cassette._record(key, {"message": message_to_dict(result), "elapsed": time.perf_counter() - started})
+            return result
+
+        return ainvoke
+
+    def _wrap_stream(self, original):
+        cassette = self
+
+        def stream(model, input, config=None, **kwargs):
+            key = fingerprint("llm-stream", _llm_request(model, input, kwargs))
+            entry = cassette._lookup(key)
+            if entry is not None:
+                chunks = messages_from_dict(entry["chunks"])
+                delay = entry.get("elapsed", 0.0) * cassette.latency / max(len(chunks), 1)
+                for chunk in chunks:
+                    if delay:
+                        time.sleep(delay)
+                    yield chunk
+                return
+            # Only the chunks the caller consumed are recorded; an early stop replays identically
+            chunks = []
+            started = time.perf_counter()
+            try:
+                for chunk in original(model, input, config, **kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+            finally:
+                cassette._record(key, {
+                    "chunks": [message_to_dict(c) for c in chunks],
+                    "elapsed": time.perf_counter() - started,
+                })
+
+        return stream
+
+    def _wrap_request(self, original):
+        cassette = self
+
+        def request(session, method, url, **kwargs):
+            key = fingerprint("http", _http_request(method, url, kwargs))
+            entry = cassette._lookup(key)
+            if entry is not None:
+                cassette._wait(entry)
+                response = requests.Response()
+                response.status_code = entry["status"]
+                response.headers.update(entry["headers"])
+                response._content = base64.b64decode(entry["body"])
+                response.url = url
+                response.encoding = entry.get("encoding")
+                response.reason = entry.get("reason", "")
+                return response
+            started = time.perf_counter()
+            response = original(session, method, url, **kwargs)
+            cassette._record(key, {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {k: v for k, v in response.headers.items()
+                            if k.lower() in ("content-type", "etag", "location", "link")},
+                "encoding": response.encoding,
+                "body": base64.b64encode(response.content).decode("ascii"),
+                "elapsed": time.perf_counter() - started,
+            })
+            return response
+
+        return request
+
+    def __enter__(self):
+        self._patch(BaseChatModel, "invoke", self._wrap_invoke)
+        self._patch(BaseChatModel, "ainvoke", self._wrap_ainvoke)
+        self._patch(BaseChatModel, "stream", self._wrap_stream)
+        self._patch(requests.Session, "request", self._wrap_request)
+        return self
+
+    def __exit__(self, *exc):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+        self.save()
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "mode": self.mode,
+                "interactions": sum(len(v) for v in self.interactions.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def use_cassette(name: str, mode: str = None, latency: float = None) -> Cassette:
+    """Cassette for `name` in CASSETTE_DIR (use as a context manager)."""
+    path = name if name.endswith(".cassette") else os.path.join(CASSETTE_DIR, f"{name}.cassette")
+    return Cassette(
+        path,
+        mode or os.getenv("CASSETTE_MODE", "once"),
+        float(os.getenv("CASSETTE_LATENCY", "0")) if latency is None else latency,
+    )
+
+
+_active = None
+
+
+def install_from_env(name: str = "default"):
+    """Activate a process-wide cassette when CASSETTE_MODE is set; saved at exit."""
+    global _active
+    mode = os.getenv("CASSETTE_MODE")
+    if not mode or _active is not None:
+        return _active
+    import atexit
+
+    _active = use_cassette(os.getenv("CASSETTE_NAME", name), mode).__enter__()
+    atexit.register(_active.__exit__, None, None, None)
+    print(f"📼 Cassette {_active.path} active in {mode} mode")
+    return _active
@@ -0,0 +1,228 @@
+"""
+Circuit breakers for external dependencies (Gemini, Tavily, GitHub, Vercel).
+
+Each dependency has one breaker shared by every caller in the process:
+
+- closed:    calls go through. Failures (exceptions the breaker counts, and
+             calls slower than `slow_call_seconds`) are tracked over the
+             last `window` calls.
+- open:      entered after `failure_threshold` consecutive failures, or
+             when at least half of a full window failed. Calls fail
+             immediately with CircuitOpen, so no thread waits out a timeout
+             against a dependency that is down.
+- half-open: after `reset_seconds`, up to `half_open_calls` probe calls go
+             through. A success closes the breaker; a failure reopens it and
+             doubles the wait (capped at `max_reset_seconds`).
+
+Thresholds come from BREAKER_<NAME>_* env vars (e.g. BREAKER_GEMINI_FAILURES,
+BREAKER_VERCEL_RESET_SECONDS). `breaker_stats()` is served at /api/breakers
+and in /api/health.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+
+
+class CircuitOpen(RuntimeError):
+    """A call was refused because the dependency's breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def _env(name: str, key: str, default):
+    return type(default)(os.getenv(f"BREAKER_{name.upper()}_{key}", default))
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around calls to one dependency."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, window: int = 20, reset_seconds: float = 30.0,
+                 max_reset_seconds: float = 300.0, half_open_calls: int = 1, slow_call_seconds: float = None,
+                 is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self.half_open_calls = half_open_calls
+        self.slow_call_seconds = slow_call_seconds
+        # Exceptions that don't mean the dependency is unhealthy (e.g. a 404) pass through uncounted
+        self.is_failure = is_failure or (lambda exc: True)
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._consecutive = 0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._open_for = reset_seconds
+        self._probes = 0
+        self.calls = 0
+        self.rejected = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self._open_for:
+            self._state = "half_open"
+            self._probes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._current_state() != "open":
+                return 0.0
+            return max(0.0, self._open_for - (time.monotonic() - self._opened_at))
+
+    # ------------------------------------------------------------------
+    # Transitions
+    # ------------------------------------------------------------------
+
+    def _open(self, reason: str) -> None:
+        if self._state == "half_open":
+            self._open_for = min(self._open_for * 2, self.max_reset_seconds)
+        else:
+            self._open_for = self.reset_seconds
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        print(f"🔌 {self.name} circuit open for {self._open_for:g}s ({reason})")
+
+    def allow(self) -> None:
+        """Raise CircuitOpen unless a call may go through now (half-open admits a few probes)."""
+        with self._lock:
+            state = self._current_state()
+            if state == "open" or (state == "half_open" and self._probes >= self.half_open_calls):
+                self.rejected += 1
+                remaining = self._open_for - (time.monotonic() - self._opened_at)
+                raise CircuitOpen(self.name, max(remaining, 1.0))
+            if state == "half_open":
+                self._probes += 1
+            self.calls += 1
+
+    def release(self) -> None:
+        """A call let through by allow() ended without an outcome: give its half-open probe slot back."""
+        with self._lock:
+            if self._current_state() == "half_open" and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self, elapsed: float = 0.0) -> None:
+        if self.slow_call_seconds and elapsed > self.slow_call_seconds:
+            with self._lock:
+                self.slow_calls += 1
+            self.record_failure(f"slow call {elapsed:.1f}s")
+            return
+        with self._lock:
+            self._outcomes.append(True)
+            self._consecutive = 0
+            if self._state == "half_open":
+                self._state = "closed"
+                self._open_for = self.reset_seconds
+                self._outcomes.clear()
+                print(f"🔌 {self.name} circuit closed (probe succeeded)")
+
+    def record_failure(self, reason: str = "error") -> None:
+        with self._lock:
+            self.failures += 1
+            self._outcomes.append(False)
+            self._consecutive += 1
+            state = self._current_state()
+            if state == "half_open":
+                self._open(f"probe failed: {reason}")
+            elif state == "closed":
+                failed = self._outcomes.count(False)
+                full = len(self._outcomes) == self._outcomes.maxlen
+                if self._consecutive >= self.failure_threshold:
+                    self._open(f"{self._consecutive} consecutive failures, last: {reason}")
+                elif full and failed * 2 >= len(self._outcomes):
+                    self._open(f"{failed}/{len(self._outcomes)} recent calls failed")
+
+    # ------------------------------------------------------------------
+    # Call sites
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def guard(self):
+        """Run the block as one call: refused while open, outcome and latency recorded."""
+        self.allow()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure(f"{type(e).__name__}: {str(e)[:120]}")
+            else:
+                self.record_success(time.monotonic() - started)
+            raise
+        except BaseException:
+            # GeneratorExit (a streamed response closed early), KeyboardInterrupt...:
+            # says nothing about the dependency, but must not keep a probe slot
+            self.release()
+            raise
+        self.record_success(time.monotonic() - started)
+
+    def call(self, func, *args, **kwargs):
+        with self.guard():
+            return func(*args, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "retry_after_seconds": round(max(0.0, self._open_for - (time.monotonic() - self._opened_at)), 1)
+                if state == "open" else 0.0,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.opened,
+                "recent_failure_rate": round(self._outcomes.count(False) / len(self._outcomes), 2)
+                if self._outcomes else 0.0,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds,
+            }
+
+
+def _http_failure(exc) -> bool:
+    """Network errors and 5xx/429 count against a dependency; other 4xx are the caller's problem."""
+    status = getattr(exc, "status", None)
+    if status is None and isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+    return status is None or status >= 500 or status == 429
+
+
+def _breaker(name: str, failures: int, reset: float, slow: float, is_failure=None) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=_env(name, "FAILURES", failures),
+        window=_env(name, "WINDOW", 20),
+        reset_seconds=_env(name, "RESET_SECONDS", reset),
+        max_reset_seconds=_env(name, "MAX_RESET_SECONDS", 300.0),
+        half_open_calls=_env(name, "PROBES", 1),
+        slow_call_seconds=_env(name, "SLOW_SECONDS", slow) or None,
+        is_failure=is_failure,
+    )
+
+
+gemini_breaker = _breaker("gemini", failures=5, reset=30.0, slow=60.0)
+tavily_breaker = _breaker("tavily", failures=3, reset=60.0, slow=0.0, is_failure=_http_failure)
+github_breaker = _breaker("github", failures=5, reset=30.0, slow=0.0, is_failure=_http_failure)
+vercel_breaker = _breaker("vercel", failures=3, reset=60.0, slow=0.0, is_failure=_http_failure)
+
+BREAKERS = {b.name: b for b in (gemini_breaker, tavily_breaker, github_breaker, vercel_breaker)}
+
+
+def breaker_stats() -> dict:
+    return {name: breaker.stats() for name, breaker in BREAKERS.items()}
@@ -0,0 +1,393 @@
+"""
+Syntax validation of generated files, in parallel worker processes.
+
+Each file is checked by type:
+
+- Python:      compile()
+- JSON:        json.loads (tsconfig/jsconfig are parsed as JSON with
+               comments and trailing commas, like tsc does)
+- JavaScript:  `node --check` when node is on PATH, else the tokenizer below
+- TS/JSX/TSX:  a lightweight tokenizer: strings, template literals, comments,
+               regex literals and JSX text are skipped, and brackets and JSX
+               elements must balance and nest. It won't catch everything a
+               compiler would, but it does catch the usual damage in LLM
+               output: truncated files, unterminated strings and missing
+               braces.
+
+Other files (CSS, Markdown, ...) are counted as unchecked.
+
+Checks are CPU-bound and run in a process pool of VALIDATION_PROCESSES
+spawned workers, one task per file. The workers import only this module,
+not the server. The batch shares a time budget
+(VALIDATION_TIMEOUT_SECONDS); files still unchecked when it runs out are
+reported as timed out rather than holding up the pipeline, and if a check is
+still running then, the pool's processes are killed and a fresh pool serves
+the next batch. The validation stage (simple_agents.validation_agent)
+re-prompts only the files that failed.
+"""
+
+import json
+import multiprocessing
+import multiprocessing.context
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, wait
+
+VALIDATION_PROCESSES = int(os.getenv("VALIDATION_PROCESSES", str(min(4, os.cpu_count() or 1))))
+VALIDATION_TIMEOUT = float(os.getenv("VALIDATION_TIMEOUT_SECONDS", "5"))
+NODE_CHECK_TIMEOUT = float(os.getenv("VALIDATION_NODE_TIMEOUT_SECONDS", "3"))
+# VALIDATION_NODE=false uses the tokenizer for .js too
+NODE = shutil.which("node") if os.getenv("VALIDATION_NODE", "true").lower() not in ("0", "false", "no") else None
+
+_JSONC_NAMES = ("tsconfig", "jsconfig")
+
+
+# =====================================================================
+# === Checkers (run in worker processes) ===
+# =====================================================================
+
+def _check_python(path: str, content: str):
+    try:
+        compile(content, path, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return f"line {e.lineno}: {e.msg}"
+    except ValueError as e:  # e.g. null bytes
+        return str(e)
+    return None
+
+
+def _strip_jsonc(content: str) -> str:
+    """Drop // and /* */ comments outside strings, then trailing commas."""
+    out = []
+    i, n = 0, len(content)
+    while i < n:
+        ch = content[i]
+        if ch == '"':
+            end = i + 1
+            while end < n and content[end] != '"':
+                end += 2 if content[end] == "\\" else 1
+            out.append(content[i:end + 1])
+            i = end + 1
+        elif content.startswith("//", i):
+            i = content.find("\n", i)
+            i = n if i < 0 else i
+        elif content.startswith("/*", i):
+            i = content.find("*/", i + 2)
+            i = n if i < 0 else i + 2
+        else:
+            out.append(ch)
+            i += 1
+    return re.sub(r",(\s*[}\]])", r"\1", "".join(out))
+
+
+def _check_json(path: str, content: str):
+    if os.path.basename(path).startswith(_JSONC_NAMES):
+        content = _strip_jsonc(content)
+    try:
+        json.loads(content)
+    except json.JSONDecodeError as e:
+        return f"line {e.lineno}: {e.msg}"
+    return None
+
+
+_CLOSERS = {")": "(", "]": "[", "}": "{"}
+# A `/` after one of these (or a keyword like `return`) starts a regex literal, otherwise it divides
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await"}
+
+
+# `<T,>(...)` / `<T extends X>(...)`: a generic arrow function in a .tsx file, not a JSX tag
+_TSX_GENERIC = re.compile(r"<\s*[A-Za-z_$][\w$]*\s*(,|extends\b)")
+
+
+def _check_tokens(path: str, content: str):
+    """Bracket balance outside strings, comments, template literals, regexes and JSX text."""
+    jsx = path.endswith(("x", ".js"))
+    # (bracket, line); "`" marks a template literal whose ${...} we are inside, "tag" an
+    # unfinished JSX opening tag and "jsx" the children of a JSX element
+    stack = []
+    line = 1
+    i, n = 0, len(content)
+    last = ""  # last significant token, for the regex-vs-division and JSX-vs-less-than decisions
+
+    def scan_template(i, line):
+        """Scan template text from i; returns (index after the closing ` or the ${, line, opened_expression)."""
+        while i < n:
+            ch = content[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "\n":
+                line += 1
+            if ch == "`":
+                return i + 1, line, False
+            if content.startswith("${", i):
+                return i + 2, line, True
+            i += 1
+        return None, line, False
+
+    while i < n:
+        ch = content[i]
+        mode = stack[-1][0] if stack and stack[-1][0] in ("tag", "jsx") else "code"
+        if ch == "\n":
+            line += 1
+            i += 1
+        elif mode == "jsx":
+            # Element children: text is literal (quotes, slashes, URLs), only { and < mean anything
+            if ch == "{":
+                stack.append(("{", line))
+                last = "{"
+                i += 1
+            elif content.startswith("</", i):
+                end = content.find(">", i)
+                if end < 0:
+                    return f"line {line}: unterminated closing tag"
+                line += content.count("\n", i, end)
+                stack.pop()
+                last = "str"
+                i = end + 1
+            elif ch == "<":
+                stack.append(("tag", line))
+                i += 1
+            else:
+                i += 1
+        elif mode == "tag":
+            if ch in "'\"":
+                end = content.find(ch, i + 1)
+                if end < 0:
+                    return f"line {line}: unterminated attribute string"
+                line += content.count("\n", i, end)
+                i = end + 1
+            elif ch == "{":
+                stack.append(("{", line))
+                last = "{"
+                i += 1
+            elif content.startswith("/>", i):
+                stack.pop()  # self-closing: the element ends here
+                last = "str"
+                i += 2
+            elif ch == ">":
+                stack[-1] = ("jsx", stack[-1][1])
+                i += 1
+            else:
+                i += 1
+        elif ch in " \t\r":
+            i += 1
+        elif (jsx and ch == "<" and (last in _REGEX_AFTER or last in _REGEX_KEYWORDS or last == "")
+              and re.match(r"[A-Za-z>]", content[i + 1:i + 2]) and not _TSX_GENERIC.match(content, i)):
+            stack.append(("tag", line))
+            i += 1
+        elif content.startswith("//", i):
+            end = content.find("\n", i)
+            i = n if end < 0 else end
+        elif content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            if end < 0:
+                return f"line {line}: unterminated comment"
+            line += content.count("\n", i, end)
+            i = end + 2
+        elif ch in "'\"":
+            end = i + 1
+            while end < n and content[end] not in (ch, "\n"):
+                end += 2 if content[end] == "\\" else 1
+            if end >= n or content[end] == "\n":
+                return f"line {line}: unterminated string"
+            i = end + 1
+            last = "str"
+        elif ch == "`":
+            i, line, opened = scan_template(i + 1, line)
+            if i is None:
+                return f"line {line}: unterminated template literal"
+            if opened:
+                stack.append(("`", line))
+                last = "("
+            else:
+                last = "str"
+        elif ch == "/" and (last in _REGEX_AFTER or last in _REGEX_KEYWORDS or last == ""):
+            end, in_class = i + 1, False
+            while end < n and content[end] != "\n" and (in_class or content[end] != "/"):
+                if content[end] == "\\":
+                    end += 1
+                elif content[end] == "[":
+                    in_class = True
+                elif content[end] == "]":
+                    in_class = False
+                end += 1
+            if end >= n or content[end] == "\n":
+                # No closing slash on the line: a division after all (e.g. `} / 2`)
+                i += 1
+                last = "/"
+                continue
+            i = end + 1
+            last = "str"
+        elif ch in "([{":
+            stack.append((ch, line))
+            last = ch
+            i += 1
+        elif ch in ")]}":
+            if ch == "}" and stack and stack[-1][0] == "`":
+                # end of a ${...} expression: back into the template text
+                stack.pop()
+                i, line, opened = scan_template(i + 1, line)
+                if i is None:
+                    return f"line {line}: unterminated template literal"
+                if opened:
+                    stack.append(("`", line))
+                last = "str" if not opened else "("
+                continue
+            if not stack:
+                return f"line {line}: unexpected '{ch}'"
+            opener, opened_at = stack.pop()
+            if opener != _CLOSERS[ch]:
+                return f"line {line}: '{ch}' does not match '{opener}' from line {opened_at}"
+            last = ch
+            i += 1
+        elif ch.isalnum() or ch in "_$":
+            end = i
+            while end < n and (content[end].isalnum() or content[end] in "_$"):
+                end += 1
+            last = content[i:end]
+            i = end
+        else:
+            last = ch
+            i += 1
+
+    if stack:
+        opener, opened_at = stack[-1]
+        what = {"`": "template literal", "tag": "JSX tag", "jsx": "JSX element"}.get(opener, f"'{opener}'")
+        return f"line {opened_at}: unclosed {what} (file ends early?)"
+    return None
+
+
+def _check_node(path: str, content: str):
+    module = re.search(r"^\s*(import|export)\b", content, re.MULTILINE) or path.endswith(".mjs")
+    try:
+        proc = subprocess.run(
+            [NODE, "--check", f"--input-type={'module' if module else 'commonjs'}", "-"],
+            input=content, capture_output=True, text=True, timeout=NODE_CHECK_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return _check_tokens(path, content)
+    if proc.returncode == 0:
+        return None
+    lines = proc.stderr.splitlines()
+    where = next((l.rsplit(":", 1)[-1] for l in lines if l.startswith("[stdin]:")), "?")
+    message = next((l for l in lines if re.match(r"\w*Error:", l)), lines[-1] if lines else "syntax error")
+    return f"line {where}: {message}"
+
+
+def _checker(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".py":
+        return _check_python
+    if ext == ".json":
+        return _check_json
+    if ext in (".js", ".mjs", ".cjs"):
+        return _check_node if NODE else _check_tokens
+    if ext in (".jsx", ".ts", ".tsx", ".mts", ".cts"):
+        return _check_tokens
+    return None
+
+
+def check_file(path: str, content: str):
+    """Error message for one file, or None if it parses (or its type isn't checked)."""
+    checker = _checker(path)
+    return checker(path, content) if checker else None
+
+
+# =====================================================================
+# === Parallel validation ===
+# =====================================================================
+
+# Spawn, not fork: forking a threaded server is unsafe. A spawned child normally re-imports
+# the parent's __main__ (the whole backend, Gemini client included), so processes are
+# launched with a blank __main__ and import only this module.
+_pool = None
+_pool_lock = threading.Lock()
+_launch_lock = threading.Lock()
+
+
+class _SpawnProcess(multiprocessing.context.SpawnProcess):
+    @staticmethod
+    def _Popen(process_obj):
+        with _launch_lock:
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = types.ModuleType("__main__")
+            try:
+                return multiprocessing.context.SpawnProcess._Popen(process_obj)
+            finally:
+                sys.modules["__main__"] = main
+
+
+class _SpawnContext(multiprocessing.context.SpawnContext):
+    Process = _SpawnProcess
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=VALIDATION_PROCESSES, mp_context=_SpawnContext())
+        return _pool
+
+
+def _kill_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill a pool whose checks overran, so they stop holding worker processes; the next call starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    print("⚠️ Validation checks overran their budget, restarting the worker processes")
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def validate_files(files: list, timeout: float = VALIDATION_TIMEOUT) -> dict:
+    """Check every file in parallel within `timeout` seconds.
+
+    Returns {"checked", "passed", "unchecked", "failed": [{"path", "error"}], "timed_out": [path], "elapsed_seconds"}.
+    """
+    started = time.monotonic()
+    report = {"checked": 0, "passed": 0, "unchecked": 0, "failed": [], "timed_out": []}
+    pool = _get_pool()
+    futures = {}
+    for f in files:
+        path, content = f.get("path", ""), f.get("content")
+        if not isinstance(content, str) or _checker(path) is None:
+            report["unchecked"] += 1
+            continue
+        futures[pool.submit(check_file, path, content)] = path
+
+    done, not_done = wait(futures, timeout=timeout) if futures else (set(), set())
+    overran = False
+    for future in not_done:
+        overran |= not future.cancel()  # already running: only killing its process stops it
+        report["timed_out"].append(futures[future])
+    if overran:
+        _kill_pool(pool)
+    for future in done:
+        path = futures[future]
+        report["checked"] += 1
+        try:
+            error = future.result()
+        except Exception as e:  # worker crashed or was killed; don't blame the file
+            print(f"⚠️ Validation of {path} failed to run: {e}")
+            report["checked"] -= 1
+            report["timed_out"].append(path)
+            continue
+        if error:
+            report["failed"].append({"path": path, "error": error})
+        else:
+            report["passed"] += 1
+    report["failed"].sort(key=lambda f: f["path"])
+    report["timed_out"].sort()
+    report["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return report
+
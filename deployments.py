@@ -0,0 +1,205 @@
+"""
+Asynchronous Vercel deployment tracking.
+
+Triggering a deploy hook only queues a build, so nothing useful is known when
+the request returns. The tracker fires the hook in the background and
+returns a deployment id right away. It then polls the Vercel API with
+exponential backoff until the build reaches a final state, and records the
+real status and URL. Clients poll `get()` or subscribe with `wait_for_change()`
+(used by the SSE endpoint). Nothing is invented: without VERCEL_TOKEN the
+state stops at "triggered" and the URL stays unknown.
+"""
+
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from circuit_breakers import CircuitOpen, vercel_breaker
+
+VERCEL_API_URL = os.getenv("VERCEL_API_URL", "https://api.vercel.com").rstrip("/")
+HOOK_TIMEOUT = float(os.getenv("VERCEL_HOOK_TIMEOUT_SECONDS", "10"))
+POLL_INITIAL = float(os.getenv("DEPLOY_POLL_INITIAL_SECONDS", "2"))
+POLL_MAX = float(os.getenv("DEPLOY_POLL_MAX_SECONDS", "20"))
+POLL_TIMEOUT = float(os.getenv("DEPLOY_POLL_TIMEOUT_SECONDS", "900"))
+AUTO_DEPLOY = os.getenv("AUTO_DEPLOY", "false").lower() in ("1", "true", "yes")
+
+# Vercel readyState -> tracker status
+VERCEL_STATES = {
+    "QUEUED": "queued",
+    "INITIALIZING": "building",
+    "BUILDING": "building",
+    "READY": "ready",
+    "ERROR": "error",
+    "CANCELED": "canceled",
+}
+FINAL_STATES = {"ready", "error", "canceled", "failed", "triggered"}
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("DEPLOY_WORKERS", "4")), thread_name_prefix="deploy")
+
+
+def hook_configured() -> bool:
+    return bool(os.getenv("VERCEL_DEPLOY_HOOK_URL"))
+
+
+class DeploymentTracker:
+    """In-process registry of deployments and their latest known state."""
+
+    def __init__(self, history: int = 200):
+        self.history = history
+        self._deployments: dict[str, dict] = {}
+        self._changed = threading.Condition()
+        self._session = requests.Session()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _update(self, deployment_id: str, **changes) -> None:
+        with self._changed:
+            record = self._deployments[deployment_id]
+            event = changes.pop("event", None)
+            record.update(changes)
+            if event:
+                record["events"].append({"at": time.time(), "message": event})
+            record["updated_at"] = time.time()
+            record["version"] += 1
+            self._changed.notify_all()
+
+    def get(self, deployment_id: str):
+        with self._changed:
+            record = self._deployments.get(deployment_id)
+            return dict(record, events=list(record["events"])) if record else None
+
+    def wait_for_change(self, deployment_id: str, version: int, timeout: float):
+        """Block until the deployment's version moves past `version` (or timeout); return the record."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._deployments.get(deployment_id, {}).get("version", version) != version,
+                timeout=timeout,
+            )
+        return self.get(deployment_id)
+
+    # ------------------------------------------------------------------
+    # Trigger + poll
+    # ------------------------------------------------------------------
+
+    def trigger(self, project: str) -> str:
+        """Queue a deploy-hook call and background polling; returns the deployment id immediately."""
+        deployment_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._changed:
+            self._deployments[deployment_id] = {
+                "deployment_id": deployment_id,
+                "project": project,
+                "status": "pending",
+                "deployment_url": None,
+                "vercel_id": None,
+                "error": None,
+                "created_at": now,
+                "updated_at": now,
+                "version": 0,
+                "events": [],
+            }
+            # Drop the oldest finished records beyond the history size
+            if len(self._deployments) > self.history:
+                for old_id, old in sorted(self._deployments.items(), key=lambda kv: kv[1]["created_at"]):
+                    if len(self._deployments) <= self.history:
+                        break
+                    if old["status"] in FINAL_STATES:
+                        del self._deployments[old_id]
+        _executor.submit(self._run, deployment_id)
+        return deployment_id
+
+    def _run(self, deployment_id: str) -> None:
+        try:
+            self._fire_hook(deployment_id)
+            if os.getenv("VERCEL_TOKEN"):
+                self._poll(deployment_id)
+            else:
+                self._update(deployment_id, status="triggered",
+                             event="Hook accepted; set VERCEL_TOKEN to track build status")
+        except Exception as e:
+            self._update(deployment_id, status="failed", error=str(e), event=f"Failed: {e}")
+
+    def _fire_hook(self, deployment_id: str) -> None:
+        hook_url = os.getenv("VERCEL_DEPLOY_HOOK_URL")
+        if not hook_url:
+            raise RuntimeError("VERCEL_DEPLOY_HOOK_URL is not set")
+        triggered_at = int(time.time() * 1000)
+        with vercel_breaker.guard():
+            response = self._session.post(hook_url, timeout=HOOK_TIMEOUT)
+            response.raise_for_status()
+        print(f"🚀 Deploy hook accepted for deployment {deployment_id}")
+        self._update(deployment_id, status="queued", triggered_at=triggered_at, event="Deploy hook accepted")
+
+    def _latest_deployment(self, since_ms: int):
+        headers = {"Authorization": f"Bearer {os.getenv('VERCEL_TOKEN')}"}
+        params = {"since": since_ms, "limit": 1}
+        if os.getenv("VERCEL_PROJECT_ID"):
+            params["projectId"] = os.getenv("VERCEL_PROJECT_ID")
+        if os.getenv("VERCEL_TEAM_ID"):
+            params["teamId"] = os.getenv("VERCEL_TEAM_ID")
+        with vercel_breaker.guard():
+            response = self._session.get(f"{VERCEL_API_URL}/v6/deployments", params=params, headers=headers, timeout=HOOK_TIMEOUT)
+            response.raise_for_status()
+        deployments = response.json().get("deployments", [])
+        return deployments[0] if deployments else None
+
+    def _poll(self, deployment_id: str) -> None:
+        record = self.get(deployment_id)
+        # Hook time minus a little clock skew, so the build it started is the newest one found
+        since = record["triggered_at"] - 5000
+        deadline = time.monotonic() + POLL_TIMEOUT
+        delay = POLL_INITIAL
+        while time.monotonic() < deadline:
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, POLL_MAX)
+            try:
+                found = self._latest_deployment(since)
+            except (requests.RequestException, CircuitOpen) as e:
+                print(f"⚠️ Deployment status poll failed: {e}")
+                continue
+            if not found:
+                continue
+            status = VERCEL_STATES.get(found.get("readyState") or found.get("state"), "building")
+            url = f"https://{found['url']}" if found.get("url") else None
+            if status != record["status"] or url != record["deployment_url"]:
+                self._update(deployment_id, status=status, deployment_url=url, vercel_id=found.get("uid"),
+                             event=f"Vercel state: {status}")
+                record = self.get(deployment_id)
+                # A state change usually means more is coming soon
+                delay = POLL_INITIAL
+            if status in FINAL_STATES:
+                print(f"✅ Deployment {deployment_id} finished: {status} {url or ''}")
+                return
+        self._update(deployment_id, status="failed", error="Timed out waiting for the build",
+                     event="Stopped polling after DEPLOY_POLL_TIMEOUT_SECONDS")
+
+
+deployment_tracker = DeploymentTracker()
+
+
+def deployment_stage(project: str) -> dict:
+    """Pipeline deployment stage: real deployment state, no LLM.
+
+    With AUTO_DEPLOY=true and a deploy hook configured the build is triggered
+    and tracked in the background; otherwise nothing is deployed.
+    """
+    if not (AUTO_DEPLOY and hook_configured()):
+        return {
+            "deployment_url": None,
+            "deployment_status": "not_deployed",
+            "notes": "Deploy from the dashboard, or set AUTO_DEPLOY=true with VERCEL_DEPLOY_HOOK_URL.",
+        }
+    deployment_id = deployment_tracker.trigger(project)
+    return {
+        "deployment_id": deployment_id,
+        "deployment_url": None,
+        "deployment_status": "pending",
+        "status_url": f"/api/deployments/{deployment_id}",
+    }
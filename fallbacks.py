@@ -0,0 +1,226 @@
+"""
+Deterministic template fallbacks for pipeline stages.
+
+Every stage runs under a latency budget. When the LLM call fails, returns
+nothing usable, or does not finish in time, the stage is filled from a
+template instead and reported as degraded, so the pipeline's worst case is
+bounded by the budget rather than by Gemini.
+"""
+
+import contextvars
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from circuit_breakers import CircuitOpen
+
+# Per-stage budgets in seconds (override with e.g. STAGE_BUDGET_CODING=90)
+STAGE_BUDGETS = {
+    "ideation": float(os.getenv("STAGE_BUDGET_IDEATION", "20")),
+    "research": float(os.getenv("STAGE_BUDGET_RESEARCH", "25")),
+    "coding": float(os.getenv("STAGE_BUDGET_CODING", "60")),
+    "deployment": float(os.getenv("STAGE_BUDGET_DEPLOYMENT", "15")),
+    "presentation": float(os.getenv("STAGE_BUDGET_PRESENTATION", "25")),
+    "validation": float(os.getenv("STAGE_BUDGET_VALIDATION", "20")),
+}
+
+# Upper bound for the whole pipeline; stages share what is left of it
+PIPELINE_BUDGET = float(os.getenv("PIPELINE_BUDGET_SECONDS", "150"))
+
+# Timed-out LLM calls keep running in the background, so leave headroom
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("STAGE_EXECUTOR_THREADS", "32")), thread_name_prefix="stage")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "hackathon-project"
+
+
+# =====================================================================
+# === Stage templates ===
+# =====================================================================
+
+def fallback_ideas(user_input: str) -> list:
+    return [
+        {
+            "title": f"{user_input} - Smart Solution",
+            "pitch": f"A revolutionary {user_input.lower()} that leverages AI to solve real-world problems.",
+            "tech": "React, Node.js, Python, PostgreSQL, Docker",
+            "novelty": "First-of-its-kind integration of machine learning with intuitive user interface"
+        },
+        {
+            "title": f"{user_input} - Enterprise Edition",
+            "pitch": f"An enterprise-grade {user_input.lower()} solution designed for scalability.",
+            "tech": "Next.js, TypeScript, AWS, Kubernetes, Redis",
+            "novelty": "Advanced microservices architecture with real-time analytics"
+        },
+        {
+            "title": f"{user_input} - Mobile First",
+            "pitch": f"A mobile-optimized {user_input.lower()} that delivers seamless experiences across all devices.",
+            "tech": "React Native, Firebase, GraphQL, Stripe",
+            "novelty": "Cross-platform compatibility with native performance"
+        }
+    ]
+
+
+def fallback_research(idea: str) -> dict:
+    return {
+        "market_analysis": {
+            "target_audience": "Tech-savvy professionals aged 25-45",
+            "market_size": "$2.5B",
+            "competition": "3 major competitors identified",
+            "opportunities": "Growing demand for AI-powered solutions"
+        },
+        "technical_requirements": {
+            "scalability": "Support for 10,000+ concurrent users",
+            "security": "End-to-end encryption, GDPR compliance",
+            "performance": "Sub-200ms response times",
+            "integrations": "REST APIs, webhooks, third-party services"
+        },
+        "project_timeline": {
+            "phase1": "MVP development (2 weeks)",
+            "phase2": "Feature enhancement (1 week)",
+            "phase3": "Testing and deployment (1 week)"
+        }
+    }
+
+
+def fallback_code(idea: str) -> dict:
+    name = _slug(idea)
+    return {
+        "files": [
+            {
+                "path": "package.json",
+                "content": (
+                    f'{{\n  "name": "{name}",\n  "version": "1.0.0",\n  "private": true,\n'
+                    '  "scripts": {\n    "start": "react-scripts start",\n    "build": "react-scripts build",\n'
+                    '    "server": "node server/app.js"\n  },\n'
+                    '  "dependencies": {\n    "react": "^18.2.0",\n    "react-dom": "^18.2.0",\n'
+                    '    "express": "^4.18.2",\n    "cors": "^2.8.5"\n  }\n}\n'
+                )
+            },
+            {
+                "path": "src/App.tsx",
+                "content": f"import React from 'react';\n\nfunction App() {{\n  return (\n    <div className=\"App\">\n      <header className=\"App-header\">\n        <h1>{idea}</h1>\n      </header>\n    </div>\n  );\n}}\n\nexport default App;\n"
+            },
+            {
+                "path": "src/components/Dashboard.tsx",
+                "content": f"import React from 'react';\n\nconst Dashboard = () => {{\n  return (\n    <div className=\"dashboard\">\n      <h2>{idea} Dashboard</h2>\n    </div>\n  );\n}};\n\nexport default Dashboard;\n"
+            },
+            {
+                "path": "server/app.js",
+                "content": f"const express = require('express');\nconst cors = require('cors');\n\nconst app = express();\napp.use(cors());\n\napp.get('/api/data', (req, res) => {{\n  res.json({{ message: '{name} API' }});\n}});\n\napp.listen(3001, () => console.log('Server running on port 3001'));\n"
+            }
+        ],
+        "readme": f"# {idea}\n\nA modern web application built with React, TypeScript, and Node.js.\n\n## Getting Started\n\n1. `npm install`\n2. `npm run server` and `npm start`\n3. Open http://localhost:3000\n",
+        "requirements": ["react", "react-dom", "typescript", "@types/react", "express", "cors"]
+    }
+
+
+def fallback_deployment(idea: str) -> dict:
+    return {
+        "deployment_url": None,
+        "deployment_status": "not_deployed"
+    }
+
+
+def fallback_presentation(idea: str) -> dict:
+    return {
+        "slides_outline": ["Title Slide", "Problem", "Solution", "Demo", "Impact", "Next Steps"],
+        "pitch": f"{idea} tackles a real problem with a focused, AI-assisted product. "
+                 "We built a working prototype during the hackathon and have a clear path to launch.",
+        "demo_script": "1. Show the problem\n2. Demo the solution\n3. Show results",
+        "resources": ["GitHub repo", "Live demo", "Documentation"]
+    }
+
+
+def fallback_validation(idea: str) -> dict:
+    return {"status": "skipped", "checked": 0, "passed": 0, "unchecked": 0, "failed": [], "repaired": [], "timed_out": []}
+
+
+FALLBACKS = {
+    "ideation": fallback_ideas,
+    "research": fallback_research,
+    "coding": fallback_code,
+    "deployment": fallback_deployment,
+    "presentation": fallback_presentation,
+    "validation": fallback_validation,
+}
+
+# Shape each stage's payload must have to be usable downstream
+STAGE_TYPES = {
+    "ideation": list,
+    "research": dict,
+    "coding": dict,
+    "deployment": dict,
+    "presentation": dict,
+    "validation": dict,
+}
+
+
+# =====================================================================
+# === Budgeted stage runner ===
+# =====================================================================
+
+class PipelineDeadline:
+    """Tracks how much of the pipeline budget is left."""
+
+    def __init__(self, budget: float = PIPELINE_BUDGET):
+        self.expires_at = time.monotonic() + budget
+
+    @classmethod
+    def until(cls, wall_clock_expiry: float) -> "PipelineDeadline":
+        """A deadline at a time.time() instant, e.g. one stored in a checkpointed graph state."""
+        return cls(wall_clock_expiry - time.time())
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+def run_stage(stage: str, agent_func, agent_input: str, result_key: str, fallback_input: str,
+              deadline: PipelineDeadline = None, degraded: list = None, congested: list = None):
+    """
+    Run one agent under its latency budget and return its payload.
+
+    Falls back to the stage template (and appends the stage to `degraded`)
+    when the agent errors, returns an empty payload, or runs out of time.
+    Only fallbacks that signal an overloaded backend (a timeout, an exhausted
+    pipeline budget, an open circuit breaker) also go to `congested`; a bad
+    answer that came back in time is not a capacity problem.
+    """
+    budget = STAGE_BUDGETS[stage]
+    if deadline is not None:
+        budget = min(budget, deadline.remaining())
+
+    reason = None
+    overloaded = False
+    started = time.monotonic()
+    if budget <= 0:
+        reason = "pipeline budget exhausted"
+        overloaded = True
+    else:
+        # Run in a copy of the caller's context so LangChain callbacks (LangGraph's
+        # stream_mode="messages" token stream) follow the agent into the stage thread
+        future = _executor.submit(contextvars.copy_context().run, agent_func, agent_input)
+        try:
+            result = future.result(timeout=budget)
+            payload = result.get(result_key)
+            if result.get("success") and payload and isinstance(payload, STAGE_TYPES[stage]):
+                return payload
+            reason = result.get("error") or "empty or malformed output"
+        except FutureTimeout:
+            reason = f"timed out after {budget:.1f}s"
+            overloaded = True
+        except CircuitOpen as e:
+            reason = str(e)
+            overloaded = True
+        except Exception as e:
+            reason = str(e)
+
+    elapsed = time.monotonic() - started
+    print(f"⚠️ {stage} degraded ({reason}, {elapsed:.1f}s), using template fallback")
+    if degraded is not None:
+        degraded.append(stage)
+    if overloaded and congested is not None:
+        congested.append(stage)
+    return FALLBACKS[stage](fallback_input)
@@ -128,27 +128,35 @@ export default function DashboardPage() {
       if (response.ok) {
         const deploymentResult = await response.json();
 
-        alert(`🚀 Deployment triggered successfully!\n\nURL: ${deploymentResult.deployment_url}\n\nYour project is being deployed to Vercel!`);
-
-        // Build a safe copy of generated_content
-        const currentGen = result.generated_content ? [...result.generated_content] : [];
-
-        // Ensure index 3 exists (we'll set/overwrite it)
-        currentGen[3] = {
-          ...(currentGen[3] ?? {}),
-          deployment_url: deploymentResult.deployment_url,
-          deployment_status: 'deployed',
-          build_logs: deploymentResult.build_logs ?? [],
-          environment_variables: deploymentResult.environment_variables ?? {},
-          monitoring: deploymentResult.monitoring ?? {}
+        alert(`🚀 Deployment triggered!\n\nThe live URL will appear here once Vercel finishes the build.`);
+
+        // Record the real deployment state at index 3 of generated_content
+        const applyDeployment = (deployment: { status: string; deployment_url: string | null; events?: { message: string }[] }) => {
+          setResult((prev) => {
+            if (!prev) return prev;
+            const currentGen = prev.generated_content ? [...prev.generated_content] : [];
+            currentGen[3] = {
+              ...(currentGen[3] ?? {}),
+              deployment_id: deploymentResult.deployment_id,
+              deployment_url: deployment.deployment_url,
+              deployment_status: deployment.status,
+              build_logs: (deployment.events ?? []).map((e) => e.message),
+            };
+            return { ...prev, generated_content: currentGen };
+          });
         };
-
-        const updatedResult: HackathonResult = {
-          ...result,
-          generated_content: currentGen
+        applyDeployment({ status: deploymentResult.status, deployment_url: null });
+
+        // The backend pushes every status change until the build is final
+        const events = new EventSource(deploymentResult.events_url);
+        events.onmessage = (event) => {
+          const deployment = JSON.parse(event.data);
+          applyDeployment(deployment);
+          if (['ready', 'error', 'canceled', 'failed', 'triggered'].includes(deployment.status)) {
+            events.close();
+          }
         };
-
-        setResult(updatedResult);
+        events.onerror = () => events.close();
       } else {
         const errorData = await response.json().catch(() => ({ error: 'Unknown error' }));
         alert(`Failed to deploy: ${errorData.error}`);
@@ -1,289 +1,72 @@
 import { NextRequest, NextResponse } from 'next/server';
 
+// The Flask backend owns the pipeline and its template fallbacks (fallbacks.py),
+// so this dev-server route only forwards the request instead of keeping its own mocks.
+const BACKEND_URL = process.env.BACKEND_URL || 'http://localhost:3001';
+
+// Client identity (API key, IP), idempotency and priority are decided by the backend
+// from these headers; without them every request would look like the Next server.
+const FORWARDED_REQUEST_HEADERS = ['authorization', 'x-api-key', 'idempotency-key', 'x-priority'];
+// fetch() has already decoded and measured the body, and hop-by-hop headers don't carry over
+const DROPPED_RESPONSE_HEADERS = ['connection', 'content-encoding', 'content-length', 'keep-alive', 'transfer-encoding'];
+
+function clientAddress(request: NextRequest): string | null {
+  const forwarded = request.headers.get('x-forwarded-for');
+  if (forwarded) {
+    return forwarded.split(',')[0].trim();
+  }
+  return request.headers.get('x-real-ip');
+}
+
 export async function POST(request: NextRequest) {
   try {
-    const body = await request.json();
-    const { idea, teamMembers, difficulty, duration, description, visibility, presentation } = body;
+    // Forward the body as sent, so an Idempotency-Key retry has the same fingerprint
+    const raw = await request.text();
+    let body;
+    try {
+      body = JSON.parse(raw);
+    } catch {
+      body = null;
+    }
 
-    if (!idea) {
+    if (!body?.idea) {
       return NextResponse.json(
         { error: 'Idea is required' },
         { status: 400 }
       );
     }
 
-    // Simulate different agent outputs based on the request
-    const mockResponse = generateMockAgentOutputs(idea, {
-      teamMembers,
-      difficulty,
-      duration,
-      description,
-      visibility,
-      presentation
+    const headers = new Headers({ 'Content-Type': 'application/json' });
+    for (const name of FORWARDED_REQUEST_HEADERS) {
+      const value = request.headers.get(name);
+      if (value) {
+        headers.set(name, value);
+      }
+    }
+    const address = clientAddress(request);
+    if (address) {
+      headers.set('X-Forwarded-For', address);
+    }
+
+    const response = await fetch(`${BACKEND_URL}/api/start-hackathon`, {
+      method: 'POST',
+      headers,
+      body: raw,
     });
 
-    return NextResponse.json(mockResponse);
+    const responseHeaders = new Headers(response.headers);
+    for (const name of DROPPED_RESPONSE_HEADERS) {
+      responseHeaders.delete(name);
+    }
+    return new NextResponse(await response.text(), {
+      status: response.status,
+      headers: responseHeaders,
+    });
   } catch (error) {
     console.error('API Error:', error);
     return NextResponse.json(
-      { error: 'Internal server error' },
-      { status: 500 }
+      { error: 'Backend unavailable. Start it with `python3 backend_api.py`.' },
+      { status: 502 }
     );
   }
 }
-
-function generateMockAgentOutputs(idea: string, options: any) {
-  // Ideation Agent Output
-  const ideationOutput = [
-    {
-      title: `${idea} - Smart Solution`,
-      pitch: `A revolutionary ${idea.toLowerCase()} that leverages AI to solve real-world problems. This innovative platform combines cutting-edge technology with user-friendly design to deliver exceptional value.`,
-      tech: "React, Node.js, Python, PostgreSQL, Docker",
-      novelty: "First-of-its-kind integration of machine learning with intuitive user interface"
-    },
-    {
-      title: `${idea} - Enterprise Edition`,
-      pitch: `An enterprise-grade ${idea.toLowerCase()} solution designed for scalability and reliability. Built with modern architecture principles and comprehensive security features.`,
-      tech: "Next.js, TypeScript, AWS, Kubernetes, Redis",
-      novelty: "Advanced microservices architecture with real-time analytics"
-    },
-    {
-      title: `${idea} - Mobile First`,
-      pitch: `A mobile-optimized ${idea.toLowerCase()} that delivers seamless experiences across all devices. Focus on performance, accessibility, and user engagement.`,
-      tech: "React Native, Firebase, GraphQL, Stripe",
-      novelty: "Cross-platform compatibility with native performance"
-    }
-  ];
-
-  // Research Agent Output
-  const researchOutput = {
-    market_analysis: {
-      target_audience: "Tech-savvy professionals aged 25-45",
-      market_size: "$2.5B",
-      competition: "3 major competitors identified",
-      opportunities: "Growing demand for AI-powered solutions"
-    },
-    technical_requirements: {
-      scalability: "Support for 10,000+ concurrent users",
-      security: "End-to-end encryption, GDPR compliance",
-      performance: "Sub-200ms response times",
-      integrations: "REST APIs, webhooks, third-party services"
-    },
-    project_timeline: {
-      phase1: "MVP development (2 weeks)",
-      phase2: "Feature enhancement (1 week)",
-      phase3: "Testing and deployment (1 week)"
-    }
-  };
-
-  // Coding Agent Output
-  const codingOutput = {
-    files: [
-      {
-        path: "src/App.tsx",
-        content: `import React from 'react';
-import { BrowserRouter as Router, Routes, Route } from 'react-router-dom';
-import './App.css';
-
-function App() {
-  return (
-    <Router>
-      <div className="App">
-        <header className="App-header">
-          <h1>${idea}</h1>
-        </header>
-        <main>
-          <Routes>
-            <Route path="/" element={<Home />} />
-            <Route path="/dashboard" element={<Dashboard />} />
-          </Routes>
-        </main>
-      </div>
-    </Router>
-  );
-}
-
-export default App;`
-      },
-      {
-        path: "src/components/Dashboard.tsx",
-        content: `import React, { useState, useEffect } from 'react';
-
-const Dashboard: React.FC = () => {
-  const [data, setData] = useState(null);
-
-  useEffect(() => {
-    // Fetch data logic here
-    console.log('Dashboard loaded');
-  }, []);
-
-  return (
-    <div className="dashboard">
-      <h2>${idea} Dashboard</h2>
-      <div className="stats">
-        <div className="stat-card">
-          <h3>Users</h3>
-          <p>1,234</p>
-        </div>
-        <div className="stat-card">
-          <h3>Revenue</h3>
-          <p>$12,345</p>
-        </div>
-      </div>
-    </div>
-  );
-};
-
-export default Dashboard;`
-      },
-      {
-        path: "package.json",
-        content: `{
-  "name": "${idea.toLowerCase().replace(/\s+/g, '-')}",
-  "version": "1.0.0",
-  "description": "${idea} - A modern web application",
-  "main": "src/App.tsx",
-  "scripts": {
-    "start": "react-scripts start",
-    "build": "react-scripts build",
-    "test": "react-scripts test",
-    "eject": "react-scripts eject"
-  },
-  "dependencies": {
-    "react": "^18.2.0",
-    "react-dom": "^18.2.0",
-    "react-router-dom": "^6.8.0",
-    "axios": "^1.3.0"
-  },
-  "devDependencies": {
-    "@types/react": "^18.0.0",
-    "@types/react-dom": "^18.0.0",
-    "typescript": "^4.9.0"
-  }
-}`
-      }
-    ],
-    readme: `# ${idea}
-
-A modern web application built with React and TypeScript.
-
-## Features
-
-- Modern React architecture
-- TypeScript for type safety
-- Responsive design
-- Real-time updates
-- Secure authentication
-
-## Getting Started
-
-1. Clone the repository
-2. Install dependencies: \`npm install\`
-3. Start the development server: \`npm start\`
-4. Open [http://localhost:3000](http://localhost:3000) in your browser
-
-## Tech Stack
-
-- React 18
-- TypeScript
-- React Router
-- Axios for API calls
-
-## Deployment
-
-The app is ready for deployment on platforms like Vercel, Netlify, or AWS.
-
-## Contributing
-
-1. Fork the repository
-2. Create a feature branch
-3. Make your changes
-4. Submit a pull request
-
-## License
-
-MIT License`,
-    requirements: ["react", "react-dom", "react-router-dom", "axios", "typescript"]
-  };
-
-  // Deployment Agent Output
-  const deploymentOutput = {
-    deployment_url: `https://${idea.toLowerCase().replace(/\s+/g, '-')}.vercel.app`,
-    deployment_status: "success",
-    build_logs: [
-      "✅ Dependencies installed",
-      "✅ TypeScript compilation successful",
-      "✅ Build optimization completed",
-      "✅ Deployment to Vercel successful"
-    ],
-    environment_variables: {
-      "REACT_APP_API_URL": "https://api.example.com",
-      "REACT_APP_ENVIRONMENT": "production"
-    },
-    monitoring: {
-      uptime: "99.9%",
-      response_time: "120ms",
-      error_rate: "0.1%"
-    }
-  };
-
-  // Presentation Agent Output
-  const presentationOutput = {
-    slides_outline: [
-      "Problem Statement - Current challenges in the market",
-      "Solution Overview - How our ${idea} addresses these challenges",
-      "Technology Stack - Modern tools and frameworks used",
-      "Key Features - Core functionality and user benefits",
-      "Market Opportunity - Target audience and market size",
-      "Business Model - Revenue streams and monetization",
-      "Competitive Advantage - What makes us unique",
-      "Demo - Live demonstration of the application",
-      "Roadmap - Future development plans",
-      "Team - Meet the development team",
-      "Q&A - Questions and answers session"
-    ],
-    pitch: `We're building ${idea}, a revolutionary platform that transforms how people interact with technology. Our solution addresses the growing need for intelligent, user-friendly applications that can scale with modern demands. With our innovative approach and cutting-edge technology stack, we're positioned to capture a significant share of the $2.5B market. We're seeking $500K in funding to accelerate development and expand our team.`,
-    demo_script: `Welcome to our ${idea} demo! Let me walk you through the key features:
-
-1. First, I'll show you the main dashboard where users can see their data at a glance
-2. Next, I'll demonstrate the core functionality that sets us apart from competitors
-3. Then, I'll show you how easy it is to customize and configure the system
-4. Finally, I'll highlight the real-time analytics and reporting features
-
-The entire process takes less than 2 minutes, demonstrating our focus on user experience and efficiency.`,
-    resources: [
-      "Technical Architecture Diagram",
-      "User Journey Map",
-      "Competitive Analysis Report",
-      "Market Research Data",
-      "Financial Projections",
-      "Team Bios and Experience"
-    ],
-    slides_link: "https://slides.example.com/${idea.toLowerCase().replace(/\s+/g, '-')}"
-  };
-
-  // Return structured output based on what was requested
-  const generated_content = [ideationOutput];
-
-  if (options.description || options.visibility) {
-    generated_content.push(researchOutput);
-    generated_content.push(codingOutput);
-    generated_content.push(deploymentOutput);
-  }
-
-  if (options.presentation) {
-    generated_content.push(presentationOutput);
-  }
-
-  return {
-    success: true,
-    message: "Hackathon project generated successfully",
-    generated_content,
-    metadata: {
-      idea,
-      timestamp: new Date().toISOString(),
-      agents_used: generated_content.length,
-      processing_time: "2.3s"
-    }
-  };
-}
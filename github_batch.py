@@ -0,0 +1,106 @@
+"""
+Bulk GitHub commits through the Git Data API.
+
+The Contents API costs one request (and one commit) per file. Here a whole
+generated tree becomes a single commit: the file contents go inline into one
+tree request, so pushing N files costs a fixed number of calls. There are
+five calls, or six when the default branch has to be looked up, plus one
+more for the pull request.
+"""
+
+import os
+import time
+
+import requests
+
+from circuit_breakers import github_breaker
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT_SECONDS", "30"))
+
+
+class GitHubError(Exception):
+    """A GitHub API call failed; carries the HTTP status and GitHub's message."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"GitHub API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class GitHubClient:
+    def __init__(self, token: str = None, api_url: str = None):
+        self.api_url = (api_url or GITHUB_API_URL).rstrip("/")
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
+        token = token or os.getenv("GITHUB_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+        self.calls = 0
+
+    def request(self, method: str, path: str, **kwargs):
+        self.calls += 1
+        # Network errors and 5xx count against the GitHub breaker; 4xx (404, 409, 422) don't
+        with github_breaker.guard():
+            response = self.session.request(method, f"{self.api_url}{path}", timeout=GITHUB_TIMEOUT, **kwargs)
+            if response.status_code >= 400:
+                try:
+                    message = response.json().get("message", response.text)
+                except ValueError:
+                    message = response.text
+                raise GitHubError(response.status_code, message)
+        return response.json() if response.content else {}
+
+    def _base_sha(self, repo: str, base: str, retries: int = 3) -> str:
+        # A repo created with auto_init may not expose its first ref for a moment
+        for attempt in range(retries):
+            try:
+                return self.request("GET", f"/repos/{repo}/git/ref/heads/{base}")["object"]["sha"]
+            except GitHubError as e:
+                if e.status not in (404, 409) or attempt == retries - 1:
+                    raise
+                time.sleep(0.5 * (attempt + 1))
+
+    def commit_files(self, repo: str, files: list, message: str, branch: str = None, base: str = None,
+                     pull_request: dict = None) -> dict:
+        """Commit `files` ([{path, content}]) to `repo` ("owner/name") as one commit.
+
+        With `branch`, the commit goes on a new branch created from `base`
+        (default: the repository's default branch), and `pull_request`
+        ({title, body}) opens a PR from it. Without `branch`, `base` is
+        fast-forwarded to the new commit.
+        """
+        tree = [
+            {"path": f["path"].lstrip("/"), "mode": "100644", "type": "blob", "content": f.get("content", "")}
+            for f in files
+            if f.get("path")
+        ]
+        if not tree:
+            raise ValueError("No files to commit")
+
+        if base is None:
+            base = self.request("GET", f"/repos/{repo}")["default_branch"]
+        parent_sha = self._base_sha(repo, base)
+        base_tree = self.request("GET", f"/repos/{repo}/git/commits/{parent_sha}")["tree"]["sha"]
+        tree_sha = self.request("POST", f"/repos/{repo}/git/trees", json={"base_tree": base_tree, "tree": tree})["sha"]
+        commit_sha = self.request(
+            "POST", f"/repos/{repo}/git/commits",
+            json={"message": message, "tree": tree_sha, "parents": [parent_sha]},
+        )["sha"]
+
+        if branch:
+            self.request("POST", f"/repos/{repo}/git/refs", json={"ref": f"refs/heads/{branch}", "sha": commit_sha})
+        else:
+            self.request("PATCH", f"/repos/{repo}/git/refs/heads/{base}", json={"sha": commit_sha})
+
+        result = {"commit_sha": commit_sha, "branch": branch or base, "base": base, "files": len(tree)}
+        if branch and pull_request:
+            pr = self.request("POST", f"/repos/{repo}/pulls", json={
+                "title": pull_request.get("title") or message,
+                "body": pull_request.get("body", ""),
+                "head": branch,
+                "base": base,
+            })
+            result["pull_request_url"] = pr.get("html_url")
+            result["pull_request_number"] = pr.get("number")
+        return result
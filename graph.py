@@ -1,22 +1,20 @@
 # graph.py
+import os
 import json
 import operator
 from typing import Annotated, Any, Optional
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from state import AgentState
+from state import AgentState, ARTIFACT_SLOTS
+from artifacts import artifact_store
+from pipeline import langgraph_agent
 from agents import (
-    ideation_agent,
-    research_planning_agent,
-    coding_agent,
-    deployment_agent,
-    presentation_agent,
-    supervisor_chain,
     AgentName,
     SupervisorOutput,
     human_in_the_loop_node,
 )
+from routing import VALID_AGENTS, route
 
 # ----------------------------
 # Helpers: normalize messages
@@ -155,33 +153,10 @@ def normalize_agent_output(result: Any) -> list[dict]:
 # ----------------------------
 # Pipeline control helpers
 # ----------------------------
-PIPELINE_ORDER = [
-    AgentName.IDEATION.value,
-    AgentName.RESEARCH_PLANNING.value,
-    AgentName.CODING.value,
-    AgentName.DEPLOYMENT.value,
-    AgentName.PRESENTATION.value,
-    AgentName.FINISH.value,
-]
-
-def _next_pipeline_stage(completed: list[str]) -> str:
-    for stage in PIPELINE_ORDER:
-        if stage == AgentName.FINISH.value:
-            return AgentName.FINISH.value
-        if stage not in completed:
-            return stage
-    return AgentName.FINISH.value
+# The stage order and its transitions live in routing.py (PIPELINE_ORDER, TRANSITIONS)
 
 def _is_valid_agent_name(name: Optional[str]) -> bool:
-    return name in {
-        AgentName.IDEATION.value,
-        AgentName.RESEARCH_PLANNING.value,
-        AgentName.CODING.value,
-        AgentName.DEPLOYMENT.value,
-        AgentName.PRESENTATION.value,
-        AgentName.HUMAN_IN_THE_LOOP.value,
-        AgentName.FINISH.value,
-    }
+    return name in VALID_AGENTS
 
 # ----------------------------
 # Core: run_agent_node
@@ -190,25 +165,14 @@ def run_agent_node(agent_callable, state: AgentState):
     """
     Generic runner for worker agents that returns a normalized assistant message list.
     """
-    print(f"[DEBUG] run_agent_node called with agent: {agent_callable}")
-    
+    # No debug output here: the CLI prints each node's update (main.print_update)
     try:
-        # Call the agent function directly with state
         result = agent_callable(state)
-        print(f"[DEBUG] Agent result: {result}")
-        
-        # Extract messages from result
+
+        # Extract messages from result (the messages reducer appends them to state)
         if isinstance(result, dict) and "messages" in result:
             new_messages = result["messages"]
-            # Append to the global message list
-            state.setdefault("messages", []).extend(new_messages)
-            
-            # Debug output
-            if new_messages:
-                content = new_messages[0].get("content", "") if new_messages else ""
-                print(f"[DEBUG] Agent output → {content[:200]}...")
-            
-            return {"messages": new_messages}
+            return {"messages": new_messages, "degraded": bool(result.get("degraded"))}
         else:
             print(f"[ERROR] Agent returned unexpected result: {result}")
             return {"messages": []}
@@ -217,90 +181,63 @@ def run_agent_node(agent_callable, state: AgentState):
         err_msg = f"Agent invocation error: {e}"
         print(f"[ERROR] {err_msg}")
         error_msg = {"role": "assistant", "content": err_msg}
-        state.setdefault("messages", []).append(error_msg)
         return {"messages": [error_msg]}
 
 # ----------------------------
 # Worker wrappers that mark completion
 # ----------------------------
-def run_ideation(state: AgentState):
-    print(f"[DEBUG] run_ideation called with state: {state.get('messages', [])}")
-    out = run_agent_node(ideation_agent, state)
-    state.setdefault("completed_stages", [])
-    if AgentName.IDEATION.value not in state["completed_stages"]:
-        state["completed_stages"].append(AgentName.IDEATION.value)
-    state.pop("next_agent", None)
-    print(f"[DEBUG] run_ideation completed, output: {out}")
-    return out
-
-def run_research_planning(state: AgentState):
-    out = run_agent_node(research_planning_agent, state)
-    state.setdefault("completed_stages", [])
-    if AgentName.RESEARCH_PLANNING.value not in state["completed_stages"]:
-        state["completed_stages"].append(AgentName.RESEARCH_PLANNING.value)
-    state.pop("next_agent", None)
-    return out
-
-def run_coding(state: AgentState):
-    out = run_agent_node(coding_agent, state)
-    state.setdefault("completed_stages", [])
-    if AgentName.CODING.value not in state["completed_stages"]:
-        state["completed_stages"].append(AgentName.CODING.value)
-    state.pop("next_agent", None)
-    return out
-
-def run_deployment(state: AgentState):
-    out = run_agent_node(deployment_agent, state)
-    state.setdefault("completed_stages", [])
-    if AgentName.DEPLOYMENT.value not in state["completed_stages"]:
-        state["completed_stages"].append(AgentName.DEPLOYMENT.value)
-    state.pop("next_agent", None)
-    return out
-
-def run_presentation(state: AgentState):
-    out = run_agent_node(presentation_agent, state)
-    state.setdefault("completed_stages", [])
-    if AgentName.PRESENTATION.value not in state["completed_stages"]:
-        state["completed_stages"].append(AgentName.PRESENTATION.value)
-    state.pop("next_agent", None)
-    return out
+def _make_worker_node(stage: str, agent_callable):
+    """
+    Wrap a worker agent so it returns a delta: its output goes to the artifact
+    store and only a ref plus a one-line message enter the state.
+    """
+    def run_worker(state: AgentState):
+        out = run_agent_node(agent_callable, state)
+        same_count = state.get("same_agent_count", 0) + 1 if state.get("last_agent") == stage else 0
+        update = {
+            "completed_stages": [stage],
+            "last_agent": stage,
+            "same_agent_count": same_count,
+            "last_degraded": bool(out.get("degraded")),
+            "next_agent": None,
+        }
+
+        content = out["messages"][0].get("content", "") if out["messages"] else ""
+        if not content or content.startswith(("Agent invocation error", "Error:")):
+            update["messages"] = out["messages"]  # keep errors visible to the router
+            update["last_degraded"] = True
+            return update
+
+        ref = artifact_store.put(stage, content)
+        update[ARTIFACT_SLOTS[stage]] = ref
+        update["messages"] = [{"role": "assistant", "content": f"[{stage}] artifact {ref.key} ({ref.size} bytes)"}]
+        return update
+    run_worker.__name__ = f"run_{stage}"
+    return run_worker
+
+# Workers run the pipeline engine's stages (pipeline.py), so the graph, the API and
+# simple_workflow share prompts, budgets and fallbacks
+run_ideation = _make_worker_node(AgentName.IDEATION.value, langgraph_agent("ideation"))
+run_research_planning = _make_worker_node(AgentName.RESEARCH_PLANNING.value, langgraph_agent("research"))
+run_coding = _make_worker_node(AgentName.CODING.value, langgraph_agent("coding"))
+run_deployment = _make_worker_node(AgentName.DEPLOYMENT.value, langgraph_agent("deployment"))
+run_presentation = _make_worker_node(AgentName.PRESENTATION.value, langgraph_agent("presentation"))
 
 # ----------------------------
-# Supervisor node (simplified)
+# Supervisor node (routing policy from routing.py)
 # ----------------------------
 def run_supervisor(state):
-    # Get completed stages
-    completed = state.setdefault("completed_stages", [])
-    
-    # Determine next agent based on what's been completed
-    if AgentName.IDEATION.value not in completed:
-        next_agent = AgentName.IDEATION.value
-        response = "Starting with ideation to generate project ideas."
-    elif AgentName.RESEARCH_PLANNING.value not in completed:
-        next_agent = AgentName.RESEARCH_PLANNING.value
-        response = "Moving to research and planning phase."
-    elif AgentName.CODING.value not in completed:
-        next_agent = AgentName.CODING.value
-        response = "Moving to coding phase to generate codebase."
-    elif AgentName.DEPLOYMENT.value not in completed:
-        next_agent = AgentName.DEPLOYMENT.value
-        response = "Moving to deployment phase."
-    elif AgentName.PRESENTATION.value not in completed:
-        next_agent = AgentName.PRESENTATION.value
-        response = "Moving to presentation phase."
-    else:
-        next_agent = AgentName.FINISH.value
-        response = "Pipeline completed successfully!"
-
-    # Set next agent and add message
-    state["next_agent"] = next_agent
-    assistant_message = {"role": "assistant", "content": response}
-    state.setdefault("messages", []).append(assistant_message)
-
-    print(f"[SUPERVISOR] → Next agent: {next_agent}")
-    print(f"[SUPERVISOR] → Response: {response}")
-
-    return {"messages": [assistant_message]}
+    decision = route(state)
+    assistant_message = {"role": "assistant", "content": decision.response}
+
+    print(f"[SUPERVISOR] → Next agent: {decision.next_agent} ({decision.policy}, {decision.latency_us:.0f}µs)")
+    print(f"[SUPERVISOR] → Response: {decision.response}")
+
+    return {
+        "messages": [assistant_message],
+        "next_agent": decision.next_agent,
+        "supervisor_steps": state.get("supervisor_steps", 0) + 1,
+    }
 
 # ----------------------------
 # Routing function used by StateGraph
@@ -312,41 +249,116 @@ def route_supervisor(state: AgentState):
     return AgentName.FINISH.value
 
 # ----------------------------
-# Build the workflow graph
+# Build the workflow graphs
 # ----------------------------
-workflow = StateGraph(AgentState)
-workflow.add_node(AgentName.SUPERVISOR.value, run_supervisor)
-workflow.add_node(AgentName.IDEATION.value, run_ideation)
-workflow.add_node(AgentName.RESEARCH_PLANNING.value, run_research_planning)
-workflow.add_node(AgentName.CODING.value, run_coding)
-workflow.add_node(AgentName.DEPLOYMENT.value, run_deployment)
-workflow.add_node(AgentName.PRESENTATION.value, run_presentation)
-workflow.add_node(AgentName.HUMAN_IN_THE_LOOP.value, human_in_the_loop_node)
-workflow.set_entry_point(AgentName.SUPERVISOR.value)
-
-workflow.add_conditional_edges(
-    AgentName.SUPERVISOR.value,
-    route_supervisor,
-    {
-        AgentName.IDEATION.value: AgentName.IDEATION.value,
-        AgentName.RESEARCH_PLANNING.value: AgentName.RESEARCH_PLANNING.value,
-        AgentName.CODING.value: AgentName.CODING.value,
-        AgentName.DEPLOYMENT.value: AgentName.DEPLOYMENT.value,
-        AgentName.PRESENTATION.value: AgentName.PRESENTATION.value,
-        AgentName.HUMAN_IN_THE_LOOP.value: AgentName.HUMAN_IN_THE_LOOP.value,
-        AgentName.FINISH.value: END,
-    }
-)
+WORKER_NODES = {
+    AgentName.IDEATION.value: run_ideation,
+    AgentName.RESEARCH_PLANNING.value: run_research_planning,
+    AgentName.CODING.value: run_coding,
+    AgentName.DEPLOYMENT.value: run_deployment,
+    AgentName.PRESENTATION.value: run_presentation,
+}
+
+# Default for get_initial_state(require_approval=...) in the CLI (see human_in_the_loop_node)
+REQUIRE_APPROVAL = os.getenv("REQUIRE_APPROVAL", "false").lower() in ("1", "true", "yes")
+
+def build_supervisor_workflow(workers: Optional[dict] = None) -> StateGraph:
+    """Hub-and-spoke topology: every worker returns to the supervisor, which picks the next one."""
+    workers = workers or WORKER_NODES
+    workflow = StateGraph(AgentState)
+    workflow.add_node(AgentName.SUPERVISOR.value, run_supervisor)
+    for name, node in workers.items():
+        workflow.add_node(name, node)
+    workflow.add_node(AgentName.HUMAN_IN_THE_LOOP.value, human_in_the_loop_node)
+    workflow.set_entry_point(AgentName.SUPERVISOR.value)
+
+    workflow.add_conditional_edges(
+        AgentName.SUPERVISOR.value,
+        route_supervisor,
+        {
+            AgentName.IDEATION.value: AgentName.IDEATION.value,
+            AgentName.RESEARCH_PLANNING.value: AgentName.RESEARCH_PLANNING.value,
+            AgentName.CODING.value: AgentName.CODING.value,
+            AgentName.DEPLOYMENT.value: AgentName.DEPLOYMENT.value,
+            AgentName.PRESENTATION.value: AgentName.PRESENTATION.value,
+            AgentName.HUMAN_IN_THE_LOOP.value: AgentName.HUMAN_IN_THE_LOOP.value,
+            AgentName.FINISH.value: END,
+        }
+    )
+
+    workflow.add_edge(AgentName.IDEATION.value, AgentName.SUPERVISOR.value)
+    workflow.add_edge(AgentName.RESEARCH_PLANNING.value, AgentName.HUMAN_IN_THE_LOOP.value)
+    workflow.add_edge(AgentName.CODING.value, AgentName.SUPERVISOR.value)
+    workflow.add_edge(AgentName.DEPLOYMENT.value, AgentName.SUPERVISOR.value)
+    workflow.add_edge(AgentName.PRESENTATION.value, AgentName.SUPERVISOR.value)
+    workflow.add_edge(AgentName.HUMAN_IN_THE_LOOP.value, AgentName.SUPERVISOR.value)
+    return workflow
 
-workflow.add_edge(AgentName.IDEATION.value, AgentName.SUPERVISOR.value)
-workflow.add_edge(AgentName.RESEARCH_PLANNING.value, AgentName.HUMAN_IN_THE_LOOP.value)
-workflow.add_edge(AgentName.CODING.value, AgentName.SUPERVISOR.value)
-workflow.add_edge(AgentName.DEPLOYMENT.value, AgentName.SUPERVISOR.value)
-workflow.add_edge(AgentName.PRESENTATION.value, AgentName.SUPERVISOR.value)
-workflow.add_edge(AgentName.HUMAN_IN_THE_LOOP.value, AgentName.SUPERVISOR.value)
+def route_after_research(state: AgentState):
+    if state.get("require_approval"):
+        return AgentName.HUMAN_IN_THE_LOOP.value
+    return AgentName.CODING.value
+
+def route_after_approval(state: AgentState):
+    if state.get("status") == "rejected":
+        return END
+    return AgentName.CODING.value
+
+def build_linear_workflow(workers: Optional[dict] = None) -> StateGraph:
+    """
+    Stages wired directly in PIPELINE_ORDER, without supervisor hops.
+    The only conditional edges are around the optional approval step after research.
+    """
+    workers = workers or WORKER_NODES
+    workflow = StateGraph(AgentState)
+    for name, node in workers.items():
+        workflow.add_node(name, node)
+    workflow.add_node(AgentName.HUMAN_IN_THE_LOOP.value, human_in_the_loop_node)
+    workflow.set_entry_point(AgentName.IDEATION.value)
+
+    workflow.add_edge(AgentName.IDEATION.value, AgentName.RESEARCH_PLANNING.value)
+    workflow.add_conditional_edges(
+        AgentName.RESEARCH_PLANNING.value,
+        route_after_research,
+        {
+            AgentName.HUMAN_IN_THE_LOOP.value: AgentName.HUMAN_IN_THE_LOOP.value,
+            AgentName.CODING.value: AgentName.CODING.value,
+        }
+    )
+    workflow.add_conditional_edges(
+        AgentName.HUMAN_IN_THE_LOOP.value,
+        route_after_approval,
+        {AgentName.CODING.value: AgentName.CODING.value, END: END}
+    )
+    workflow.add_edge(AgentName.CODING.value, AgentName.DEPLOYMENT.value)
+    workflow.add_edge(AgentName.DEPLOYMENT.value, AgentName.PRESENTATION.value)
+    workflow.add_edge(AgentName.PRESENTATION.value, END)
+    return workflow
+
+workflow = build_supervisor_workflow()
+linear_workflow = build_linear_workflow()
 
 # ----------------------------
 # Persistence & compile
 # ----------------------------
-memory = MemorySaver()
+# Checkpoints go to SQLite so runs paused for approval survive restarts and
+# cost only storage; MemorySaver is used when the sqlite saver isn't installed.
+CHECKPOINT_DB = os.getenv(
+    "CHECKPOINT_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints.sqlite"),
+)
+
+def make_checkpointer():
+    try:
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        print("⚠️ langgraph-checkpoint-sqlite not installed, checkpoints are kept in memory")
+        return MemorySaver()
+    conn = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")  # several server processes share the file
+    return SqliteSaver(conn)
+
+memory = make_checkpointer()
 app = workflow.compile(checkpointer=memory)
+linear_app = linear_workflow.compile(checkpointer=memory)
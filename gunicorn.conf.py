@@ -0,0 +1,73 @@
+"""
+Gunicorn configuration for running the HackathonAgent API in production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    # or
+    python3 start_hackathon_agent.py --production
+
+Every setting can be overridden from the environment (WEB_WORKERS, WEB_THREADS, ...).
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("WEB_BIND", f"0.0.0.0:{os.getenv('PORT', '3001')}")
+
+# One process with a thread pool by default: pipelines spend most of their time
+# waiting on Gemini, and sessions, jobs, deployments, the scheduler, admission
+# control and idempotency keys all live in the process's memory. With more
+# workers a follow-up request (/api/session/<id>/files, /api/deployments/<id>,
+# /api/jobs/<id>, ...) can land on a worker that doesn't know the id and get a
+# 404. Only raise WEB_WORKERS behind a proxy that pins clients to one worker.
+workers = int(os.getenv("WEB_WORKERS", "1"))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", str(max(8, 2 * multiprocessing.cpu_count()))))
+
+# Import the app (agents, LLM clients, caches) once in the master, then fork
+preload_app = os.getenv("WEB_PRELOAD", "true").lower() not in ("0", "false", "no")
+
+# Recycle workers after N requests (jittered so they don't all restart at once)
+# to bound memory growth from sessions and caches
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "500"))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "50"))
+
+# A pipeline can take up to PIPELINE_BUDGET_SECONDS (see fallbacks.py); leave room
+# for it to finish before a worker is killed, and let in-flight pipelines drain on
+# SIGTERM/HUP/recycling instead of cutting them off
+_pipeline_budget = float(os.getenv("PIPELINE_BUDGET_SECONDS", "150"))
+timeout = int(os.getenv("WEB_TIMEOUT", _pipeline_budget + 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", _pipeline_budget + 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("WEB_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    print(f"🚀 Starting HackathonAgent API: {workers} workers x {threads} threads on {bind}")
+
+
+def post_fork(server, worker):
+    # The preloaded Gemini client's gRPC channel was opened in the master; gRPC
+    # channels don't survive fork, so each worker builds its own
+    import prompts
+    import simple_agents
+
+    simple_agents.llm = simple_agents.make_llm()
+    prompts.clear_output_budgets()
+
+
+def worker_int(worker):
+    print(f"🛑 Worker {worker.pid} interrupted, draining in-flight requests")
+
+
+def worker_exit(server, worker):
+    # Stage calls that already timed out keep running in the background;
+    # don't let them hold the exiting worker open
+    try:
+        from fallbacks import _executor
+        _executor.shutdown(wait=False, cancel_futures=True)
+    except Exception:
+        pass
+    print(f"👋 Worker {worker.pid} exited")
@@ -0,0 +1,199 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+A client that may retry (network error, double click, frontend retry loop)
+sends the same `Idempotency-Key` header on each attempt. The first request
+with a key runs the endpoint. Any duplicate that arrives meanwhile waits for
+that run to finish (up to IDEMPOTENCY_WAIT_SECONDS) instead of starting the
+same pipeline, repo or deploy again. Duplicates after it finished get the
+stored response replayed, marked `Idempotent-Replayed: true`. Either way a
+retry costs one dictionary lookup rather than another pipeline run.
+
+Keys are scoped to the client (scheduler.client_id), the method and the
+path. Reusing a key with a different request body is refused with 422. Only
+final answers are stored: 2xx and 4xx other than 408/409/425/429. After a 5xx,
+a 429 or an exception, the key is released so the retry really runs again.
+
+The store is in memory and per process (like `sessions`), bounded by
+IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_MAX_BYTES of stored bodies and
+IDEMPOTENCY_TTL_SECONDS. The oldest completed entries are evicted first, and
+in-flight entries are never evicted.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import xxhash
+from flask import Response, current_app, jsonify, request
+
+from scheduler import client_id
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+MAX_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BYTES", str(64 * 1024 * 1024)))
+TTL = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# Long enough for a full pipeline run (fallbacks.PIPELINE_BUDGET) plus queueing
+WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "300"))
+MAX_KEY_LENGTH = 255
+
+# Statuses that are worth retrying, so they are never replayed
+_RETRYABLE = {408, 409, 425, 429}
+_SKIP_HEADERS = {"content-length", "content-encoding", "set-cookie", "vary"}
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "created", "done", "status", "headers", "body")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.created = time.monotonic()
+        self.done = threading.Event()
+        self.status = None  # None while in flight
+        self.headers = []
+        self.body = b""
+
+
+class IdempotencyStore:
+    """Bounded map of idempotency key -> in-flight marker or stored response."""
+
+    def __init__(self, max_keys: int = MAX_KEYS, max_bytes: int = MAX_BYTES, ttl: float = TTL):
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+        self.mismatched = 0
+        self.evicted = 0
+
+    def begin(self, key: str, fingerprint: str):
+        """("new" | "replay" | "in_flight" | "mismatch", entry). A "new" caller must finish() or abandon()."""
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(fingerprint)
+                self.executed += 1
+                return "new", entry
+            if entry.fingerprint != fingerprint:
+                self.mismatched += 1
+                return "mismatch", entry
+            if entry.status is None:
+                self.joined += 1
+                return "in_flight", entry
+            self.replayed += 1
+            return "replay", entry
+
+    def finish(self, key: str, entry: _Entry, response: Response) -> None:
+        body = response.get_data()
+        with self._lock:
+            entry.status = response.status_code
+            entry.headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS]
+            entry.body = body
+            if self._entries.get(key) is entry:
+                self._bytes += len(body)
+                self._entries.move_to_end(key)
+            self._evict()
+        entry.done.set()
+
+    def abandon(self, key: str, entry: _Entry) -> None:
+        """Forget a key whose request failed, so the next attempt runs for real."""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            over = len(self._entries) > self.max_keys or self._bytes > self.max_bytes
+            expired = now - entry.created > self.ttl
+            if not (over or expired):
+                break
+            if entry.status is None:
+                continue  # in flight: never evicted
+            del self._entries[key]
+            self._bytes -= len(entry.body)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = sum(1 for e in self._entries.values() if e.status is None)
+            return {
+                "keys": len(self._entries),
+                "in_flight": in_flight,
+                "stored_bytes": self._bytes,
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "joined_in_flight": self.joined,
+                "key_reuse_mismatches": self.mismatched,
+                "evicted": self.evicted,
+                "max_keys": self.max_keys,
+                "max_bytes": self.max_bytes,
+            }
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _replay(entry: _Entry) -> Response:
+    response = Response(entry.body, status=entry.status, headers=entry.headers)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _error(message: str, status: int, retry_after: int = None):
+    response = jsonify({"error": message})
+    response.status_code = status
+    if retry_after:
+        response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def idempotent(view):
+    """Route decorator: honour Idempotency-Key (requests without the header run as usual)."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        raw_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if raw_key is None:
+            return view(*args, **kwargs)
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            return _error(f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters", 400)
+
+        key = f"{client_id(request)} {request.method} {request.path} {raw_key}"
+        fingerprint = xxhash.xxh3_64_hexdigest(request.get_data())
+        deadline = time.monotonic() + WAIT_SECONDS
+        while True:
+            state, entry = idempotency_store.begin(key, fingerprint)
+            if state == "mismatch":
+                return _error(f"{IDEMPOTENCY_HEADER} was already used with a different request body", 422)
+            if state == "replay":
+                return _replay(entry)
+            if state == "new":
+                break
+            # Same request still running: wait for its answer instead of doing the work twice
+            if not entry.done.wait(max(0.0, deadline - time.monotonic())):
+                return _error("A request with this Idempotency-Key is still in progress", 409, retry_after=5)
+            if entry.status is not None:
+                return _replay(entry)
+            # The first attempt failed and released the key: loop and take it over
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except BaseException:
+            idempotency_store.abandon(key, entry)
+            raise
+        if response.status_code >= 500 or response.status_code in _RETRYABLE or response.is_streamed:
+            idempotency_store.abandon(key, entry)
+        else:
+            idempotency_store.finish(key, entry, response)
+        return response
+
+    return wrapper
@@ -0,0 +1,157 @@
+"""
+Background pipeline jobs on the LangGraph app, with approval after research.
+
+A job is a graph thread. It runs on a small worker pool until it finishes or
+hits the approval interrupt. At that point the invocation returns, the state
+is already checkpointed (SQLite, see graph.make_checkpointer), and the
+thread goes back to the pool. Paused jobs therefore cost only checkpoint
+storage; approving one schedules a resume from that checkpoint.
+
+Runs and resumes take a slot from the pipeline scheduler (scheduler.py) first,
+as "batch" work by default, so jobs never crowd out interactive requests.
+
+The bookkeeping below (owners, tickets, the double-approval guard) is per
+process, like the API's sessions: with several gunicorn workers, two
+approvals of the same job landing on different workers could both resume it.
+The default single worker (gunicorn.conf.py) avoids that.
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from langgraph.types import Command
+
+from artifacts import load_artifact
+from deployments import deployment_tracker
+from graph import linear_app
+from scheduler import pipeline_scheduler
+from state import ARTIFACT_SLOTS, get_initial_state
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+
+# Jobs with a resume scheduled in this process (guards against double approval)
+_resuming = set()
+_lock = threading.Lock()
+# job id -> (client, priority) until the job ends (kept while it awaits approval, for the resume),
+# and the scheduler ticket of its current run
+_owners = {}
+_tickets = {}
+
+
+def _config(job_id: str) -> dict:
+    return {"configurable": {"thread_id": job_id}, "recursion_limit": 100}
+
+
+def _run(job_id: str, payload, ticket) -> None:
+    ended = True
+    try:
+        pipeline_scheduler.wait(ticket)
+        for _ in linear_app.stream(payload, config=_config(job_id)):
+            pass
+        ended = not linear_app.get_state(_config(job_id)).next  # else paused for approval
+    except Exception as e:
+        print(f"❌ Job {job_id} failed: {e}")
+        try:
+            linear_app.update_state(_config(job_id), {"status": f"failed: {e}"})
+        except Exception:
+            pass
+    finally:
+        pipeline_scheduler.release(ticket)
+        with _lock:
+            _resuming.discard(job_id)
+            _tickets.pop(job_id, None)
+            if ended:
+                _owners.pop(job_id, None)
+
+
+def _schedule(job_id: str, payload) -> None:
+    client, priority = _owners.get(job_id, ("jobs", "batch"))
+    ticket = pipeline_scheduler.submit(client, priority)  # QueueFull propagates to the caller
+    _tickets[job_id] = ticket
+    _executor.submit(_run, job_id, payload, ticket)
+
+
+def start_job(idea: str, require_approval: bool = True, client: str = "jobs", priority: str = "batch") -> str:
+    """Queue a pipeline run in the background and return its job id (raises scheduler.QueueFull)."""
+    job_id = str(uuid.uuid4())
+    state = get_initial_state(idea, require_approval=require_approval)
+    _owners[job_id] = (client, priority)
+    try:
+        _schedule(job_id, state)
+    except Exception:
+        _owners.pop(job_id, None)
+        raise
+    return job_id
+
+
+def get_job(job_id: str):
+    """Current job status from its latest checkpoint, or None if unknown."""
+    ticket = _tickets.get(job_id)
+    queued = pipeline_scheduler.position(ticket.id) if ticket is not None and ticket.state == "queued" else None
+    snapshot = linear_app.get_state(_config(job_id))
+    if not snapshot.values:
+        if ticket is None:
+            return None
+        return {"job_id": job_id, "status": "queued" if queued else "running", "queue": queued}
+
+    values = snapshot.values
+    interrupts = [i.value for task in snapshot.tasks for i in task.interrupts]
+    if str(values.get("status", "")).startswith("failed"):
+        status = "failed"
+    elif queued:
+        status = "queued"
+    elif interrupts:
+        status = "awaiting_approval"
+    elif snapshot.next:
+        status = "running"
+    elif values.get("status") == "rejected":
+        status = "rejected"
+    else:
+        status = "completed"
+
+    job = {
+        "job_id": job_id,
+        "status": status,
+        "completed_stages": values.get("completed_stages", []),
+        "human_feedback": values.get("human_feedback"),
+        "queue": queued,
+        "artifacts": {
+            slot: {"key": ref.key, "size": ref.size}
+            for slot in ARTIFACT_SLOTS.values()
+            if (ref := values.get(slot)) is not None
+        },
+    }
+    if interrupts:
+        pending = dict(interrupts[0])
+        pending["research"] = load_artifact(values.get("research"))
+        job["approval"] = pending
+    if status == "completed":
+        job["result"] = {slot: load_artifact(values.get(slot)) for slot in ARTIFACT_SLOTS.values()}
+        # The stage only recorded the trigger; report where the build is now
+        deployment = job["result"].get("deployment")
+        if isinstance(deployment, dict) and deployment.get("deployment_id"):
+            live = deployment_tracker.get(deployment["deployment_id"])
+            if live:
+                deployment.update(deployment_url=live["deployment_url"], deployment_status=live["status"])
+    return job
+
+
+def approve_job(job_id: str, approved: bool = True, feedback: str = "") -> bool:
+    """Resume a job paused for approval. Returns False if it isn't waiting."""
+    with _lock:
+        if job_id in _resuming:
+            return False
+        job = get_job(job_id)
+        if job is None or job["status"] != "awaiting_approval":
+            return False
+        _resuming.add(job_id)
+    try:
+        _schedule(job_id, Command(resume={"approved": approved, "feedback": feedback}))
+    except Exception:
+        with _lock:
+            _resuming.discard(job_id)
+        raise
+    return True
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Load test for the production server mode.
+
+Starts gunicorn (gunicorn.conf.py + wsgi:app) with an increasing number of
+workers and measures throughput against one endpoint, so you can see how it
+scales across cores:
+
+    python3 load_test.py --workers 1,2,4 --path /api/health --duration 10
+
+Point it at an already running server instead with --url.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+PROJECT_DIR = Path(__file__).parent.absolute()
+
+
+def _client(url: str, path: str, duration: float, threads: int, queue):
+    """One client process: `threads` keep-alive connections hammering `path`."""
+    import threading
+
+    target = urlparse(url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def run():
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        local = []
+        local_errors = 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    queue.put((latencies, errors[0]))
+
+
+def run_load(url: str, path: str, duration: float, processes: int, threads: int) -> dict:
+    queue = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(target=_client, args=(url, path, duration, threads, queue))
+        for _ in range(processes)
+    ]
+    for p in clients:
+        p.start()
+    latencies, errors = [], 0
+    for _ in clients:
+        lat, err = queue.get()
+        latencies.extend(lat)
+        errors += err
+    for p in clients:
+        p.join()
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": count / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(count * 0.95) - 1] * 1000 if count >= 20 else 0.0,
+    }
+
+
+def wait_until_ready(url: str, timeout: float = 60) -> bool:
+    target = urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status < 500:
+                return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, WEB_WORKERS=str(workers), WEB_BIND=f"127.0.0.1:{port}", WEB_ACCESS_LOG="")
+    return subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=PROJECT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HackathonAgent throughput test")
+    parser.add_argument("--url", help="Test a running server instead of starting gunicorn")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, multiprocessing.cpu_count())),
+                        help="Comma-separated gunicorn worker counts to compare")
+    parser.add_argument("--path", default="/api/health")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--client-processes", type=int, default=max(1, multiprocessing.cpu_count() // 2))
+    parser.add_argument("--client-threads", type=int, default=8)
+    parser.add_argument("--port", type=int, default=3101)
+    args = parser.parse_args()
+
+    print(f"🧪 Load testing {args.path} for {args.duration:.0f}s per run "
+          f"({args.client_processes} client processes x {args.client_threads} connections)")
+    print("=" * 60)
+
+    if args.url:
+        stats = run_load(args.url, args.path, args.duration, args.client_processes, args.client_threads)
+        print(f"{stats['rps']:.0f} req/s  p50 {stats['p50_ms']:.1f}ms  p95 {stats['p95_ms']:.1f}ms  errors {stats['errors']}")
+        return True
+
+    worker_counts = sorted({int(n) for n in args.workers.split(",") if n.strip()})
+    baseline = None
+    for count in worker_counts:
+        server = start_server(count, args.port)
+        url = f"http://127.0.0.1:{args.port}"
+        try:
+            if not wait_until_ready(url):
+                print(f"❌ Server with {count} workers did not become ready")
+                return False
+            stats = run_load(url, args.path, args.duration, args.client_processes, args.client_threads)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+        baseline = baseline or stats["rps"]
+        speedup = stats["rps"] / baseline if baseline else 0.0
+        print(f"{count:>3} workers: {stats['rps']:>8.0f} req/s  x{speedup:.2f}  "
+              f"p50 {stats['p50_ms']:.1f}ms  p95 {stats['p95_ms']:.1f}ms  errors {stats['errors']}")
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -2,20 +2,86 @@ import os
 import uuid
 from dotenv import load_dotenv
 
-from state import get_initial_state
-from graph import app  # Assuming your compiled graph is named 'app'
+from state import get_initial_state, ArtifactRef
+from artifacts import load_artifact
+from graph import app as supervisor_app, linear_app, REQUIRE_APPROVAL
+from langgraph.types import Command
 
 load_dotenv()
 
-# Create a unique thread_id for this session to ensure persistence
-# This is essential for checkpointing and human-in-the-loop
-thread_id = str(uuid.uuid4())
-config = {
-    "configurable": {
-        "thread_id": thread_id
-    },
-    "recursion_limit": 100
-}
+# CASSETTE_MODE=record|replay|once records/replays LLM and HTTP calls (cassettes.py)
+from cassettes import install_from_env
+install_from_env("cli")
+
+# "linear" wires the stages directly; "supervisor" routes every step through the supervisor node
+app = supervisor_app if os.getenv("GRAPH_TOPOLOGY", "linear") == "supervisor" else linear_app
+
+def new_config():
+    # A unique thread_id per project run: checkpoints (and the approval
+    # interrupt) are keyed by it, and state reducers append within a thread
+    return {
+        "configurable": {
+            "thread_id": str(uuid.uuid4())
+        },
+        "recursion_limit": 100
+    }
+
+# Render LLM tokens as they are generated (stream_mode="messages"); false prints each node's output when it finishes
+STREAM_TOKENS = os.getenv("CLI_STREAM_TOKENS", "true").lower() not in ("0", "false", "no")
+
+def _chunk_text(chunk):
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+def print_update(key, value):
+    """Print one node's state update (stage outputs are refs into the artifact store)."""
+    if key in ('__end__', '__interrupt__'):
+        return
+    if isinstance(value, dict):
+        value = {k: load_artifact(v) if isinstance(v, ArtifactRef) else v for k, v in value.items()}
+    print(f"[{key}]: {value}")
+    print("-" * 40)
+
+def stream_tokens(state, config):
+    """Run the graph, printing tokens as the nodes' LLM calls produce them.
+
+    "messages" events carry the token chunks (tagged with the node that made the call),
+    "updates" events mark a node as finished. Nodes that streamed nothing (no LLM call,
+    cache hit, template fallback) have their output printed when they finish.
+    """
+    current, streamed = None, set()
+    for mode, payload in app.stream(state, config=config, stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            chunk, metadata = payload
+            text = _chunk_text(chunk)
+            if not text:
+                continue
+            node = metadata.get("langgraph_node")
+            if node != current:
+                print(f"\n💬 [{node}] ", end="")
+                current = node
+            streamed.add(node)
+            print(text, end="", flush=True)
+            continue
+        for key, value in payload.items():
+            if key in streamed:
+                print(f"\n✅ [{key}] done")
+                print("-" * 40)
+                streamed.discard(key)
+            else:
+                if current is not None:
+                    print()
+                print_update(key, value)
+            current = None
+
+def pending_approval(config):
+    snapshot = app.get_state(config)
+    for task in snapshot.tasks:
+        for pending in task.interrupts:
+            return pending.value
+    return None
 
 # Main application loop
 def main():
@@ -27,20 +93,29 @@ def main():
             break
 
         # Initialize state with user input
-        state = get_initial_state(user_input)
+        config = new_config()
+        state = get_initial_state(user_input, require_approval=REQUIRE_APPROVAL)
 
         # Stream the output from the graph
         print("🧩 Starting workflow...\n")
         
-        # Stream the workflow execution to see what's happening
-        for s in app.stream(state, config=config):
-            print("🧩 Workflow step...\n")
+        # Stream the workflow execution; it stops early when the run waits for approval
+        while state is not None:
+            if STREAM_TOKENS:
+                stream_tokens(state, config)
+            else:
+                for s in app.stream(state, config=config):
+                    print("🧩 Workflow step...\n")
+                    for key, value in s.items():
+                        print_update(key, value)
             
-            # Print each step
-            for key, value in s.items():
-                if key != '__end__':
-                    print(f"[{key}]: {value}")
-                    print("-" * 40)
+            state = None
+            pending = pending_approval(config)
+            if pending:
+                print(f"\n⏸️  {pending['question']}")
+                answer = input("Approve? [y/N] (optional feedback after a space): ").strip()
+                approved = answer[:1].lower() == "y"
+                state = Command(resume={"approved": approved, "feedback": answer[1:].strip()})
         
         print("\n🎉 Workflow completed!")
         print("=" * 50)
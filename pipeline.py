@@ -0,0 +1,417 @@
+"""
+The hackathon pipeline engine.
+
+One definition of the stages (inputs, dependencies, budgets and template
+fallbacks, all from simple_agents/fallbacks) and pluggable executors that
+decide how the stages are scheduled. Besides the five agents, a validation
+stage checks the generated files' syntax after coding and re-prompts only
+the broken ones (code_validation.py); its repairs are merged into `code`.
+
+Executors:
+
+- "sync":      one stage after another, the baseline.
+- "threaded":  stages run as soon as their dependencies are done (the
+               default). After coding, presentation runs alongside
+               validation and deployment, which wait for the validated code.
+- "asyncio":   the same dependency schedule on an event loop (stages run in
+               worker threads via asyncio.to_thread); `arun_pipeline` for
+               async callers.
+- "langgraph": the stages compiled into a LangGraph StateGraph (fan-out and
+               fan-in edges follow the dependencies; each superstep waits
+               for its slowest node).
+
+The Flask API, simple_workflow and the LangGraph CLI/jobs (graph.py, via
+`langgraph_agent`) all run these stages. PIPELINE_AGENTS picks who answers
+them: the single-prompt agents in simple_agents.py (default) or the
+tool-using workers in agents.py. Every run records per-stage
+timings, so executors can be compared on the same work (bench_pipeline.py).
+"""
+
+import asyncio
+import json
+import operator
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Annotated, Callable, TypedDict
+
+import simple_agents
+from admission import admission_controller
+from fallbacks import PipelineDeadline, fallback_ideas, run_stage
+
+PIPELINE_EXECUTOR = os.getenv("PIPELINE_EXECUTOR", "threaded")
+# "simple": one prompt per stage (simple_agents.py). "tools": the agents.py workers, which may call
+# web search and GitHub tools (run through tool_executor.ToolExecutor) before answering
+PIPELINE_AGENTS = os.getenv("PIPELINE_AGENTS", "simple")
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PIPELINE_THREADS", "16")), thread_name_prefix="pipeline")
+
+
+# =====================================================================
+# === Stages ===
+# =====================================================================
+
+@dataclass(frozen=True)
+class Stage:
+    name: str                              # budget / fallback key (fallbacks.STAGE_BUDGETS)
+    result_key: str                        # key of the agent's payload, and of the pipeline result
+    agent: Callable[[str], dict]           # agent(input) -> {"success", result_key: payload, ...}
+    build_input: Callable[["PipelineRun"], str]  # the agent's input: usually the prompt text, or a dict
+    deps: tuple = ()
+    merge: Callable = None                 # merge(run, payload): fold the payload into earlier results
+
+
+class PipelineRun:
+    """State of one pipeline run: the user input, stage results and instrumentation."""
+
+    def __init__(self, user_input: str, deadline: PipelineDeadline = None, on_event=None, shed: bool = False):
+        self.user_input = user_input
+        # A shed run starts with no budget left, so every stage is served from its template
+        self.deadline = PipelineDeadline(0) if shed else (deadline or PipelineDeadline())
+        self.shed = shed
+        self.results = {}
+        self.degraded = []
+        self.congested = []  # degraded by a timeout or open breaker (fed to admission control)
+        self.timings = {}
+        self.on_event = on_event
+        self._lock = threading.Lock()
+
+    @property
+    def selected(self) -> dict:
+        ideas = self.results.get("ideas") or [{}]
+        return ideas[0]
+
+    @property
+    def title(self) -> str:
+        return self.selected.get("title", self.user_input)
+
+    def emit(self, event: str, **data) -> None:
+        if self.on_event is not None:
+            self.on_event(event, data)
+
+    def result(self) -> dict:
+        return {
+            "ideas": self.results.get("ideas", []),
+            "research": self.results.get("research", {}),
+            "code": self.results.get("code", {}),
+            "deployment": self.results.get("deployment", {}),
+            "presentation": self.results.get("presentation", {}),
+            "validation": self.results.get("validation", {}),
+            "selected_idea": self.selected,
+            "degraded": self.degraded,
+            "shed": self.shed,
+            "timings": self.timings,
+        }
+
+
+def _research_input(run: PipelineRun) -> dict:
+    idea = run.selected
+    return {
+        "prompt": f"{run.title}: {idea.get('pitch', '')}. Tech stack: {idea.get('tech', '')}. Novelty: {idea.get('novelty', '')}",
+        # Web search queries are built from the title alone; the whole paragraph makes poor queries
+        "topic": run.title,
+    }
+
+
+def _coding_input(run: PipelineRun) -> str:
+    idea, research = run.selected, run.results.get("research", {})
+    return f"""
+    Project: {run.title}
+    Description: {idea.get('pitch', '')}
+    Tech Stack: {idea.get('tech', '')}
+    Market Analysis: {research.get('market_analysis', {}).get('target_audience', 'General users')}
+    Technical Requirements: {research.get('technical_requirements', {}).get('scalability', 'Standard scalability')}
+    """
+
+
+def _presentation_input(run: PipelineRun) -> str:
+    idea = run.selected
+    research = run.results.get("research", {})
+    code = run.results.get("code", {})
+    return f"""
+    Project: {run.title}
+    Description: {idea.get('pitch', '')}
+    Tech Stack: {idea.get('tech', '')}
+    Market: {research.get('market_analysis', {}).get('target_audience', 'General users')}
+    Files Generated: {len(code.get('files', []))} files including {', '.join([f.get('path', '') for f in code.get('files', [])[:3]])}
+    """
+
+
+def _merge_repairs(run: PipelineRun, report: dict) -> None:
+    """Swap re-prompted files into the generated code (the report keeps only their paths)."""
+    repairs = report.pop("repairs", None)
+    if repairs:
+        code = run.results.get("code", {})
+        files = [{**f, "content": repairs[f["path"]]} if f.get("path") in repairs else f for f in code.get("files", [])]
+        run.results["code"] = {**code, "files": files}
+
+
+def _tool_agent(stage_name: str, result_key: str, text: str, search_topic: str = None) -> dict:
+    """Run the agents.py worker for a stage and return its JSON in the stage agent's result shape."""
+    import agents  # builds its own LLM and tools; only loaded when PIPELINE_AGENTS=tools
+
+    state = {"messages": [{"role": "user", "content": text}]}
+    if search_topic:
+        state["search_topic"] = search_topic
+    out = agents.WORKER_AGENTS[stage_name](state)
+    content = out["messages"][0]["content"] if out.get("messages") else ""
+    if not content or content.startswith("Error:"):
+        return {"success": False, "error": content or "empty output", result_key: None}
+    try:
+        return {"success": True, result_key: json.loads(content)}
+    except ValueError as e:
+        return {"success": False, "error": f"{stage_name} worker returned invalid JSON: {e}", result_key: None}
+
+
+def _stage_agent(stage_name: str, result_key: str, simple_name: str):
+    # Looked up at call time so tests/benchmarks can swap functions on simple_agents
+    def agent(text):
+        if PIPELINE_AGENTS == "tools":
+            return _tool_agent(stage_name, result_key, text)
+        return getattr(simple_agents, simple_name)(text)
+    return agent
+
+
+def _research_agent(job: dict) -> dict:
+    if PIPELINE_AGENTS == "tools":
+        return _tool_agent("research", "research", job["prompt"], search_topic=job["topic"])
+    return simple_agents.research_agent(job["prompt"], topic=job["topic"])
+
+
+STAGES = (
+    Stage("ideation", "ideas", _stage_agent("ideation", "ideas", "ideation_agent"), lambda run: run.user_input),
+    Stage("research", "research", _research_agent, _research_input, ("ideation",)),
+    Stage("coding", "code", _stage_agent("coding", "code", "coding_agent"), _coding_input, ("ideation", "research")),
+    Stage("validation", "validation", lambda job: simple_agents.validation_agent(job),
+          lambda run: {"project": run.title, "code": run.results.get("code", {})}, ("coding",), _merge_repairs),
+    # With AUTO_DEPLOY=true this triggers a real deploy, so it waits for the final (validated) code
+    Stage("deployment", "deployment", lambda text: simple_agents.deployment_agent(text), lambda run: run.title,
+          ("coding", "validation")),
+    # Needs only the idea, research and file list (deployments report no URL until the build finishes),
+    # so it runs alongside validation and deployment
+    Stage("presentation", "presentation", _stage_agent("presentation", "presentation", "presentation_agent"), _presentation_input,
+          ("research", "coding")),
+)
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+def execute_stage(stage: Stage, run: PipelineRun):
+    """Run one stage under its budget (template fallback on failure) and store its payload on the run."""
+    run.emit("stage_started", stage=stage.name)
+    started = time.perf_counter()
+    fallback_input = run.user_input if stage.name == "ideation" else run.title
+    payload = run_stage(stage.name, stage.agent, stage.build_input(run), stage.result_key,
+                        fallback_input, run.deadline, run.degraded, run.congested)
+    if stage.name == "ideation" and not (isinstance(payload, list) and payload and isinstance(payload[0], dict)):
+        print("❌ Ideation returned an unexpected shape")
+        payload = fallback_ideas(run.user_input)
+        run.degraded.append("ideation")
+
+    elapsed = time.perf_counter() - started
+    with run._lock:
+        run.results[stage.result_key] = payload
+        run.timings[stage.name] = round(elapsed, 3)
+        if stage.merge is not None:
+            stage.merge(run, payload)
+    if not run.shed:
+        admission_controller.observe(stage.name, elapsed, stage.name in run.congested)
+    print(f"✅ {stage.name} done in {elapsed:.1f}s{' (degraded)' if stage.name in run.degraded else ''}")
+    run.emit("stage_completed", stage=stage.name, elapsed=elapsed, degraded=stage.name in run.degraded)
+    return payload
+
+
+def _check_graph(stages) -> None:
+    names = {s.name for s in stages}
+    for stage in stages:
+        missing = set(stage.deps) - names
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages {sorted(missing)}")
+
+
+# =====================================================================
+# === Executors ===
+# =====================================================================
+
+class SyncExecutor:
+    """Stages one after another in declaration order (the baseline)."""
+
+    name = "sync"
+
+    def execute(self, stages, run: PipelineRun) -> None:
+        for stage in stages:
+            execute_stage(stage, run)
+
+
+class ThreadedExecutor:
+    """Each stage starts as soon as its dependencies have finished."""
+
+    name = "threaded"
+
+    def execute(self, stages, run: PipelineRun) -> None:
+        done, running = set(), {}
+        pending = list(stages)
+        while pending or running:
+            for stage in [s for s in pending if set(s.deps) <= done]:
+                pending.remove(stage)
+                running[_executor.submit(execute_stage, stage, run)] = stage.name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done.add(running.pop(future))
+
+
+class AsyncioExecutor:
+    """Dependency schedule on an event loop; blocking stage calls run in threads."""
+
+    name = "asyncio"
+
+    async def aexecute(self, stages, run: PipelineRun) -> None:
+        tasks = {}
+
+        async def run_after_deps(stage):
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+            await asyncio.to_thread(execute_stage, stage, run)
+
+        # Declaration order is a valid topological order, so dependencies already have tasks
+        for stage in stages:
+            tasks[stage.name] = asyncio.ensure_future(run_after_deps(stage))
+        await asyncio.gather(*tasks.values())
+
+    def execute(self, stages, run: PipelineRun) -> None:
+        asyncio.run(self.aexecute(stages, run))
+
+
+class _GraphState(TypedDict):
+    completed: Annotated[list, operator.add]
+
+
+class LangGraphExecutor:
+    """Stages as LangGraph nodes, with one edge per dependency (parallel branches run in one superstep)."""
+
+    name = "langgraph"
+
+    def __init__(self):
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def _graph(self, stages):
+        from langgraph.graph import END, START, StateGraph
+
+        key = tuple(s.name for s in stages)
+        with self._lock:
+            if key in self._compiled:
+                return self._compiled[key]
+            workflow = StateGraph(_GraphState)
+            for stage in stages:
+                def node(state, config, stage=stage):
+                    execute_stage(stage, config["configurable"]["pipeline_run"])
+                    return {"completed": [stage.name]}
+                workflow.add_node(stage.name, node)
+                if stage.deps:
+                    workflow.add_edge(list(stage.deps), stage.name)
+                else:
+                    workflow.add_edge(START, stage.name)
+            has_dependents = {dep for s in stages for dep in s.deps}
+            for stage in stages:
+                if stage.name not in has_dependents:
+                    workflow.add_edge(stage.name, END)
+            self._compiled[key] = workflow.compile()
+            return self._compiled[key]
+
+    def execute(self, stages, run: PipelineRun) -> None:
+        self._graph(stages).invoke({"completed": []}, config={"configurable": {"pipeline_run": run}})
+
+
+EXECUTORS = {
+    "sync": SyncExecutor,
+    "threaded": ThreadedExecutor,
+    "asyncio": AsyncioExecutor,
+    "langgraph": LangGraphExecutor,
+}
+_instances = {}
+
+
+def get_executor(name: str = None):
+    name = name or PIPELINE_EXECUTOR
+    if name not in EXECUTORS:
+        raise ValueError(f"Unknown pipeline executor {name!r} (expected one of {sorted(EXECUTORS)})")
+    if name not in _instances:
+        _instances[name] = EXECUTORS[name]()
+    return _instances[name]
+
+
+# =====================================================================
+# === Entry points ===
+# =====================================================================
+
+def run_pipeline(user_input: str, executor: str = None, stages=STAGES, on_event=None, shed: bool = False) -> dict:
+    """Run the full pipeline and return its results (ideas, research, code, deployment, presentation).
+
+    `shed=True` (admission control turned the run away) returns the template results without calling any agent.
+    """
+    executor = get_executor("sync" if shed else executor)
+    _check_graph(stages)
+    print(f"🚀 Starting hackathon pipeline for: {user_input} ({'shed, templates only' if shed else executor.name + ' executor'})")
+    run = PipelineRun(user_input, on_event=on_event, shed=shed)
+    started = time.perf_counter()
+    executor.execute(stages, run)
+    run.timings["total"] = round(time.perf_counter() - started, 3)
+
+    if run.degraded:
+        print(f"\n⚠️ Degraded stages (template fallback): {', '.join(run.degraded)}")
+    print(f"\n🎉 Hackathon pipeline completed in {run.timings['total']:.1f}s!")
+    return run.result()
+
+
+async def arun_pipeline(user_input: str, stages=STAGES, on_event=None) -> dict:
+    """`run_pipeline` with the asyncio executor, for callers already on an event loop."""
+    _check_graph(stages)
+    run = PipelineRun(user_input, on_event=on_event)
+    started = time.perf_counter()
+    await get_executor("asyncio").aexecute(stages, run)
+    run.timings["total"] = round(time.perf_counter() - started, 3)
+    return run.result()
+
+
+# Graph slot (state.ARTIFACT_SLOTS values) -> pipeline result key
+GRAPH_SLOTS = {"idea": "ideas", "research": "research", "code": "code",
+               "deployment": "deployment", "presentation": "presentation"}
+
+
+def langgraph_agent(stage_name: str):
+    """Worker callable for graph.py: runs the engine's stage on an AgentState.
+
+    Earlier stage outputs are read back from the state's artifact refs, and the
+    stage payload is returned as the JSON message the worker node stores.
+    Stages that only post-process this one (validation after coding) run
+    inside the same worker, since the graph has no node for them. Every node
+    draws on the run's single deadline (`pipeline_expires_at` in the state).
+    """
+    stage = STAGES_BY_NAME[stage_name]
+    followers = [s for s in STAGES if s.merge is not None and s.deps == (stage_name,)]
+
+    def agent(state):
+        from artifacts import load_artifact
+
+        user_input = next(
+            (m.get("content", "") for m in state.get("messages", []) if isinstance(m, dict) and m.get("role") == "user"),
+            "",
+        )
+        if state.get("human_feedback"):
+            user_input = f"{user_input}\nReviewer feedback: {state['human_feedback']}"
+        # One budget for the whole graph run, not a fresh one per node
+        expires_at = state.get("pipeline_expires_at")
+        run = PipelineRun(user_input, deadline=PipelineDeadline.until(expires_at) if expires_at else None)
+        for slot, key in GRAPH_SLOTS.items():
+            if state.get(slot) is not None:
+                run.results[key] = load_artifact(state[slot])
+        execute_stage(stage, run)
+        for follower in followers:
+            execute_stage(follower, run)
+        payload = run.results[stage.result_key]
+        return {"messages": [{"role": "assistant", "content": json.dumps(payload)}], "degraded": run.degraded}
+
+    agent.__name__ = f"{stage_name}_stage"
+    return agent
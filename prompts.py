@@ -0,0 +1,421 @@
+"""
+Prompt template registry.
+
+Every template is compiled once into a static prefix (role, instructions,
+example JSON) and a small variable suffix (the idea, sources, user input).
+Rendering formats only the suffix and appends it to the prefix. So the
+per-call cost is one short str.format, and each call for a template starts
+with the same bytes. That identical prefix is what Gemini's context
+(prefix) caching matches on. Token counts are tracked per template: the
+estimated static/variable split at render time, and the provider-reported
+input, output and cached tokens when a response comes back.
+"""
+
+import inspect
+import json
+import os
+import string
+import threading
+
+from langchain_core.messages import HumanMessage
+
+from circuit_breakers import gemini_breaker
+
+# Rough tokenizer-free estimate (~4 characters per token for English/JSON)
+CHARS_PER_TOKEN = 4
+
+# Per-agent output caps (max_output_tokens); override with e.g. MAX_OUTPUT_TOKENS_CODING=12000, 0 = no cap
+OUTPUT_TOKEN_BUDGETS = {
+    "ideation": int(os.getenv("MAX_OUTPUT_TOKENS_IDEATION", "1024")),
+    "research": int(os.getenv("MAX_OUTPUT_TOKENS_RESEARCH", "2048")),
+    "coding": int(os.getenv("MAX_OUTPUT_TOKENS_CODING", "8192")),
+    "presentation": int(os.getenv("MAX_OUTPUT_TOKENS_PRESENTATION", "1024")),
+    "code_repair": int(os.getenv("MAX_OUTPUT_TOKENS_CODE_REPAIR", "4096")),
+}
+
+_budgeted_models = {}
+_budgeted_lock = threading.Lock()
+
+
+def with_output_budget(llm, max_output_tokens: int):
+    """Copy of `llm` capped at `max_output_tokens` (cached per model and cap)."""
+    if not max_output_tokens:
+        return llm
+    key = (id(llm), max_output_tokens)
+    with _budgeted_lock:
+        capped = _budgeted_models.get(key)
+        if capped is None:
+            capped = _budgeted_models[key] = llm.model_copy(update={"max_output_tokens": max_output_tokens})
+        return capped
+
+
+def clear_output_budgets() -> None:
+    """Drop the capped model copies (they share the client of the model they were copied from)."""
+    with _budgeted_lock:
+        _budgeted_models.clear()
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class PromptTemplate:
+    """A compiled prompt: static prefix + `str.format` suffix."""
+
+    __slots__ = ("name", "prefix", "suffix", "fields", "prefix_tokens", "max_output_tokens")
+
+    def __init__(self, name: str, prefix: str, suffix: str, max_output_tokens: int = 0):
+        self.name = name
+        self.max_output_tokens = max_output_tokens
+        # The prefix is never formatted, so example JSON needs no brace escaping
+        self.prefix = inspect.cleandoc(prefix) + "\n\n"
+        self.suffix = inspect.cleandoc(suffix)
+        self.fields = tuple(f for _, f, _, _ in string.Formatter().parse(self.suffix) if f)
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+    def render_suffix(self, **values) -> str:
+        return self.suffix.format(**values)
+
+    def render(self, **values) -> str:
+        return self.prefix + self.render_suffix(**values)
+
+
+class PromptRegistry:
+    """Named templates plus per-template token accounting."""
+
+    def __init__(self):
+        self._templates: dict[str, PromptTemplate] = {}
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, prefix: str, suffix: str, max_output_tokens: int = 0) -> PromptTemplate:
+        template = PromptTemplate(name, prefix, suffix, max_output_tokens)
+        with self._lock:
+            self._templates[name] = template
+            self._stats.setdefault(name, {
+                "calls": 0, "suffix_tokens": 0,
+                "input_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "reported_calls": 0,
+                "truncated": 0, "early_stops": 0,
+            })
+        return template
+
+    def model_for(self, llm, name: str):
+        """`llm` with the template's output budget applied."""
+        return with_output_budget(llm, self._templates[name].max_output_tokens)
+
+    def __getitem__(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def messages(self, name: str, **values) -> list:
+        """Render a template as a single user message and count its tokens."""
+        template = self._templates[name]
+        suffix = template.render_suffix(**values)
+        with self._lock:
+            stats = self._stats[name]
+            stats["calls"] += 1
+            stats["suffix_tokens"] += estimate_tokens(suffix)
+        return [HumanMessage(content=template.prefix + suffix)]
+
+    def record_usage(self, name: str, response) -> None:
+        """Add the provider-reported token usage of a response (if any) to the template's stats."""
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        details = usage.get("input_token_details") or {}
+        finish_reason = str((getattr(response, "response_metadata", None) or {}).get("finish_reason", ""))
+        with self._lock:
+            stats = self._stats[name]
+            stats["reported_calls"] += 1
+            stats["input_tokens"] += usage.get("input_tokens", 0)
+            stats["output_tokens"] += usage.get("output_tokens", 0)
+            stats["cached_tokens"] += details.get("cache_read", 0) or 0
+            if finish_reason.endswith("MAX_TOKENS"):
+                stats["truncated"] += 1
+        if finish_reason.endswith("MAX_TOKENS"):
+            print(f"⚠️ {name}: output hit max_output_tokens ({self._templates[name].max_output_tokens})")
+
+    def invoke(self, llm, name: str, **values):
+        """Render, call the budgeted model and record usage; returns the model response."""
+        with gemini_breaker.guard():
+            response = self.model_for(llm, name).invoke(self.messages(name, **values))
+        self.record_usage(name, response)
+        return response
+
+    def stream(self, llm, name: str, until=None, **values):
+        """Stream a completion, stopping as soon as `until(text_so_far)` is true.
+
+        Returns (text, stopped_early). Closing the stream early ends generation,
+        so the tokens the model would have produced afterwards are neither waited
+        for nor generated. Without a final usage chunk (always the case when
+        stopped early), input and output tokens are estimated from the text.
+        """
+        text = ""
+        usage_chunk = None
+        stopped = False
+        caller_error = None
+        messages = self.messages(name, **values)
+        with gemini_breaker.guard():
+            for chunk in self.model_for(llm, name).stream(messages):
+                content = chunk.content if isinstance(chunk.content, str) else "".join(
+                    part.get("text", "") if isinstance(part, dict) else str(part) for part in chunk.content
+                )
+                text += content
+                if getattr(chunk, "usage_metadata", None):
+                    usage_chunk = chunk
+                if until is not None:
+                    # A bug in the caller's parser isn't a Gemini failure: re-raise it outside the breaker
+                    try:
+                        stopped = bool(until(text))
+                    except Exception as e:
+                        caller_error = e
+                        break
+                    if stopped:
+                        break
+        if caller_error is not None:
+            raise caller_error
+
+        if usage_chunk is not None and not stopped:
+            self.record_usage(name, usage_chunk)
+        else:
+            with self._lock:
+                stats = self._stats[name]
+                stats["reported_calls"] += 1
+                stats["input_tokens"] += estimate_tokens(messages[0].content)
+                stats["output_tokens"] += estimate_tokens(text)
+                if stopped:
+                    stats["early_stops"] += 1
+        return text, stopped
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for name, template in self._templates.items():
+                s = self._stats[name]
+                reported = s["reported_calls"]
+                out[name] = {
+                    "static_tokens": template.prefix_tokens,
+                    "max_output_tokens": template.max_output_tokens or None,
+                    "calls": s["calls"],
+                    "avg_variable_tokens": round(s["suffix_tokens"] / s["calls"], 1) if s["calls"] else 0.0,
+                    "avg_input_tokens": round(s["input_tokens"] / reported, 1) if reported else None,
+                    "avg_output_tokens": round(s["output_tokens"] / reported, 1) if reported else None,
+                    "cached_token_ratio": round(s["cached_tokens"] / s["input_tokens"], 3) if s["input_tokens"] else None,
+                    "output_tokens": s["output_tokens"],
+                    "billed_input_tokens": s["input_tokens"] - s["cached_tokens"],
+                    "truncated": s["truncated"],
+                    "early_stops": s["early_stops"],
+                }
+            return out
+
+
+prompt_registry = PromptRegistry()
+
+
+# =====================================================================
+# === Streaming JSON ===
+# =====================================================================
+
+class JsonArrayStream:
+    """Incrementally extracts complete objects from a streamed JSON array.
+
+    Tolerates a markdown fence or prose before the opening bracket; strings
+    (including escaped quotes and braces inside them) are tracked so only
+    real object boundaries count.
+    """
+
+    def __init__(self):
+        self.items = []
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> list:
+        """Scan `text` (the whole stream so far) and return all objects parsed so far."""
+        i = self._pos
+        if not self._started:
+            bracket = text.find("[", i)
+            if bracket == -1:
+                self._pos = len(text)
+                return self.items
+            self._started = True
+            i = bracket + 1
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        item = json.loads(text[self._start:i + 1])
+                    except ValueError:
+                        item = None
+                    if isinstance(item, dict):
+                        self.items.append(item)
+            i += 1
+        self._pos = i
+        return self.items
+
+
+# =====================================================================
+# === Pipeline templates (simple_agents.py) ===
+# =====================================================================
+
+prompt_registry.register(
+    "ideation",
+    """
+    You are an ideation expert for hackathon projects.
+
+    Generate 6 distinct, creative hackathon project ideas as a JSON array.
+    Each idea should have: title, pitch (1-2 sentences), tech (technologies used), novelty (what makes it unique).
+
+    Return ONLY valid JSON in this format:
+    [
+        {
+            "title": "Project Name",
+            "pitch": "Brief description of what it does",
+            "tech": "React, Python, AI, etc.",
+            "novelty": "What makes this unique"
+        }
+    ]
+    """,
+    """
+    User input: "{user_input}"
+    """,
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["ideation"],
+)
+
+prompt_registry.register(
+    "research",
+    """
+    You are a research expert specializing in market analysis and project planning.
+
+    Provide comprehensive research analysis as JSON with:
+    - market_analysis: target audience, market size, competition, opportunities
+    - technical_requirements: scalability, security, performance, integrations
+    - project_timeline: phase1, phase2, phase3 with realistic timeframes
+
+    Return ONLY valid JSON:
+    {
+        "market_analysis": {
+            "target_audience": "Specific demographic description",
+            "market_size": "Market size estimate (e.g., $2.5B)",
+            "competition": "Number of competitors and brief analysis",
+            "opportunities": "Key market opportunities and gaps"
+        },
+        "technical_requirements": {
+            "scalability": "Scalability requirements and architecture",
+            "security": "Security requirements and compliance needs",
+            "performance": "Performance benchmarks and requirements",
+            "integrations": "Required integrations and APIs"
+        },
+        "project_timeline": {
+            "phase1": "MVP development timeline (e.g., 2 weeks)",
+            "phase2": "Feature enhancement timeline (e.g., 1 week)",
+            "phase3": "Testing and deployment timeline (e.g., 1 week)"
+        }
+    }
+    """,
+    """
+    {sources}
+    Idea: "{idea}"
+    """,
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["research"],
+)
+
+prompt_registry.register(
+    "coding",
+    """
+    You are a coding expert specializing in modern web development.
+
+    Generate a complete starter codebase as JSON with:
+    - files: array of {path, content} for key files including React components, API routes, and configuration
+    - readme: comprehensive markdown content for README.md
+    - requirements: array of dependencies for both frontend and backend
+
+    Focus on creating a modern web application with:
+    - React/TypeScript frontend
+    - Node.js/Express backend
+    - Proper project structure
+    - Essential configuration files
+
+    Return ONLY valid JSON (PROJECT stands for the project name):
+    {
+        "files": [
+            {"path": "package.json", "content": "{\\"name\\": \\"project-name\\", \\"dependencies\\": {}}"},
+            {"path": "src/App.tsx", "content": "import React from 'react';\\n\\nfunction App() {\\n  return (\\n    <div>\\n      <h1>PROJECT</h1>\\n    </div>\\n  );\\n}\\n\\nexport default App;"},
+            {"path": "src/components/Dashboard.tsx", "content": "import React from 'react';\\n\\nconst Dashboard = () => {\\n  return (\\n    <div>\\n      <h2>PROJECT Dashboard</h2>\\n    </div>\\n  );\\n};\\n\\nexport default Dashboard;"},
+            {"path": "server/app.js", "content": "const express = require('express');\\nconst app = express();\\n\\napp.get('/api/data', (req, res) => {\\n  res.json({ message: 'PROJECT API' });\\n});\\n\\napp.listen(3001, () => console.log('Server running on port 3001'));"}
+        ],
+        "readme": "# PROJECT\\n\\nA modern web application built with React, TypeScript, and Node.js.\\n\\n## Features\\n- Modern React frontend\\n- RESTful API backend\\n- TypeScript support\\n\\n## Getting Started\\n\\n1. Install dependencies\\n2. Start the development server\\n3. Open http://localhost:3000",
+        "requirements": ["react", "typescript", "@types/react", "express", "cors", "dotenv"]
+    }
+    """,
+    """
+    Project details:
+    {idea}
+    """,
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["coding"],
+)
+
+prompt_registry.register(
+    "presentation",
+    """
+    You are a presentation expert.
+
+    Create presentation materials as JSON with:
+    - slides_outline: array of slide titles
+    - pitch: 200-word pitch
+    - demo_script: step-by-step demo script
+    - resources: array of additional resources
+
+    Return ONLY valid JSON:
+    {
+        "slides_outline": ["Title Slide", "Problem", "Solution", "Demo", "Impact", "Next Steps"],
+        "pitch": "200-word compelling pitch about the project...",
+        "demo_script": "1. Show the problem\\n2. Demo the solution\\n3. Show results",
+        "resources": ["GitHub repo", "Live demo", "Documentation"]
+    }
+    """,
+    """
+    Project details:
+    {idea}
+    """,
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["presentation"],
+)
+
+prompt_registry.register(
+    "code_repair",
+    """
+    You are a coding expert fixing one file of a generated codebase that does not parse.
+
+    Fix the reported syntax error and anything else that would stop the file from parsing
+    (unclosed brackets, unterminated strings, truncated code). Keep the file's intent,
+    structure and names; do not add features.
+
+    Return ONLY the corrected file content: no markdown fences, no explanation.
+    """,
+    """
+    Project: {project}
+    File: {path}
+    Error: {error}
+
+    Content:
+    {content}
+    """,
+    max_output_tokens=OUTPUT_TOKEN_BUDGETS["code_repair"],
+)
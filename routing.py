@@ -0,0 +1,197 @@
+"""
+Supervisor routing policies.
+
+The pipeline order is fixed, so most routing decisions are a lookup in a
+precomputed transition table (O(1), microseconds). The LLM supervisor is only
+consulted for ambiguous states: after human-in-the-loop feedback or when the
+last stage failed and may need a retry. Every decision records its latency.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from agents import AgentName, SupervisorOutput, get_supervisor_chain
+
+PIPELINE_ORDER = [
+    AgentName.IDEATION.value,
+    AgentName.RESEARCH_PLANNING.value,
+    AgentName.CODING.value,
+    AgentName.DEPLOYMENT.value,
+    AgentName.PRESENTATION.value,
+    AgentName.FINISH.value,
+]
+
+# last completed stage -> next stage (None = nothing has run yet)
+TRANSITIONS = {None: PIPELINE_ORDER[0]}
+TRANSITIONS.update({stage: nxt for stage, nxt in zip(PIPELINE_ORDER, PIPELINE_ORDER[1:])})
+# Approval happens after research; afterwards the pipeline continues with coding
+TRANSITIONS[AgentName.HUMAN_IN_THE_LOOP.value] = AgentName.CODING.value
+
+STAGE_RESPONSES = {
+    AgentName.IDEATION.value: "Starting with ideation to generate project ideas.",
+    AgentName.RESEARCH_PLANNING.value: "Moving to research and planning phase.",
+    AgentName.CODING.value: "Moving to coding phase to generate codebase.",
+    AgentName.DEPLOYMENT.value: "Moving to deployment phase.",
+    AgentName.PRESENTATION.value: "Moving to presentation phase.",
+    AgentName.FINISH.value: "Pipeline completed successfully!",
+}
+
+VALID_AGENTS = {name.value for name in AgentName if name != AgentName.SUPERVISOR}
+
+MAX_RETRIES = int(os.getenv("SUPERVISOR_MAX_RETRIES", "1"))
+
+
+@dataclass(slots=True)
+class RoutingDecision:
+    next_agent: str
+    response: str
+    policy: str
+    latency_us: float = 0.0
+
+
+def _last_completed(state) -> Optional[str]:
+    last = state.get("last_agent")
+    if last is not None:
+        return last
+    completed = state.get("completed_stages") or []
+    return completed[-1] if completed else None
+
+
+def _last_stage_failed(state) -> bool:
+    """The last worker fell back to its template (or errored); set by the worker node, see graph.py."""
+    return bool(state.get("last_degraded"))
+
+
+# =====================================================================
+# === Policies ===
+# =====================================================================
+
+class TransitionTablePolicy:
+    """Deterministic routing over PIPELINE_ORDER via a precomputed table."""
+
+    name = "table"
+
+    def decide(self, state) -> RoutingDecision:
+        if state.get("status") == "rejected":
+            next_agent = AgentName.FINISH.value
+        else:
+            next_agent = TRANSITIONS.get(_last_completed(state), AgentName.FINISH.value)
+        return RoutingDecision(next_agent, STAGE_RESPONSES[next_agent], self.name)
+
+
+class LLMRoutingPolicy:
+    """Asks the supervisor LLM (structured output) which agent runs next."""
+
+    name = "llm"
+
+    def decide(self, state) -> RoutingDecision:
+        from graph import normalize_messages_for_langchain
+
+        messages = normalize_messages_for_langchain(state.get("messages", []))
+        from circuit_breakers import gemini_breaker
+
+        with gemini_breaker.guard():
+            output = get_supervisor_chain().invoke({"messages": messages})
+        if not isinstance(output, SupervisorOutput) or output.next_agent.value not in VALID_AGENTS:
+            raise ValueError(f"Supervisor returned an invalid route: {output!r}")
+        return RoutingDecision(output.next_agent.value, output.response, self.name)
+
+
+class HybridRoutingPolicy:
+    """Transition table by default; LLM only for HITL feedback or failed stages."""
+
+    name = "hybrid"
+
+    def __init__(self):
+        self.table = TransitionTablePolicy()
+        self.llm = LLMRoutingPolicy()
+
+    def is_ambiguous(self, state) -> bool:
+        if state.get("last_agent") == AgentName.HUMAN_IN_THE_LOOP.value and state.get("human_feedback"):
+            return state.get("status") != "rejected"
+        return _last_stage_failed(state) and state.get("same_agent_count", 0) < MAX_RETRIES
+
+    def decide(self, state) -> RoutingDecision:
+        if self.is_ambiguous(state):
+            try:
+                return self.llm.decide(state)
+            except Exception as e:
+                print(f"[SUPERVISOR] LLM routing failed ({e}), using transition table")
+        return self.table.decide(state)
+
+
+POLICIES = {
+    "table": TransitionTablePolicy,
+    "llm": LLMRoutingPolicy,
+    "hybrid": HybridRoutingPolicy,
+}
+
+
+# =====================================================================
+# === Metrics ===
+# =====================================================================
+
+class RoutingMetrics:
+    """Per-policy decision counts and latency."""
+
+    def __init__(self, history: int = 100):
+        self._lock = threading.Lock()
+        self._by_policy: dict[str, dict] = {}
+        self.recent = deque(maxlen=history)
+
+    def record(self, decision: RoutingDecision) -> None:
+        with self._lock:
+            stats = self._by_policy.setdefault(decision.policy, {"count": 0, "total_us": 0.0, "max_us": 0.0})
+            stats["count"] += 1
+            stats["total_us"] += decision.latency_us
+            stats["max_us"] = max(stats["max_us"], decision.latency_us)
+            self.recent.append((decision.next_agent, decision.policy, decision.latency_us))
+
+    def recent_decisions(self) -> list:
+        """The last `history` decisions, oldest first."""
+        with self._lock:
+            return [
+                {"next_agent": agent, "policy": policy, "latency_us": round(latency, 2)}
+                for agent, policy, latency in self.recent
+            ]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                policy: {
+                    "count": s["count"],
+                    "avg_us": round(s["total_us"] / s["count"], 2) if s["count"] else 0.0,
+                    "max_us": round(s["max_us"], 2),
+                }
+                for policy, s in self._by_policy.items()
+            }
+
+
+def make_policy(name: str):
+    try:
+        return POLICIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown SUPERVISOR_ROUTING policy {name!r}; expected one of {', '.join(POLICIES)}") from None
+
+
+routing_metrics = RoutingMetrics()
+_policy = make_policy(os.getenv("SUPERVISOR_ROUTING", "hybrid"))
+
+
+def set_routing_policy(policy) -> None:
+    """Swap the active policy (any object with `name` and `decide(state) -> RoutingDecision`)."""
+    global _policy
+    _policy = policy
+
+
+def route(state) -> RoutingDecision:
+    """Decide the next agent with the active policy and record how long it took."""
+    started = time.perf_counter()
+    decision = _policy.decide(state)
+    decision.latency_us = (time.perf_counter() - started) * 1e6
+    routing_metrics.record(decision)
+    return decision
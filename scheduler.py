@@ -0,0 +1,329 @@
+"""
+Fair-share scheduling of pipeline runs across clients.
+
+Every pipeline run (POST /api/start-hackathon, background jobs) takes a
+slot from the scheduler before calling Gemini. Three rules decide who goes next:
+
+- Priority classes: "interactive" runs are always dispatched before
+  "batch" runs, and batch may hold at most SCHED_BATCH_SLOTS of the
+  SCHED_MAX_CONCURRENT slots, and never all of them. The remaining slots
+  stay free for interactive users, so their latency holds while batch work
+  runs. (With a single slot, batch waits.)
+- Fair queuing: within a class, clients are served round-robin (one run per
+  client per turn). A client with fifty queued runs therefore delays a
+  newcomer by at most one run per other client.
+- Per-client caps: at most SCHED_PER_CLIENT_CONCURRENCY running and
+  SCHED_MAX_QUEUED_PER_CLIENT queued runs per client; beyond that a submit
+  is refused with QueueFull (HTTP 429 with Retry-After).
+
+A client is identified by its API key (X-API-Key or a bearer token, hashed)
+or else by its IP. Queue position and estimated wait are shown by
+`position()` (GET /api/queue); estimates use a moving average of recent run
+times. State is per process: under gunicorn each worker schedules its own
+runs.
+"""
+
+import math
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+import xxhash
+
+PRIORITIES = ("interactive", "batch")
+
+MAX_CONCURRENT = int(os.getenv("SCHED_MAX_CONCURRENT", "4"))
+BATCH_SLOTS = int(os.getenv("SCHED_BATCH_SLOTS", max(1, MAX_CONCURRENT // 2)))
+PER_CLIENT_CONCURRENCY = int(os.getenv("SCHED_PER_CLIENT_CONCURRENCY", "2"))
+MAX_QUEUED_PER_CLIENT = int(os.getenv("SCHED_MAX_QUEUED_PER_CLIENT", "10"))
+QUEUE_TIMEOUT = float(os.getenv("SCHED_QUEUE_TIMEOUT_SECONDS", "120"))
+INITIAL_RUNTIME = float(os.getenv("SCHED_INITIAL_RUNTIME_SECONDS", "60"))
+TRUST_PROXY = os.getenv("SCHED_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+
+
+class QueueFull(RuntimeError):
+    """The client already has the maximum number of queued runs."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueTimeout(TimeoutError):
+    """A run waited longer than allowed for a slot."""
+
+
+class Ticket:
+    """One pipeline run's place in the scheduler."""
+
+    __slots__ = ("id", "client", "priority", "state", "enqueued_at", "started_at", "finished_at", "_ready")
+
+    def __init__(self, client: str, priority: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.client = client
+        self.priority = priority
+        self.state = "queued"
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self._ready = threading.Event()
+
+    @property
+    def waited(self) -> float:
+        return (self.started_at or time.monotonic()) - self.enqueued_at
+
+
+class FairScheduler:
+    """Slots for pipeline runs, handed out by priority, then round-robin across clients."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, batch_slots: int = BATCH_SLOTS,
+                 per_client: int = PER_CLIENT_CONCURRENCY, max_queued: int = MAX_QUEUED_PER_CLIENT,
+                 history: int = 500):
+        self.max_concurrent = max_concurrent
+        self._batch_share = min(batch_slots, max_concurrent) / max_concurrent
+        self.batch_slots = self._batch_limit(max_concurrent)
+        self.per_client = per_client
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        # priority -> client -> FIFO of tickets; dict order is the round-robin order
+        self._queues = {p: OrderedDict() for p in PRIORITIES}
+        self._running = {}
+        self._running_by_client = Counter()
+        self._running_by_priority = Counter()
+        self._tickets = OrderedDict()
+        self._history = history
+        self._runtime = {p: INITIAL_RUNTIME for p in PRIORITIES}
+        self._waits = {p: deque(maxlen=history) for p in PRIORITIES}
+        self._rejected = Counter()
+        self._timed_out = Counter()
+
+    # ------------------------------------------------------------------
+    # Submit / release
+    # ------------------------------------------------------------------
+
+    def submit(self, client: str, priority: str = "interactive") -> Ticket:
+        """Queue a run for `client`; raises QueueFull past the per-client queue cap."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r} (expected one of {PRIORITIES})")
+        with self._lock:
+            queued = sum(len(q.get(client, ())) for q in self._queues.values())
+            if queued >= self.max_queued:
+                self._rejected[priority] += 1
+                retry_after = self._runtime[priority] * math.ceil(queued / self.per_client)
+                raise QueueFull(f"Client already has {queued} queued runs", retry_after)
+            ticket = Ticket(client, priority)
+            self._queues[priority].setdefault(client, deque()).append(ticket)
+            self._tickets[ticket.id] = ticket
+            while len(self._tickets) > self._history:
+                oldest_id, oldest = next(iter(self._tickets.items()))
+                if oldest.state in ("queued", "running"):
+                    break
+                del self._tickets[oldest_id]
+            self._dispatch()
+        return ticket
+
+    def wait(self, ticket: Ticket, timeout: float = None) -> bool:
+        """Block until the ticket holds a slot; on timeout the ticket is withdrawn and False returned."""
+        if ticket._ready.wait(timeout):
+            return True
+        with self._lock:
+            if ticket.state == "running":  # dispatched right at the deadline
+                return True
+            queue = self._queues[ticket.priority].get(ticket.client)
+            if queue and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.priority][ticket.client]
+            ticket.state = "timed_out"
+            self._timed_out[ticket.priority] += 1
+        return False
+
+    def release(self, ticket: Ticket) -> None:
+        with self._lock:
+            if self._running.pop(ticket.id, None) is None:
+                return
+            ticket.state = "done"
+            ticket.finished_at = time.monotonic()
+            self._running_by_client[ticket.client] -= 1
+            self._running_by_priority[ticket.priority] -= 1
+            if self._running_by_client[ticket.client] <= 0:
+                del self._running_by_client[ticket.client]
+            runtime = ticket.finished_at - ticket.started_at
+            self._runtime[ticket.priority] = 0.8 * self._runtime[ticket.priority] + 0.2 * runtime
+            self._dispatch()
+
+    def _batch_limit(self, max_concurrent: int) -> int:
+        """Batch's share of `max_concurrent` slots: at least one, but never the last one (kept for interactive)."""
+        if self._batch_share <= 0:
+            return 0
+        return min(max_concurrent - 1, max(1, round(max_concurrent * self._batch_share)))
+
+    def set_limit(self, max_concurrent: int) -> None:
+        """Resize the slot pool (admission control); batch keeps its configured share."""
+        with self._lock:
+            self.batch_slots = self._batch_limit(max_concurrent)
+            self.max_concurrent = max_concurrent
+            self._dispatch()
+
+    def load(self) -> dict:
+        """Queued and running counts, for admission decisions."""
+        with self._lock:
+            return {
+                "limit": self.max_concurrent,
+                "running": len(self._running),
+                "queued": {p: sum(len(q) for q in self._queues[p].values()) for p in PRIORITIES},
+            }
+
+    @contextmanager
+    def slot(self, client: str, priority: str = "interactive", timeout: float = QUEUE_TIMEOUT):
+        """Hold a slot for the duration of the block (QueueFull / QueueTimeout if none is granted)."""
+        ticket = self.submit(client, priority)
+        info = self.position(ticket.id)
+        if info and info["state"] == "queued":
+            print(f"⏳ Queued {priority} run for {client} ({info['position']} ahead)")
+        if not self.wait(ticket, timeout):
+            raise QueueTimeout(f"No pipeline slot within {timeout:.0f}s")
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    # ------------------------------------------------------------------
+    # Dispatch (called with the lock held)
+    # ------------------------------------------------------------------
+
+    def _next(self):
+        for priority in PRIORITIES:
+            if priority == "batch" and self._running_by_priority["batch"] >= self.batch_slots:
+                continue
+            queues = self._queues[priority]
+            for client in list(queues):
+                if self._running_by_client[client] >= self.per_client:
+                    continue
+                queue = queues[client]
+                ticket = queue.popleft()
+                if queue:
+                    queues.move_to_end(client)  # served: back of the rotation
+                else:
+                    del queues[client]
+                return ticket
+        return None
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self.max_concurrent:
+            ticket = self._next()
+            if ticket is None:
+                return
+            ticket.state = "running"
+            ticket.started_at = time.monotonic()
+            self._running[ticket.id] = ticket
+            self._running_by_client[ticket.client] += 1
+            self._running_by_priority[ticket.priority] += 1
+            self._waits[ticket.priority].append(ticket.waited)
+            ticket._ready.set()
+
+    # ------------------------------------------------------------------
+    # Visibility
+    # ------------------------------------------------------------------
+
+    def _ahead(self, ticket: Ticket) -> int:
+        """Runs dispatched before `ticket` if the rotation continues as it is now."""
+        queues = self._queues[ticket.priority]
+        own = queues.get(ticket.client, ())
+        index = own.index(ticket) if ticket in own else 0
+        ahead = index
+        before = True
+        for client, queue in queues.items():
+            if client == ticket.client:
+                before = False
+                continue
+            # One run per client per turn: clients earlier in the rotation get index+1 turns first
+            ahead += min(len(queue), index + 1 if before else index)
+        if ticket.priority == "batch":
+            ahead += sum(len(q) for q in self._queues["interactive"].values())
+        return ahead
+
+    def _describe(self, ticket: Ticket) -> dict:
+        info = {
+            "ticket_id": ticket.id,
+            "client": ticket.client,
+            "priority": ticket.priority,
+            "state": ticket.state,
+            "waited_seconds": round(ticket.waited, 2),
+        }
+        if ticket.state == "queued":
+            ahead = self._ahead(ticket)
+            slots = self.batch_slots if ticket.priority == "batch" else self.max_concurrent
+            own = self._queues[ticket.priority].get(ticket.client, ())
+            own_index = own.index(ticket) if ticket in own else 0
+            # Runs are dispatched in waves of `slots`, and this client's own runs in waves of per_client
+            waves = max(math.ceil((ahead + 1) / slots), math.ceil((own_index + 1) / self.per_client))
+            info["position"] = ahead
+            info["estimated_wait_seconds"] = round(waves * self._runtime[ticket.priority], 1)
+        elif ticket.state == "running":
+            info["running_seconds"] = round(time.monotonic() - ticket.started_at, 2)
+        return info
+
+    def position(self, ticket_id: str):
+        with self._lock:
+            ticket = self._tickets.get(ticket_id)
+            return self._describe(ticket) if ticket else None
+
+    def client_tickets(self, client: str) -> list:
+        with self._lock:
+            return [self._describe(t) for t in self._tickets.values()
+                    if t.client == client and t.state in ("queued", "running")]
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_priority = {}
+            for priority in PRIORITIES:
+                waits = sorted(self._waits[priority])
+                by_priority[priority] = {
+                    "queued": sum(len(q) for q in self._queues[priority].values()),
+                    "running": self._running_by_priority[priority],
+                    "clients_waiting": len(self._queues[priority]),
+                    "wait_p50_seconds": round(waits[len(waits) // 2], 2) if waits else 0.0,
+                    "wait_p95_seconds": round(waits[max(0, math.ceil(len(waits) * 0.95) - 1)], 2) if waits else 0.0,
+                    "avg_runtime_seconds": round(self._runtime[priority], 1),
+                    "rejected": self._rejected[priority],
+                    "timed_out": self._timed_out[priority],
+                }
+            return {
+                "max_concurrent": self.max_concurrent,
+                "batch_slots": self.batch_slots,
+                "per_client_concurrency": self.per_client,
+                "max_queued_per_client": self.max_queued,
+                "running": len(self._running),
+                "priorities": by_priority,
+            }
+
+
+pipeline_scheduler = FairScheduler()
+
+
+def client_id(req) -> str:
+    """Scheduling identity for a Flask request: hashed API key, else the client IP."""
+    key = req.headers.get("X-API-Key")
+    auth = req.headers.get("Authorization", "")
+    if not key and auth.lower().startswith("bearer "):
+        key = auth[7:].strip()
+    if key:
+        return f"key:{xxhash.xxh64_hexdigest(key.encode('utf-8'))[:12]}"
+    if TRUST_PROXY and req.headers.get("X-Forwarded-For"):
+        return f"ip:{req.headers['X-Forwarded-For'].split(',')[0].strip()}"
+    return f"ip:{req.remote_addr or 'unknown'}"
+
+
+def request_priority(req, data: dict, default: str = "interactive") -> str:
+    """Priority of a request: `default` is the endpoint's class, set by the server.
+
+    A client may lower its own work to "batch" (body "priority" or X-Priority),
+    but never raise it: an "interactive" claim on a batch endpoint is ignored,
+    or anyone could skip the batch slot cap and batch shedding.
+    """
+    requested = (data or {}).get("priority") or req.headers.get("X-Priority")
+    return "batch" if requested == "batch" else default
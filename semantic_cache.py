@@ -0,0 +1,208 @@
+"""
+Semantic near-duplicate cache for agent outputs.
+
+Prompts like "AI recipe app" and "an AI recipes web app" produce
+interchangeable ideation/research output, so exact-prompt caching misses them.
+This module embeds prompts locally (hashed word + character n-gram features,
+no model download, CPU only) and keeps a NumPy brute-force cosine index per
+namespace. Lookups above the similarity threshold return the stored result.
+"""
+
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import xxhash
+
+# Function words only: product words ("generator", "tool", "app") say what gets built,
+# and dropping them made "code generator" and "code review tool" look alike
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "of", "to", "in", "on", "with", "by", "my", "our",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # very light stemming so "recipes" and "recipe" collide
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def embed(text: str, dim: int = 512) -> np.ndarray:
+    """Return an L2-normalized hashed bag of words + character trigrams."""
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in _tokenize(text):
+        features = [(f"w:{token}", 2.0)]
+        padded = f"#{token}#"
+        features.extend((f"c:{padded[i:i + 3]}", 0.5) for i in range(len(padded) - 2))
+        for feature, weight in features:
+            h = xxhash.xxh64_intdigest(feature.encode("utf-8"))
+            sign = 1.0 if h & 1 else -1.0
+            vec[(h >> 1) % dim] += sign * weight
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+class _Index:
+    """Fixed-capacity vector index for one namespace (brute-force cosine)."""
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.used = np.zeros(capacity, dtype=bool)
+        self.last_access = np.zeros(capacity, dtype=np.float64)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.keys: list[str | None] = [None] * capacity
+        self.values: list = [None] * capacity
+        self.hits = np.zeros(capacity, dtype=np.int64)
+
+    def search(self, query: np.ndarray) -> tuple[int, float]:
+        if not self.used.any():
+            return -1, 0.0
+        scores = self.vectors @ query
+        scores[~self.used] = -1.0
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def free_slot(self) -> tuple[int, bool]:
+        """Return a slot to write into and whether it evicts a live entry (LRU)."""
+        free = np.flatnonzero(~self.used)
+        if free.size:
+            return int(free[0]), False
+        return int(np.argmin(self.last_access)), True
+
+
+class SemanticCache:
+    """Thread-safe semantic cache keyed by (namespace, prompt text)."""
+
+    def __init__(self, threshold: float = 0.85, capacity: int = 256, ttl_seconds: float = 24 * 3600, dim: int = 512, enabled: bool = True):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.dim = dim
+        self._indexes: dict[str, _Index] = {}
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def _namespace(self, namespace: str):
+        if namespace not in self._indexes:
+            self._indexes[namespace] = _Index(self.capacity, self.dim)
+            self._stats[namespace] = {
+                "hits": 0,
+                "exact_hits": 0,
+                "misses": 0,
+                "stores": 0,
+                "evictions": 0,
+                "expired": 0,
+                "hit_similarity_sum": 0.0,
+                "hit_similarity_min": None,
+                "near_misses": 0,
+            }
+        return self._indexes[namespace], self._stats[namespace]
+
+    def lookup(self, namespace: str, text: str):
+        """Return the cached value for the closest stored prompt, or None on a miss."""
+        if not self.enabled:
+            return None
+        query = embed(text, self.dim)
+        now = time.time()
+        with self._lock:
+            index, stats = self._namespace(namespace)
+            slot, score = index.search(query)
+            if slot >= 0 and self.ttl_seconds and now - index.created[slot] > self.ttl_seconds:
+                index.used[slot] = False
+                index.values[slot] = None
+                stats["expired"] += 1
+                slot, score = index.search(query)
+            if slot < 0 or score < self.threshold:
+                stats["misses"] += 1
+                # Misses that were close give a signal for tuning the threshold
+                if slot >= 0 and score >= self.threshold - 0.1:
+                    stats["near_misses"] += 1
+                return None
+            index.last_access[slot] = now
+            index.hits[slot] += 1
+            stats["hits"] += 1
+            if index.keys[slot] == text:
+                stats["exact_hits"] += 1
+            stats["hit_similarity_sum"] += score
+            if stats["hit_similarity_min"] is None or score < stats["hit_similarity_min"]:
+                stats["hit_similarity_min"] = score
+            print(f"⚡ Semantic cache hit [{namespace}] ({score:.2f}): {text[:60]!r} ~ {index.keys[slot][:60]!r}")
+            return index.values[slot]
+
+    def store(self, namespace: str, text: str, value) -> None:
+        """Store a value for a prompt, replacing a near-identical entry or evicting the LRU one."""
+        if not self.enabled:
+            return
+        vector = embed(text, self.dim)
+        now = time.time()
+        with self._lock:
+            index, stats = self._namespace(namespace)
+            slot, score = index.search(vector)
+            if slot < 0 or score < 0.999:
+                slot, evicted = index.free_slot()
+                if evicted:
+                    stats["evictions"] += 1
+            index.vectors[slot] = vector
+            index.used[slot] = True
+            index.keys[slot] = text
+            index.values[slot] = value
+            index.created[slot] = now
+            index.last_access[slot] = now
+            index.hits[slot] = 0
+            stats["stores"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._stats.clear()
+
+    def stats(self) -> dict:
+        """Per-namespace hit/miss counts and hit-quality (similarity) metrics."""
+        with self._lock:
+            out = {}
+            for namespace, stats in self._stats.items():
+                index = self._indexes[namespace]
+                lookups = stats["hits"] + stats["misses"]
+                out[namespace] = {
+                    "size": int(index.used.sum()),
+                    "capacity": self.capacity,
+                    "threshold": self.threshold,
+                    "hits": stats["hits"],
+                    "exact_hits": stats["exact_hits"],
+                    "misses": stats["misses"],
+                    "near_misses": stats["near_misses"],
+                    "stores": stats["stores"],
+                    "evictions": stats["evictions"],
+                    "expired": stats["expired"],
+                    "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                    "avg_hit_similarity": round(stats["hit_similarity_sum"] / stats["hits"], 4) if stats["hits"] else None,
+                    "min_hit_similarity": round(stats["hit_similarity_min"], 4) if stats["hit_similarity_min"] is not None else None,
+                    "top_entries": [
+                        {"prompt": index.keys[i], "hits": int(index.hits[i])}
+                        for i in np.argsort(-index.hits)[:5]
+                        if index.used[i] and index.hits[i] > 0
+                    ],
+                }
+            return out
+
+
+# Shared instance used by the agents (tune via environment)
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85")),
+    capacity=int(os.getenv("SEMANTIC_CACHE_CAPACITY", "256")),
+    ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(24 * 3600))),
+    enabled=os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() not in ("0", "false", "no"),
+)
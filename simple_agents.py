@@ -1,8 +1,17 @@
 import os
 import json
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from prompts import JsonArrayStream, prompt_registry
+from semantic_cache import semantic_cache
+from web_research import research_digest
+from deployments import deployment_stage
+from circuit_breakers import CircuitOpen
+from code_validation import validate_files
+from fallbacks import STAGE_BUDGETS
 
 load_dotenv()
 
@@ -11,80 +20,82 @@ gemini_api_key = os.getenv("GOOGLE_API_KEY")
 if not gemini_api_key:
     raise ValueError("GOOGLE_API_KEY environment variable is required")
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    google_api_key=gemini_api_key,
-    temperature=0.1,
-    convert_system_message_to_human=True
-)
+def make_llm():
+    """A new Gemini client (gunicorn's post_fork calls this so each worker gets its own gRPC channel)."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-1.5-flash",
+        google_api_key=gemini_api_key,
+        temperature=0.1,
+        convert_system_message_to_human=True
+    )
+
+llm = make_llm()
+
+# Stop streaming ideation once this many ideas have parsed (0 = generate all six, no streaming)
+IDEATION_STOP_AFTER = int(os.getenv("IDEATION_STOP_AFTER", "3"))
+
+# At most this many failing files are re-prompted per run (0 = report only, never re-prompt)
+VALIDATION_MAX_REPAIRS = int(os.getenv("VALIDATION_MAX_REPAIRS", "5"))
+
+_repair_executor = ThreadPoolExecutor(max_workers=max(VALIDATION_MAX_REPAIRS, 1), thread_name_prefix="repair")
+
+def _valid_ideas(items: list) -> list:
+    return [item for item in items if isinstance(item, dict) and item.get("title") and item.get("pitch")]
 
 def ideation_agent(user_input: str) -> dict:
     """Generate 6 hackathon project ideas based on user input."""
-    prompt = f"""
-    You are an ideation expert for hackathon projects. Given the user input: "{user_input}"
-    
-    Generate 6 distinct, creative hackathon project ideas as a JSON array.
-    Each idea should have: title, pitch (1-2 sentences), tech (technologies used), novelty (what makes it unique).
-    
-    Return ONLY valid JSON in this format:
-    [
-        {{
-            "title": "Project Name",
-            "pitch": "Brief description of what it does",
-            "tech": "React, Python, AI, etc.",
-            "novelty": "What makes this unique"
-        }}
-    ]
-    """
-    
+    cached = semantic_cache.lookup("ideation", user_input)
+    if cached is not None:
+        return {"success": True, "ideas": cached, "cached": True}
+
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        # Try to parse JSON from response
-        content = response.content.strip()
-        if content.startswith('```json'):
-            content = content[7:-3].strip()
-        elif content.startswith('```'):
-            content = content[3:-3].strip()
+        if IDEATION_STOP_AFTER > 0:
+            # Only the first idea drives the pipeline: stop generating once enough have parsed
+            stream = JsonArrayStream()
+            content, stopped = prompt_registry.stream(
+                llm, "ideation", user_input=user_input,
+                until=lambda text: len(_valid_ideas(stream.feed(text))) >= IDEATION_STOP_AFTER,
+            )
+            parsed = _valid_ideas(stream.feed(content))
+            if stopped:
+                print(f"✂️ Ideation stopped after {len(parsed)} ideas")
+            if not parsed:
+                raise ValueError("no valid ideas in model output")
+        else:
+            response = prompt_registry.invoke(llm, "ideation", user_input=user_input)
+            # Try to parse JSON from response
+            content = response.content.strip()
+            if content.startswith('```json'):
+                content = content[7:-3].strip()
+            elif content.startswith('```'):
+                content = content[3:-3].strip()
+            parsed = json.loads(content)
         
-        parsed = json.loads(content)
+        semantic_cache.store("ideation", user_input, parsed)
         return {"success": True, "ideas": parsed}
+    except CircuitOpen:
+        raise  # run_stage counts an open breaker as congestion, unlike a bad answer
     except Exception as e:
         return {"success": False, "error": str(e), "ideas": []}
 
-def research_agent(idea: str) -> dict:
-    """Research the given idea and provide market analysis, technical requirements, and project timeline."""
-    prompt = f"""
-    You are a research expert specializing in market analysis and project planning. For the idea: "{idea}"
-    
-    Provide comprehensive research analysis as JSON with:
-    - market_analysis: target audience, market size, competition, opportunities
-    - technical_requirements: scalability, security, performance, integrations
-    - project_timeline: phase1, phase2, phase3 with realistic timeframes
-    
-    Return ONLY valid JSON:
-    {{
-        "market_analysis": {{
-            "target_audience": "Specific demographic description",
-            "market_size": "Market size estimate (e.g., $2.5B)",
-            "competition": "Number of competitors and brief analysis",
-            "opportunities": "Key market opportunities and gaps"
-        }},
-        "technical_requirements": {{
-            "scalability": "Scalability requirements and architecture",
-            "security": "Security requirements and compliance needs",
-            "performance": "Performance benchmarks and requirements",
-            "integrations": "Required integrations and APIs"
-        }},
-        "project_timeline": {{
-            "phase1": "MVP development timeline (e.g., 2 weeks)",
-            "phase2": "Feature enhancement timeline (e.g., 1 week)",
-            "phase3": "Testing and deployment timeline (e.g., 1 week)"
-        }}
-    }}
+def research_agent(idea: str, topic: str = None) -> dict:
+    """Research the given idea and provide market analysis, technical requirements, and project timeline.
+
+    `topic` (e.g. the project title) is what gets searched on the web; defaults to `idea`.
     """
-    
+    cached = semantic_cache.lookup("research", idea)
+    if cached is not None:
+        return {"success": True, "research": cached, "cached": True}
+
+    try:
+        digest = research_digest(topic or idea)
+    except Exception as e:
+        print(f"⚠️ Web research failed: {e}")
+        digest = ""
+    sources = f"Ground your analysis in these web search results (cite them where relevant):\n{digest}\n" if digest else ""
+
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = prompt_registry.invoke(llm, "research", idea=idea, sources=sources)
         content = response.content.strip()
         if content.startswith('```json'):
             content = content[7:-3].strip()
@@ -92,41 +103,17 @@ def research_agent(idea: str) -> dict:
             content = content[3:-3].strip()
         
         parsed = json.loads(content)
+        semantic_cache.store("research", idea, parsed)
         return {"success": True, "research": parsed}
+    except CircuitOpen:
+        raise
     except Exception as e:
         return {"success": False, "error": str(e), "research": {}}
 
 def coding_agent(idea: str) -> dict:
     """Generate starter code for the idea with React/TypeScript frontend and Node.js backend."""
-    prompt = f"""
-    You are a coding expert specializing in modern web development. For the idea: "{idea}"
-    
-    Generate a complete starter codebase as JSON with:
-    - files: array of {{path, content}} for key files including React components, API routes, and configuration
-    - readme: comprehensive markdown content for README.md
-    - requirements: array of dependencies for both frontend and backend
-    
-    Focus on creating a modern web application with:
-    - React/TypeScript frontend
-    - Node.js/Express backend
-    - Proper project structure
-    - Essential configuration files
-    
-    Return ONLY valid JSON:
-    {{
-        "files": [
-            {{"path": "package.json", "content": "{{\\"name\\": \\"project-name\\", \\"dependencies\\": {{}}}}"}},
-            {{"path": "src/App.tsx", "content": "import React from 'react';\\n\\nfunction App() {{\\n  return (\\n    <div>\\n      <h1>{idea}</h1>\\n    </div>\\n  );\\n}}\\n\\nexport default App;"}},
-            {{"path": "src/components/Dashboard.tsx", "content": "import React from 'react';\\n\\nconst Dashboard = () => {{\\n  return (\\n    <div>\\n      <h2>{idea} Dashboard</h2>\\n    </div>\\n  );\\n}};\\n\\nexport default Dashboard;"}},
-            {{"path": "server/app.js", "content": "const express = require('express');\\nconst app = express();\\n\\napp.get('/api/data', (req, res) => {{\\n  res.json({{ message: '{idea} API' }});\\n}});\\n\\napp.listen(3001, () => console.log('Server running on port 3001'));"}}
-        ],
-        "readme": "# {idea}\\n\\nA modern web application built with React, TypeScript, and Node.js.\\n\\n## Features\\n- Modern React frontend\\n- RESTful API backend\\n- TypeScript support\\n\\n## Getting Started\\n\\n1. Install dependencies\\n2. Start the development server\\n3. Open http://localhost:3000",
-        "requirements": ["react", "typescript", "@types/react", "express", "cors", "dotenv"]
-    }}
-    """
-    
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = prompt_registry.invoke(llm, "coding", idea=idea)
         content = response.content.strip()
         if content.startswith('```json'):
             content = content[7:-3].strip()
@@ -135,78 +122,76 @@ def coding_agent(idea: str) -> dict:
         
         parsed = json.loads(content)
         return {"success": True, "code": parsed}
+    except CircuitOpen:
+        raise
     except Exception as e:
         return {"success": False, "error": str(e), "code": {}}
 
-def deployment_agent(idea: str) -> dict:
-    """Deploy the project using Vercel deploy hook."""
-    prompt = f"""
-    You are a deployment expert. For the idea: "{idea}"
-    
-    Provide deployment information as JSON with:
-    - deployment_url: the live URL where the project is deployed
-    - deployment_status: success/failed/pending
-    - build_logs: array of build process messages
-    - environment_variables: key-value pairs of environment variables
-    - monitoring: basic monitoring info like uptime, response time, error rate
-    
-    Return ONLY valid JSON:
-    {{
-        "deployment_url": "https://{idea.lower().replace(' ', '-')}.vercel.app",
-        "deployment_status": "success",
-        "build_logs": [
-            "✅ Dependencies installed",
-            "✅ TypeScript compilation successful", 
-            "✅ Build optimization completed",
-            "✅ Deployment to Vercel successful"
-        ],
-        "environment_variables": {{
-            "REACT_APP_API_URL": "https://api.example.com",
-            "REACT_APP_ENVIRONMENT": "production"
-        }},
-        "monitoring": {{
-            "uptime": "99.9%",
-            "response_time": "120ms",
-            "error_rate": "0.1%"
-        }}
-    }}
+def repair_file(project: str, path: str, content: str, error: str) -> str:
+    """Re-prompt for one file that failed validation; returns the new content."""
+    response = prompt_registry.invoke(llm, "code_repair", project=project, path=path, error=error, content=content)
+    fixed = response.content.strip()
+    if fixed.startswith('```'):
+        fixed = fixed.split('\n', 1)[1] if '\n' in fixed else ''
+        if fixed.rstrip().endswith('```'):
+            fixed = fixed.rstrip()[:-3]
+    return fixed.rstrip() + '\n'
+
+def validation_agent(job: dict) -> dict:
+    """Check the generated files' syntax (code_validation.py) and re-prompt only the files that fail.
+
+    `job` is {"project", "code"}. Repaired contents are returned under "repairs" for the pipeline to merge.
     """
-    
-    try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        content = response.content.strip()
-        if content.startswith('```json'):
-            content = content[7:-3].strip()
-        elif content.startswith('```'):
-            content = content[3:-3].strip()
-        
-        parsed = json.loads(content)
-        return {"success": True, "deployment": parsed}
-    except Exception as e:
-        return {"success": False, "error": str(e), "deployment": {}}
+    files = job["code"].get("files", [])
+    started = time.monotonic()
+    report = validate_files(files)
+    contents = {f.get("path"): f.get("content") for f in files}
+    repairs = {}
+
+    to_repair = report["failed"][:VALIDATION_MAX_REPAIRS]
+    if to_repair:
+        print(f"🔧 Re-prompting {len(to_repair)} file(s) that failed validation: {', '.join(f['path'] for f in to_repair)}")
+        futures = {
+            _repair_executor.submit(contextvars.copy_context().run, repair_file,
+                                    job["project"], f["path"], contents[f["path"]], f["error"]): f["path"]
+            for f in to_repair
+        }
+        # Leave a second of the stage budget for re-validating the answers
+        done, _ = wait(futures, timeout=max(0.0, STAGE_BUDGETS["validation"] - (time.monotonic() - started) - 1.0))
+        candidates = []
+        for future in done:
+            try:
+                candidates.append({"path": futures[future], "content": future.result()})
+            except Exception as e:
+                print(f"⚠️ Repair of {futures[future]} failed: {e}")
+        recheck = validate_files(candidates, timeout=1.0) if candidates else {"failed": [], "timed_out": []}
+        still_broken = {f["path"] for f in recheck["failed"]} | set(recheck["timed_out"])
+        repairs = {c["path"]: c["content"] for c in candidates if c["path"] not in still_broken}
+
+    for f in report["failed"]:
+        f["repaired"] = f["path"] in repairs
+    unresolved = [f for f in report["failed"] if not f["repaired"]]
+    if unresolved:
+        status = "failed"
+    elif report["failed"]:
+        status = "repaired"
+    else:
+        status = "partial" if report["timed_out"] else "passed"
+    return {"success": True, "validation": {
+        **report,
+        "status": status,
+        "repaired": sorted(repairs),
+        "repairs": repairs,
+    }}
+
+def deployment_agent(idea: str) -> dict:
+    """Report real deployment state (see deployments.py); no LLM involved."""
+    return {"success": True, "deployment": deployment_stage(idea)}
 
 def presentation_agent(idea: str) -> dict:
     """Generate presentation materials for the idea."""
-    prompt = f"""
-    You are a presentation expert. For the idea: "{idea}"
-    
-    Create presentation materials as JSON with:
-    - slides_outline: array of slide titles
-    - pitch: 200-word pitch
-    - demo_script: step-by-step demo script
-    - resources: array of additional resources
-    
-    Return ONLY valid JSON:
-    {{
-        "slides_outline": ["Title Slide", "Problem", "Solution", "Demo", "Impact", "Next Steps"],
-        "pitch": "200-word compelling pitch about the project...",
-        "demo_script": "1. Show the problem\\n2. Demo the solution\\n3. Show results",
-        "resources": ["GitHub repo", "Live demo", "Documentation"]
-    }}
-    """
-    
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = prompt_registry.invoke(llm, "presentation", idea=idea)
         content = response.content.strip()
         if content.startswith('```json'):
             content = content[7:-3].strip()
@@ -215,101 +200,16 @@ def presentation_agent(idea: str) -> dict:
         
         parsed = json.loads(content)
         return {"success": True, "presentation": parsed}
+    except CircuitOpen:
+        raise
     except Exception as e:
         return {"success": False, "error": str(e), "presentation": {}}
 
-def run_hackathon_pipeline(user_input: str):
-    """Run the complete hackathon pipeline with agent chaining."""
-    print(f"🚀 Starting hackathon pipeline for: {user_input}")
-    
-    # Step 1: Ideation
-    print("\n🧠 Step 1: Ideation")
-    ideation_result = ideation_agent(user_input)
-    if not ideation_result["success"]:
-        print(f"❌ Ideation failed: {ideation_result['error']}")
-        return {"error": "Ideation failed", "ideas": [], "research": {}, "code": {}, "presentation": {}}
-    
-    ideas = ideation_result["ideas"]
-    print(f"✅ Generated {len(ideas)} ideas:")
-    for i, idea in enumerate(ideas[:3], 1):  # Show first 3
-        print(f"  {i}. {idea['title']}: {idea['pitch']}")
-    
-    # Pick the first idea for the pipeline
-    selected_idea = ideas[0]["title"]
-    selected_idea_details = ideas[0]
-    print(f"\n🎯 Selected idea: {selected_idea}")
-    
-    # Step 2: Research (using selected idea details)
-    print("\n🔍 Step 2: Research")
-    research_input = f"{selected_idea}: {selected_idea_details['pitch']}. Tech stack: {selected_idea_details['tech']}. Novelty: {selected_idea_details['novelty']}"
-    research_result = research_agent(research_input)
-    if research_result["success"]:
-        research = research_result["research"]
-        print(f"✅ Research completed: Market analysis, technical requirements, and timeline generated")
-    else:
-        print(f"❌ Research failed: {research_result['error']}")
-        research = {}
-    
-    # Step 3: Coding (using selected idea + research insights)
-    print("\n💻 Step 3: Coding")
-    coding_input = f"""
-    Project: {selected_idea}
-    Description: {selected_idea_details['pitch']}
-    Tech Stack: {selected_idea_details['tech']}
-    Market Analysis: {research.get('market_analysis', {}).get('target_audience', 'General users')}
-    Technical Requirements: {research.get('technical_requirements', {}).get('scalability', 'Standard scalability')}
-    """
-    coding_result = coding_agent(coding_input)
-    if coding_result["success"]:
-        code = coding_result["code"]
-        print(f"✅ Generated {len(code.get('files', []))} files, README, and requirements")
-    else:
-        print(f"❌ Coding failed: {coding_result['error']}")
-        code = {}
-    
-    # Step 4: Deployment (using selected idea + code)
-    print("\n🚀 Step 4: Deployment")
-    deployment_input = f"""
-    Project: {selected_idea}
-    Description: {selected_idea_details['pitch']}
-    Tech Stack: {selected_idea_details['tech']}
-    Files Generated: {len(code.get('files', []))} files including {', '.join([f.get('path', '') for f in code.get('files', [])[:3]])}
-    """
-    deployment_result = deployment_agent(deployment_input)
-    if deployment_result["success"]:
-        deployment = deployment_result["deployment"]
-        print(f"✅ Deployment completed: {deployment.get('deployment_url', 'URL not available')}")
-    else:
-        print(f"❌ Deployment failed: {deployment_result['error']}")
-        deployment = {}
-    
-    # Step 5: Presentation (using all previous outputs)
-    print("\n🎤 Step 5: Presentation")
-    presentation_input = f"""
-    Project: {selected_idea}
-    Description: {selected_idea_details['pitch']}
-    Tech Stack: {selected_idea_details['tech']}
-    Market: {research.get('market_analysis', {}).get('target_audience', 'General users')}
-    Files Generated: {len(code.get('files', []))} files including {', '.join([f.get('path', '') for f in code.get('files', [])[:3]])}
-    Deployment URL: {deployment.get('deployment_url', 'Not deployed')}
-    """
-    presentation_result = presentation_agent(presentation_input)
-    if presentation_result["success"]:
-        presentation = presentation_result["presentation"]
-        print(f"✅ Created {len(presentation.get('slides_outline', []))} slides and pitch")
-    else:
-        print(f"❌ Presentation failed: {presentation_result['error']}")
-        presentation = {}
-    
-    print("\n🎉 Hackathon pipeline completed!")
-    return {
-        "ideas": ideas,
-        "research": research,
-        "code": code,
-        "deployment": deployment,
-        "presentation": presentation,
-        "selected_idea": selected_idea_details
-    }
+def run_hackathon_pipeline(user_input: str, executor: str = None):
+    """Run the complete hackathon pipeline (see pipeline.py for the stages and executors)."""
+    from pipeline import run_pipeline
+
+    return run_pipeline(user_input, executor=executor)
 
 if __name__ == "__main__":
     user_input = input("Enter your hackathon project idea: ")
@@ -6,17 +6,26 @@ Simple Flask server to serve the HackathonAgent frontend and API.
 import os
 import json
 import uuid
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-from simple_agents import run_hackathon_pipeline
+from pipeline import run_pipeline
+from static_assets import StaticAssetIndex
+from scheduler import pipeline_scheduler, client_id, request_priority, QueueFull, QueueTimeout
+from admission import admission_controller
 
 load_dotenv()
 
+# CASSETTE_MODE=record|replay|once records/replays LLM and HTTP calls (cassettes.py)
+from cassettes import install_from_env
+install_from_env("backend")
+
 # Create Flask app
 app = Flask(__name__)
 CORS(app)
 
+static_assets = StaticAssetIndex(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'out'))
+
 # Store sessions in memory (in production, use Redis or database)
 sessions = {}
 
@@ -24,7 +33,7 @@ sessions = {}
 @app.route('/')
 def index():
     """Serve the main page."""
-    return send_file('frontend/out/index.html')
+    return static_assets.serve('', request)
 
 @app.route('/<path:path>')
 def serve_static(path):
@@ -33,15 +42,8 @@ def serve_static(path):
     if path.startswith('api/'):
         return "API endpoint not found", 404
     
-    # Try to serve the file
-    try:
-        return send_file(f'frontend/out/{path}')
-    except FileNotFoundError:
-        # For SPA routing, serve index.html
-        try:
-            return send_file('frontend/out/index.html')
-        except FileNotFoundError:
-            return "Frontend not found", 404
+    # Indexed lookup with SPA fallback to index.html
+    return static_assets.serve(path, request)
 
 @app.route('/api/start-hackathon', methods=['POST'])
 def start_hackathon():
@@ -56,9 +58,21 @@ def start_hackathon():
         # Create a new session
         session_id = str(uuid.uuid4())
         
-        # Run the hackathon pipeline
-        print(f"🚀 Starting hackathon for: {user_input}")
-        result = run_hackathon_pipeline(user_input)
+        # Run the hackathon pipeline once the scheduler grants a slot (templates only when shed)
+        priority = request_priority(request, data)
+        if admission_controller.admit(priority) == 'shed':
+            if priority == 'batch':
+                return jsonify({'error': 'Server overloaded, retry later'}), 503, {'Retry-After': str(admission_controller.retry_after())}
+            result = run_pipeline(user_input, shed=True)
+        else:
+            try:
+                with pipeline_scheduler.slot(client_id(request), priority):
+                    print(f"🚀 Starting hackathon for: {user_input}")
+                    result = run_pipeline(user_input)
+            except QueueFull as e:
+                return jsonify({'error': str(e)}), 429, {'Retry-After': str(max(1, round(e.retry_after)))}
+            except QueueTimeout as e:
+                return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
         
         # Store the session
         sessions[session_id] = {
@@ -67,105 +81,25 @@ def start_hackathon():
             'status': 'completed'
         }
         
-        # Extract the generated content from simple_agents.py result
-        generated_content = []
-        
-        # Add ideas (index 0)
-        if result.get('ideas'):
-            generated_content.append(result['ideas'])
-        
-        # Add research (index 1) 
-        if result.get('research'):
-            generated_content.append(result['research'])
-        
-        # Add code (index 2)
-        if result.get('code'):
-            generated_content.append(result['code'])
-        
-        # Add deployment placeholder (index 3)
-        generated_content.append({
-            "deployment_url": "https://hackathon-demo.example.com",
-            "status": "deployed"
-        })
-        
-        # Add presentation (index 4)
-        if result.get('presentation'):
-            generated_content.append(result['presentation'])
-        
-        # If no content was extracted, create mock data for demo
-        if not generated_content:
-            print("⚠️ No content extracted, using mock data for demo")
-            generated_content = [
-                # Ideation output
-                [
-                    {
-                        "title": f"{user_input} - Smart Solution",
-                        "pitch": f"A revolutionary {user_input.lower()} that leverages AI to solve real-world problems.",
-                        "tech": "React, Node.js, Python, PostgreSQL, Docker",
-                        "novelty": "First-of-its-kind integration of machine learning with intuitive user interface"
-                    },
-                    {
-                        "title": f"{user_input} - Enterprise Edition", 
-                        "pitch": f"An enterprise-grade {user_input.lower()} solution designed for scalability.",
-                        "tech": "Next.js, TypeScript, AWS, Kubernetes, Redis",
-                        "novelty": "Advanced microservices architecture with real-time analytics"
-                    }
-                ],
-                # Research output
-                {
-                    "market_analysis": {
-                        "target_audience": "Tech-savvy professionals aged 25-45",
-                        "market_size": "$2.5B",
-                        "competition": "3 major competitors identified",
-                        "opportunities": "Growing demand for AI-powered solutions"
-                    },
-                    "technical_requirements": {
-                        "scalability": "Support for 10,000+ concurrent users",
-                        "security": "End-to-end encryption, GDPR compliance", 
-                        "performance": "Sub-200ms response times",
-                        "integrations": "REST APIs, webhooks, third-party services"
-                    },
-                    "project_timeline": {
-                        "phase1": "MVP development (2 weeks)",
-                        "phase2": "Feature enhancement (1 week)",
-                        "phase3": "Testing and deployment (1 week)"
-                    }
-                },
-                # Coding output
-                {
-                    "files": [
-                        {
-                            "path": "src/App.tsx",
-                            "content": f"import React from 'react';\n\nfunction App() {{\n  return (\n    <div className=\"App\">\n      <header className=\"App-header\">\n        <h1>{user_input}</h1>\n      </header>\n    </div>\n  );\n}}\n\nexport default App;"
-                        },
-                        {
-                            "path": "src/components/Dashboard.tsx", 
-                            "content": f"import React from 'react';\n\nconst Dashboard = () => {{\n  return (\n    <div className=\"dashboard\">\n      <h2>{user_input} Dashboard</h2>\n    </div>\n  );\n}};\n\nexport default Dashboard;"
-                        }
-                    ]
-                },
-                # Deployment output
-                {
-                    "deployment_url": "https://hackathon-demo.example.com",
-                    "status": "deployed"
-                },
-                # Presentation output
-                {
-                    "slides_outline": [
-                        {"title": "Problem Statement", "content": f"The challenge with {user_input.lower()}"},
-                        {"title": "Our Solution", "content": f"How we solve {user_input.lower()} with AI"},
-                        {"title": "Demo", "content": "Live demonstration of the solution"},
-                        {"title": "Impact", "content": "Real-world impact and benefits"},
-                        {"title": "Next Steps", "content": "Future roadmap and scaling plans"}
-                    ]
-                }
-            ]
+        # Every stage is filled (degraded stages come from fallbacks.py templates),
+        # so the frontend can rely on the positional layout
+        generated_content = [
+            result['ideas'],         # index 0
+            result['research'],      # index 1
+            result['code'],          # index 2
+            result['deployment'],    # index 3
+            result['presentation'],  # index 4
+        ]
+        degraded = result.get('degraded', [])
+        if degraded:
+            print(f"⚠️ Degraded stages served from templates: {', '.join(degraded)}")
         
         return jsonify({
             'session_id': session_id,
             'status': 'completed',
             'idea': user_input,
             'generated_content': generated_content,
+            'degraded': degraded,
             'summary': {
                 'ideation': 'Project ideas generated',
                 'research': 'Research and planning completed', 
@@ -191,7 +125,9 @@ def get_session(session_id):
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'message': 'HackathonAgent API is running'})
+    health = admission_controller.health()
+    return jsonify({'status': health['status'], 'message': 'HackathonAgent API is running',
+                    'admission': health}), 503 if health['status'] == 'overloaded' else 200
 
 if __name__ == '__main__':
     print("🚀 Starting HackathonAgent Backend API...")
@@ -10,7 +10,17 @@ import time
 import webbrowser
 from pathlib import Path
 
-def start_hackathon_agent():
+def start_production_server(project_dir: Path):
+    """Replace this process with a multi-worker gunicorn server (see gunicorn.conf.py)."""
+    print("🏭 Production mode: gunicorn with preloaded app")
+    os.chdir(project_dir)
+    try:
+        os.execvp("gunicorn", ["gunicorn", "-c", str(project_dir / "gunicorn.conf.py"), "wsgi:app"])
+    except FileNotFoundError:
+        print("❌ gunicorn not found. Install it with: pip install gunicorn")
+        return False
+
+def start_hackathon_agent(production: bool = False):
     """Start the complete HackathonAgent system."""
     print("🚀 Starting HackathonAgent - Complete Full-Stack Application")
     print("=" * 60)
@@ -50,6 +60,9 @@ def start_hackathon_agent():
     
     # Start the backend server
     print("\n🌐 Starting backend server...")
+    if production:
+        return start_production_server(project_dir)
+
     try:
         # Import and start the Flask app
         sys.path.append(str(project_dir))
@@ -79,5 +92,5 @@ def start_hackathon_agent():
         return False
 
 if __name__ == "__main__":
-    success = start_hackathon_agent()
+    success = start_hackathon_agent(production="--production" in sys.argv)
     sys.exit(0 if success else 1)
@@ -1,35 +1,67 @@
 # state.py
-from typing import TypedDict, List, Union, Dict, Optional
+import operator
+import time
+from dataclasses import dataclass
+from typing import Annotated, TypedDict, List, Union, Dict, Optional
 from langchain_core.messages import BaseMessage, HumanMessage
 
+from fallbacks import PIPELINE_BUDGET
+
 MessageLike = Union[BaseMessage, Dict[str, str]]  # either Message object or {'role','content'}
 
+@dataclass(slots=True, frozen=True)
+class ArtifactRef:
+    """Pointer to a stage output held in artifacts.ArtifactStore (content-addressed)."""
+    stage: str
+    key: str
+    size: int
+    content_type: str = "application/json"
+
+# Worker node name -> AgentState slot holding its output
+ARTIFACT_SLOTS = {
+    "ideation_agent": "idea",
+    "research_planning_agent": "research",
+    "coding_agent": "code",
+    "deployment_agent": "deployment",
+    "presentation_agent": "presentation",
+}
+
+# Nodes return only what changed: messages and completed stages are appended,
+# artifacts are small refs (the payloads stay out of every checkpoint)
 class AgentState(TypedDict):
-    messages: List[MessageLike]
+    messages: Annotated[List[MessageLike], operator.add]
     status: str
-    idea: str
-    research: str
-    plan: str
-    code: str
-    deployment_url: str
-    presentation: str
+    idea: Optional[ArtifactRef]
+    research: Optional[ArtifactRef]
+    code: Optional[ArtifactRef]
+    deployment: Optional[ArtifactRef]
+    presentation: Optional[ArtifactRef]
     next_agent: Optional[str]
     supervisor_steps: int
     last_agent: Optional[str]
     same_agent_count: int
+    last_degraded: bool  # the last worker's output is a template fallback (or an error)
+    pipeline_expires_at: Optional[float]  # time.time() when the run's PIPELINE_BUDGET runs out, shared by all nodes
+    completed_stages: Annotated[List[str], operator.add]
+    require_approval: bool
+    human_feedback: Optional[str]
 
-def get_initial_state(user_input: str) -> AgentState:
+def get_initial_state(user_input: str, require_approval: bool = False) -> AgentState:
     return AgentState(
         messages=[{"role": "user", "content": user_input}],  # canonicalize right away
         status="ideation",
-        idea="",
-        research="",
-        plan="",
-        code="",
-        deployment_url="",
-        presentation="",
+        idea=None,
+        research=None,
+        code=None,
+        deployment=None,
+        presentation=None,
         next_agent=None,
         supervisor_steps=0,
         last_agent=None,
         same_agent_count=0,
+        last_degraded=False,
+        pipeline_expires_at=time.time() + PIPELINE_BUDGET,
+        completed_stages=[],
+        require_approval=require_approval,
+        human_feedback=None,
     )
@@ -0,0 +1,215 @@
+"""
+Precompressed, cache-friendly serving of the exported Next.js frontend.
+
+The `frontend/out` tree is indexed once at startup: every file gets an ETag,
+a Cache-Control policy (hashed `_next/static` assets are immutable) and
+gzip/brotli variants, taken from `.gz`/`.br` files next to it when present
+and compressed in memory otherwise. Requests are then a dict lookup, with
+conditional 304s and SPA fallback routing and no filesystem exceptions.
+
+Precompress a build ahead of time (also usable by nginx `gzip_static`):
+
+    python3 static_assets.py frontend/out
+"""
+
+import gzip
+import mimetypes
+import os
+import sys
+
+import xxhash
+from flask import Response
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SHORT_LIVED = "public, max-age=3600"
+
+# Files larger than this are streamed from disk (sendfile) instead of held in memory
+MAX_MEMORY_BYTES = int(os.getenv("STATIC_MAX_MEMORY_BYTES", str(1024 * 1024)))
+MIN_COMPRESS_BYTES = 1024
+COMPRESSIBLE = (
+    "text/", "application/javascript", "application/json", "application/xml",
+    "image/svg+xml", "application/manifest+json", "text/x-component",
+)
+
+
+class StaticAsset:
+    __slots__ = ("path", "size", "mimetype", "etag", "cache_control", "data", "variants")
+
+    def __init__(self, path, size, mimetype, etag, cache_control, data):
+        self.path = path
+        self.size = size
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        self.data = data  # bytes, or None when served from disk
+        self.variants = {}  # encoding -> bytes
+
+
+def _cache_control(rel_path: str) -> str:
+    if rel_path.startswith("_next/static/"):
+        return IMMUTABLE
+    if rel_path.endswith((".html", ".txt")):
+        # HTML and RSC payloads reference hashed assets and must revalidate
+        return REVALIDATE
+    return SHORT_LIVED
+
+
+def _is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith(COMPRESSIBLE)
+
+
+class StaticAssetIndex:
+    """In-memory index of a static export directory."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.assets: dict[str, StaticAsset] = {}
+        self.routes: dict[str, str] = {}
+        self.build()
+
+    def build(self):
+        self.assets.clear()
+        self.routes.clear()
+        if not os.path.isdir(self.root):
+            print(f"⚠️ Frontend build not found at {self.root}")
+            return
+
+        total = compressed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith((".gz", ".br")):
+                    continue  # picked up as variants of their source file
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, "/")
+                asset = self._load(full, rel)
+                self.assets[rel] = asset
+                total += 1
+                compressed += bool(asset.variants)
+
+        # Clean URLs produced by `next export`: /about -> about.html, /docs/ -> docs/index.html
+        for rel in self.assets:
+            if rel.endswith("/index.html"):
+                self.routes[rel[: -len("/index.html")]] = rel
+            elif rel.endswith(".html"):
+                self.routes.setdefault(rel[: -len(".html")], rel)
+        self.routes[""] = "index.html"
+        print(f"📦 Indexed {total} frontend assets ({compressed} with compressed variants)")
+
+    def _load(self, full: str, rel: str) -> StaticAsset:
+        size = os.path.getsize(full)
+        mimetype = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        with open(full, "rb") as f:
+            content = f.read()
+        asset = StaticAsset(
+            path=full,
+            size=size,
+            mimetype=mimetype,
+            etag=xxhash.xxh64_hexdigest(content),
+            cache_control=_cache_control(rel),
+            data=content if size <= MAX_MEMORY_BYTES else None,
+        )
+
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if os.path.exists(full + suffix):
+                with open(full + suffix, "rb") as f:
+                    asset.variants[encoding] = f.read()
+
+        if _is_compressible(mimetype) and size >= MIN_COMPRESS_BYTES:
+            if "gzip" not in asset.variants:
+                asset.variants["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+            if "br" not in asset.variants and brotli is not None:
+                asset.variants["br"] = brotli.compress(content, quality=11)
+        # Drop variants that don't actually save anything
+        asset.variants = {enc: data for enc, data in asset.variants.items() if len(data) < size}
+        return asset
+
+    def resolve(self, path: str):
+        """Map a request path to an asset; unknown extensionless paths fall back to the SPA shell."""
+        path = path.strip("/")
+        asset = self.assets.get(path)
+        if asset is not None:
+            return asset
+        route = self.routes.get(path)
+        if route is not None:
+            return self.assets.get(route)
+        last = path.rsplit("/", 1)[-1]
+        if "." not in last:
+            return self.assets.get("index.html")
+        return None
+
+    def serve(self, path: str, request) -> Response:
+        asset = self.resolve(path)
+        if asset is None:
+            if not self.assets:
+                return Response("Frontend not built. Please run 'npm run build' in the frontend directory.", 404)
+            return Response("File not found", 404)
+
+        encoding = None
+        if asset.variants:
+            accepted = request.accept_encodings
+            for candidate in ("br", "gzip"):
+                if candidate in asset.variants and accepted[candidate]:
+                    encoding = candidate
+                    break
+
+        etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+        headers = {
+            "Cache-Control": asset.cache_control,
+            "ETag": f'"{etag}"',
+        }
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            body = asset.variants[encoding]
+            response = Response(body, mimetype=asset.mimetype, headers=headers)
+        elif asset.data is not None:
+            response = Response(asset.data, mimetype=asset.mimetype, headers=headers)
+        else:
+            response = Response(
+                wrap_file(request.environ, open(asset.path, "rb")),
+                mimetype=asset.mimetype,
+                headers=headers,
+                direct_passthrough=True,
+            )
+            response.content_length = asset.size
+        return response
+
+
+def precompress(root: str) -> int:
+    """Write .gz (and .br when brotli is installed) next to every compressible file."""
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith((".gz", ".br")):
+                continue
+            full = os.path.join(dirpath, name)
+            mimetype = mimetypes.guess_type(name)[0] or ""
+            if not _is_compressible(mimetype) or os.path.getsize(full) < MIN_COMPRESS_BYTES:
+                continue
+            with open(full, "rb") as f:
+                content = f.read()
+            with open(full + ".gz", "wb") as f:
+                f.write(gzip.compress(content, compresslevel=9, mtime=0))
+            written += 1
+            if brotli is not None:
+                with open(full + ".br", "wb") as f:
+                    f.write(brotli.compress(content, quality=11))
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "frontend", "out")
+    print(f"✅ Wrote {precompress(target)} precompressed files under {target}")
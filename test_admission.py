@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test AIMD admission control (admission.py) against a private scheduler.
+
+Stage latencies are fed in by hand; nothing runs.
+
+    python3 test_admission.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+import admission  # noqa: E402
+from admission import AdmissionController  # noqa: E402
+from fallbacks import STAGE_BUDGETS  # noqa: E402
+from scheduler import FairScheduler  # noqa: E402
+
+FAST = STAGE_BUDGETS["coding"] * admission.TARGET_RATIO / 2
+SLOW = STAGE_BUDGETS["coding"] * admission.TARGET_RATIO * 2
+
+
+def _controller(initial=4, min_limit=2, max_limit=8):
+    scheduler = FairScheduler(max_concurrent=initial, batch_slots=initial // 2)
+    return AdmissionController(scheduler, initial=initial, min_limit=min_limit, max_limit=max_limit), scheduler
+
+
+def test_additive_increase():
+    controller, scheduler = _controller(initial=4)
+    for _ in range(4):
+        controller.observe("coding", FAST)
+    assert 4.9 < controller.limit < 5.0 and scheduler.max_concurrent == 4, controller.limit
+    controller.observe("coding", FAST)
+    assert int(controller.limit) == 5 and scheduler.max_concurrent == 5
+    for _ in range(100):
+        controller.observe("coding", FAST)
+    assert controller.limit == 8.0 and scheduler.max_concurrent == 8
+    print("✅ Fast stages raise the limit by about one per `limit` stages, up to the max")
+
+
+def test_multiplicative_decrease_with_cooldown():
+    cooldown = admission.COOLDOWN
+    controller, scheduler = _controller(initial=8)
+    try:
+        controller.observe("coding", SLOW)
+        assert abs(controller.limit - 8 * admission.BACKOFF) < 1e-9
+        controller.observe("coding", SLOW)  # same slowdown reported by a run in flight
+        assert controller.decreases == 1
+        admission.COOLDOWN = 0
+        controller.observe("coding", 0.1, overloaded=True)  # timed out or breaker open
+        assert controller.decreases == 2
+        for _ in range(10):
+            controller.observe("coding", SLOW)
+    finally:
+        admission.COOLDOWN = cooldown
+    assert controller.limit == 2 and scheduler.max_concurrent == 2
+    print("✅ Slow or overloaded stages cut the limit, once per cooldown, down to the floor")
+
+
+def test_shedding_on_long_queues():
+    enabled = admission.ADMISSION_ENABLED
+    admission.ADMISSION_ENABLED = True
+    controller, scheduler = _controller(initial=2)
+    try:
+        assert controller.admit("interactive") == "admit"
+        for i in range(2 + int(2 * admission.QUEUE_FACTOR)):
+            scheduler.submit(f"user{i}")
+        assert controller.admit("interactive") == "shed"
+        assert controller.health()["status"] == "overloaded"
+        assert controller.retry_after() >= 1
+    finally:
+        admission.ADMISSION_ENABLED = enabled
+    print("✅ New runs are shed once the queue holds QUEUE_FACTOR x limit")
+
+
+def test_health_states():
+    controller, scheduler = _controller(initial=admission.MAX_CONCURRENT)
+    assert controller.health()["status"] == "ready"
+    cooldown = admission.COOLDOWN
+    admission.COOLDOWN = 0
+    try:
+        controller.observe("coding", SLOW)
+    finally:
+        admission.COOLDOWN = cooldown
+    assert controller.health()["status"] == "degraded"
+    print("✅ Health turns degraded when the limit is cut")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing admission control...")
+    print("=" * 50)
+    test_additive_increase()
+    test_multiplicative_decrease_with_cooldown()
+    test_shedding_on_long_queues()
+    test_health_states()
+    print("=" * 50)
+    print("🎉 All admission control tests passed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test compact API responses (api_responses.py and the session endpoints).
+
+Files are stored as blobs in a temporary directory; no API calls are made.
+
+    python3 test_api_responses.py
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+
+sys.path.append('.')
+os.environ["ARTIFACT_DIR"] = tempfile.mkdtemp(prefix="responses-test-")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from werkzeug.datastructures import MultiDict  # noqa: E402
+
+from api_responses import paginate_files, parse_fields, select_fields  # noqa: E402
+from artifacts import store_code  # noqa: E402
+from backend_api import app, sessions  # noqa: E402
+
+CODE = {
+    "files": [{"path": f"src/file{i}.ts", "content": f"export const n = {i};\n" * (i + 1)} for i in range(25)],
+    "readme": "# Demo\n",
+}
+RESULT = {
+    "ideas": [{"title": "Demo"}],
+    "research": {"market_analysis": {"target_audience": "cooks"}},
+    "code": store_code(CODE),
+    "deployment": {"deployment_status": "not_deployed"},
+    "presentation": {"slides": ["Intro"] * 200},
+}
+sessions["compact"] = {"idea": "Demo", "status": "completed", "degraded": [], "result": RESULT}
+client = app.test_client()
+
+
+def test_parse_and_select_fields():
+    assert parse_fields("") is None
+    assert parse_fields("presentation, ideas,bogus") == ("ideas", "presentation")  # result order, unknowns dropped
+    content = select_fields(RESULT, ("ideas", "code"), "/files")
+    assert set(content) == {"ideas", "code"}
+    assert content["code"]["readme"] == "# Demo\n" and content["code"]["files_url"] == "/files"
+    assert content["code"]["files"][3] == {"path": "src/file3.ts", "size": len(CODE["files"][3]["content"])}
+    print("✅ ?fields= picks sections in result order; code files become a {path, size} manifest")
+
+
+def test_paginate_files():
+    code = RESULT["code"]
+    first = paginate_files(code, MultiDict())
+    assert first["total"] == 25 and len(first["files"]) == 20 and first["next_offset"] == 20
+    assert first["files"][0] == {"path": "src/file0.ts", "size": len(CODE["files"][0]["content"]),
+                                 "content": CODE["files"][0]["content"]}
+    last = paginate_files(code, MultiDict({"offset": "20", "limit": "10"}))
+    assert [f["path"] for f in last["files"]] == [f"src/file{i}.ts" for i in range(20, 25)]
+    assert last["next_offset"] is None
+    picked = paginate_files(code, MultiDict({"paths": "src/file1.ts,src/nope.ts", "content": "false"}))
+    assert picked["files"] == [{"path": "src/file1.ts", "size": len(CODE["files"][1]["content"])}]
+    clamped = paginate_files(code, MultiDict({"offset": "-5", "limit": "100000"}))
+    assert clamped["offset"] == 0 and clamped["limit"] == 200
+    print("✅ Files page with offset/limit, filter by ?paths= and skip content with ?content=false")
+
+
+def test_session_endpoints():
+    full = client.get("/api/session/compact").get_json()
+    assert full["result"]["code"]["files_url"] == "/api/session/compact/files"
+    assert "content" not in full["result"]["code"]["files"][0]
+    only = client.get("/api/session/compact?fields=ideas").get_json()
+    assert set(only["result"]) == {"ideas"}
+    files = client.get("/api/session/compact/files?limit=2&offset=1").get_json()
+    assert [f["content"] for f in files["files"]] == [f["content"] for f in CODE["files"][1:3]]
+    assert client.get("/api/session/missing/files").status_code == 404
+    print("✅ GET /api/session/{id} returns the manifest; /files serves the contents")
+
+
+def test_compression_negotiation():
+    zstd = client.get("/api/session/compact", headers={"Accept-Encoding": "zstd, gzip"})
+    gz = client.get("/api/session/compact", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/session/compact")
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(gz.get_data()) == plain.get_data()
+    if zstd.headers.get("Content-Encoding") == "zstd":
+        import zstandard
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(zstd.get_data()) == plain.get_data()
+    assert "Content-Encoding" not in plain.headers and "Accept-Encoding" in plain.headers["Vary"]
+    small = client.get("/api/session/compact?fields=deployment", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers  # below RESPONSE_MIN_COMPRESS_BYTES
+    print("✅ Large JSON is zstd/gzip compressed by Accept-Encoding; small bodies are sent as is")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing compact API responses...")
+    print("=" * 50)
+    test_parse_and_select_fields()
+    test_paginate_files()
+    test_session_endpoints()
+    test_compression_negotiation()
+    print("=" * 50)
+    print("🎉 All API response tests passed!")
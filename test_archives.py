@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the streaming project archive (archives.py and GET /api/session/<id>/archive).
+
+Blobs and cached archives go to a temporary directory; no API calls are made.
+
+    python3 test_archives.py
+"""
+
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import zipfile
+
+sys.path.append('.')
+_tmp = tempfile.mkdtemp(prefix="archives-test-")
+os.environ["ARTIFACT_DIR"] = _tmp
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from archives import archive_entries, archive_etag, stream_archive  # noqa: E402
+from artifacts import store_code  # noqa: E402
+from backend_api import app, sessions  # noqa: E402
+
+CODE = {
+    "files": [
+        {"path": "package.json", "content": '{"name": "demo"}\n'},
+        {"path": "src/App.tsx", "content": "export default function App() { return <p>Hi</p>; }\n" * 200},
+        {"path": "../etc/passwd", "content": "nope"},
+    ],
+    "readme": "# Demo\n",
+    "requirements": ["react", "express"],
+}
+EXPECTED = ["demo/package.json", "demo/src/App.tsx", "demo/README.md", "demo/requirements.txt"]
+
+sessions["s1"] = {"idea": "Demo", "status": "completed", "result": {"selected_idea": {"title": "Demo"}, "code": store_code(CODE)}}
+client = app.test_client()
+
+
+def test_entries_skip_unsafe_paths():
+    entries = archive_entries(store_code(CODE))
+    assert [path for path, _ in entries] == [p.split("/", 1)[1] for p in EXPECTED]
+    print("✅ Archive entries skip path traversal and add README/requirements")
+
+
+def test_output_is_deterministic():
+    entries = archive_entries(store_code(CODE))
+    for fmt in ("zip", "tar.gz"):
+        first = b"".join(stream_archive(entries, fmt, "demo"))
+        assert first == b"".join(stream_archive(entries, fmt, "demo")), fmt
+    assert archive_etag(entries, "zip", "demo") != archive_etag(entries, "tar.gz", "demo")
+    print("✅ Same files, same bytes and ETag; the format changes the ETag")
+
+
+def test_zip_download_and_conditional_requests():
+    first = client.get("/api/session/s1/archive")
+    assert first.status_code == 200
+    body = first.get_data()
+    etag = first.headers["ETag"]
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == EXPECTED
+        assert archive.read("demo/src/App.tsx").decode() == CODE["files"][1]["content"]
+
+    cached = client.get("/api/session/s1/archive")  # served from the cached file now
+    assert cached.get_data() == body and cached.headers["ETag"] == etag
+
+    not_modified = client.get("/api/session/s1/archive", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not not_modified.get_data()
+    print("✅ zip download is cached; If-None-Match returns 304")
+
+
+def test_range_requests():
+    body = client.get("/api/session/s1/archive").get_data()
+    partial = client.get("/api/session/s1/archive", headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.get_data() == body[100:200]
+    assert partial.headers["Content-Range"] == f"bytes 100-199/{len(body)}"
+    print("✅ Range requests resume with 206 Partial Content")
+
+
+def test_tar_gz_and_errors():
+    response = client.get("/api/session/s1/archive?format=tar.gz")
+    assert response.status_code == 200
+    with tarfile.open(fileobj=io.BytesIO(response.get_data()), mode="r:gz") as archive:
+        assert archive.getnames() == EXPECTED
+    assert client.get("/api/session/s1/archive?format=rar").status_code == 400
+    assert client.get("/api/session/missing/archive").status_code == 404
+    print("✅ tar.gz works; unknown formats are 400, unknown sessions 404")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing project archives...")
+    print("=" * 50)
+    test_entries_skip_unsafe_paths()
+    test_output_is_deterministic()
+    test_zip_download_and_conditional_requests()
+    test_range_requests()
+    test_tar_gz_and_errors()
+    print("=" * 50)
+    print("🎉 All archive tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed stores (artifacts.py): stage artifacts and file blobs.
+
+Everything is written to temporary directories; no API calls are made.
+
+    python3 test_artifacts.py
+"""
+
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append('.')
+os.environ.setdefault("ARTIFACT_DIR", tempfile.mkdtemp(prefix="artifacts-test-"))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from agents import AgentName  # noqa: E402
+from artifacts import (  # noqa: E402
+    ArtifactStore, BlobStore, artifact_store, file_content, load_artifact, load_files, store_code,
+)
+from graph import _make_worker_node  # noqa: E402
+from state import ArtifactRef, get_initial_state  # noqa: E402
+
+RESEARCH = AgentName.RESEARCH_PLANNING.value
+
+
+def test_refs_are_small_and_frozen():
+    store = ArtifactStore(tempfile.mkdtemp(prefix="artifacts-"))
+    content = json.dumps({"market_analysis": "x" * 1000})
+    ref = store.put(RESEARCH, content)
+    assert ref == store.put(RESEARCH, content)  # same content, same key
+    assert ref.size == len(content) and ref.content_type == "application/json"
+    assert store.get(ref) == content
+    assert not hasattr(ref, "__dict__")  # slotted
+    try:
+        ref.key = "other"
+    except dataclasses.FrozenInstanceError:
+        pass
+    else:
+        raise AssertionError("ArtifactRef should be frozen")
+    assert store.get(None) is None
+    assert store.get(ArtifactRef(RESEARCH, "0" * 32, 1)) is None
+    print("✅ put() returns a frozen, slotted ref keyed by content; get() resolves it")
+
+
+def test_memory_cache_is_bounded_and_evictions_read_from_disk():
+    store = ArtifactStore(tempfile.mkdtemp(prefix="artifacts-"), max_bytes=250)
+    refs = [store.put(RESEARCH, f"{i}" * 100) for i in range(5)]
+    assert store._bytes <= 250 and len(store._memory) == 2
+    assert refs[0].key not in store._memory
+    assert [store.get(ref) for ref in refs] == [f"{i}" * 100 for i in range(5)]  # evicted ones come from disk
+    assert list(store._memory) == [refs[3].key, refs[4].key]  # the last two reads are the most recent
+    print("✅ The memory copy stays under max_bytes; evicted artifacts are read back from disk")
+
+
+def test_memory_only_store_keeps_everything():
+    store = ArtifactStore(None, max_bytes=10)
+    refs = [store.put(RESEARCH, f"{i}" * 100) for i in range(3)]
+    assert [store.get(ref) for ref in refs] == [f"{i}" * 100 for i in range(3)]
+    print("✅ Without a directory nothing is evicted (memory is the only copy)")
+
+
+def test_state_holds_refs_only():
+    payload = {"market_analysis": {"target_audience": "cooks"}, "notes": "y" * 5000}
+    node = _make_worker_node(RESEARCH, lambda state: {"messages": [{"role": "assistant", "content": json.dumps(payload)}]})
+    update = node(get_initial_state("AI recipe app"))
+    ref = update["research"]
+    assert isinstance(ref, ArtifactRef) and ref.stage == RESEARCH
+    assert load_artifact(ref) == payload and artifact_store.get(ref) == json.dumps(payload)
+    assert update["completed_stages"] == [RESEARCH]
+    assert len(update["messages"]) == 1 and len(update["messages"][0]["content"]) < 200
+    assert "y" * 100 not in repr(update)
+    print("✅ Worker nodes return a ref and a one-line message; the payload stays in the store")
+
+
+def test_failed_stage_stores_nothing():
+    node = _make_worker_node(RESEARCH, lambda state: {"messages": [{"role": "assistant", "content": "Error: quota"}]})
+    update = node(get_initial_state("AI recipe app"))
+    assert "research" not in update and update["last_degraded"] is True
+    assert update["messages"][0]["content"] == "Error: quota"
+    print("✅ Errors stay visible as messages and store no artifact")
+
+
+BOILERPLATE = b'{"name": "project", "dependencies": {"react": "^18.2.0"}}\n' * 40
+
+
+def test_blob_round_trip_and_dedup():
+    store = BlobStore(tempfile.mkdtemp(prefix="blobs-"))
+    key = store.put(BOILERPLATE)
+    assert store.put(BOILERPLATE) == key and store.put(b"other") != key
+    assert store.read(key) == BOILERPLATE
+    assert b"".join(store.iter_chunks(key, chunk_size=100)) == BOILERPLATE
+    with open(store._path(key), "rb") as f:
+        assert len(f.read()) < len(BOILERPLATE) // 4  # zstd-compressed on disk
+    stats = store.stats()
+    assert stats["blobs"] == 2 and stats["files_stored"] == 3 and stats["dedup_hits"] == 1
+    assert stats["logical_bytes"] == 2 * len(BOILERPLATE) + 5 and stats["dedup_ratio"] == 0.333
+    try:
+        store.read("0" * 32)
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("unknown blobs should raise FileNotFoundError")
+    print("✅ Blobs round-trip through zstd; identical content is stored once")
+
+
+def test_blob_counters_survive_a_restart():
+    root = tempfile.mkdtemp(prefix="blobs-")
+    first = BlobStore(root)
+    keys = {first.put(f"file {i}".encode() * 50) for i in range(3)}
+    restarted = BlobStore(root)
+    stats = restarted.stats()
+    assert stats["blobs"] == 3 and stats["disk_bytes"] == first.stats()["disk_bytes"]
+    assert restarted.put(b"file 0" * 50) in keys and restarted.stats()["dedup_hits"] == 1
+    print("✅ A new store counts the blobs already on disk and dedups against them")
+
+
+def test_concurrent_puts_of_one_blob():
+    store = BlobStore(tempfile.mkdtemp(prefix="blobs-"))
+    threads = [threading.Thread(target=store.put, args=(BOILERPLATE,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = store.stats()
+    assert stats["blobs"] == 1 and stats["files_stored"] == 8
+    assert not [name for _, _, files in os.walk(store.root) for name in files if name.endswith(".tmp")]
+    print("✅ Concurrent writes of the same file leave one blob and no temp files")
+
+
+def test_sessions_keep_manifests():
+    code = {"files": [{"path": "package.json", "content": BOILERPLATE.decode()},
+                      {"path": "src/App.tsx", "content": "export default App;\n"}], "readme": "# Demo"}
+    stored = store_code(code)
+    assert stored["readme"] == "# Demo"
+    assert [set(entry) for entry in stored["files"]] == [{"path", "blob", "size"}] * 2
+    assert stored["files"][0]["size"] == len(BOILERPLATE)
+    assert load_files(stored["files"]) == code["files"]
+    assert file_content({"path": "inline.ts", "content": "x"}) == "x"  # older sessions keep content inline
+    assert store_code(code)["files"] == stored["files"]  # the same project again stores nothing new
+    print("✅ Sessions hold {path, blob, size} manifests that load back to the generated files")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing artifact stores...")
+    print("=" * 50)
+    test_refs_are_small_and_frozen()
+    test_memory_cache_is_bounded_and_evictions_read_from_disk()
+    test_memory_only_store_keeps_everything()
+    test_state_holds_refs_only()
+    test_failed_stage_stores_nothing()
+    test_blob_round_trip_and_dedup()
+    test_blob_counters_survive_a_restart()
+    test_concurrent_puts_of_one_blob()
+    test_sessions_keep_manifests()
+    print("=" * 50)
+    print("🎉 All artifact tests passed!")
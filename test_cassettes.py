@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test record/replay cassettes (cassettes.py).
+
+A chat model call (FakeListChatModel) and a `requests` call to a local HTTP
+stub are recorded, then replayed with the stub stopped; no API keys needed.
+
+    python3 test_cassettes.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+
+import requests  # noqa: E402
+from langchain_core.language_models import FakeListChatModel  # noqa: E402
+
+from cassettes import Cassette, CassetteMiss  # noqa: E402
+
+PATH = os.path.join(tempfile.mkdtemp(prefix="cassettes-test-"), "run.cassette")
+hits = {"http": 0}
+
+
+class _Stub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        hits["http"] += 1
+        length = int(self.headers.get("Content-Length", 0))
+        body = b'{"echo": ' + self.rfile.read(length) + b', "call": ' + str(hits["http"]).encode() + b'}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _calls(url):
+    """One invoke, one stream and one HTTP call, as a pipeline stage would make them."""
+    llm = FakeListChatModel(responses=["recorded idea", "recorded stream"])
+    answer = llm.invoke("Give me one idea")
+    streamed = "".join(chunk.content for chunk in llm.stream("Stream one idea"))
+    response = requests.post(url, json={"q": "recipes"}, timeout=5)
+    return answer.content, streamed, response.json(), llm
+
+
+def test_record_then_replay_offline():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    try:
+        with Cassette(PATH, mode="record") as cassette:
+            recorded = _calls(url)
+        assert cassette.stats()["interactions"] == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert hits["http"] == 1 and os.path.exists(PATH)
+
+    # The stub is gone: any live HTTP call would now fail
+    with Cassette(PATH, mode="replay") as cassette:
+        replayed = _calls(url)
+    assert replayed[:3] == recorded[:3], replayed
+    assert replayed[2] == {"echo": {"q": "recipes"}, "call": 1}
+    assert replayed[3].i == 0  # the fake model was never called
+    assert hits["http"] == 1
+    assert cassette.stats()["hits"] == 3 and cassette.stats()["misses"] == 0
+    print("✅ A recorded invoke, stream and HTTP call replay without any live call")
+
+
+def test_replay_miss_raises():
+    with Cassette(PATH, mode="replay"):
+        try:
+            FakeListChatModel(responses=["live"]).invoke("A prompt that was never recorded")
+        except CassetteMiss:
+            pass
+        else:
+            raise AssertionError("expected CassetteMiss")
+    print("✅ An unrecorded request fails in replay mode instead of going live")
+
+
+def test_patches_are_removed_on_exit():
+    with Cassette(PATH, mode="replay"):
+        pass
+    assert FakeListChatModel(responses=["live"]).invoke("A prompt that was never recorded").content == "live"
+    print("✅ Leaving the cassette restores live calls")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing cassettes...")
+    print("=" * 50)
+    test_record_then_replay_offline()
+    test_replay_miss_raises()
+    test_patches_are_removed_on_exit()
+    print("=" * 50)
+    print("🎉 All cassette tests passed!")
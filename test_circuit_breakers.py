@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test circuit breaker transitions (circuit_breakers.py).
+
+Breakers are created with short reset times; no dependency is called.
+
+    python3 test_circuit_breakers.py
+"""
+
+import sys
+import time
+
+sys.path.append('.')
+
+import requests  # noqa: E402
+
+from langchain_core.language_models import FakeListChatModel  # noqa: E402
+
+import prompts  # noqa: E402
+from circuit_breakers import CircuitBreaker, CircuitOpen, _http_failure  # noqa: E402
+
+
+def _fail(breaker, exc=ConnectionError("down")):
+    try:
+        with breaker.guard():
+            raise exc
+    except type(exc):
+        pass
+
+
+def _breaker(**kwargs):
+    options = {"failure_threshold": 3, "window": 10, "reset_seconds": 0.05, "max_reset_seconds": 0.2}
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = _breaker()
+    for _ in range(2):
+        _fail(breaker)
+    assert breaker.state == "closed"
+    _fail(breaker)
+    assert breaker.state == "open"
+    try:
+        breaker.call(lambda: None)
+    except CircuitOpen as e:
+        assert e.retry_after >= 1
+    else:
+        raise AssertionError("expected CircuitOpen")
+    assert breaker.stats()["rejected"] == 1
+    print("✅ Opens after `failure_threshold` consecutive failures and refuses calls")
+
+
+def test_opens_on_failure_rate():
+    breaker = _breaker(failure_threshold=100, window=4)
+    for outcome in (True, False, True, False):
+        if outcome:
+            breaker.call(lambda: None)
+        else:
+            _fail(breaker)
+    assert breaker.state == "open"
+    print("✅ Opens when half of a full window failed")
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = _breaker(failure_threshold=1)
+    _fail(breaker)
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    _fail(breaker)  # probe failed: open again, for twice as long
+    assert breaker.state == "open" and breaker._open_for == 0.1
+    time.sleep(0.11)
+    assert breaker.state == "half_open"
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed" and breaker._open_for == 0.05
+    print("✅ A half-open probe closes the breaker, a failed one doubles the wait")
+
+
+def test_half_open_admits_limited_probes():
+    breaker = _breaker(failure_threshold=1, half_open_calls=1)
+    _fail(breaker)
+    time.sleep(0.06)
+    with breaker.guard():
+        try:
+            breaker.allow()
+        except CircuitOpen:
+            pass
+        else:
+            raise AssertionError("second probe should be refused")
+    assert breaker.state == "closed"
+    print("✅ Only `half_open_calls` probes run at once")
+
+
+def test_abandoned_probe_releases_its_slot():
+    breaker = _breaker(failure_threshold=1)
+    _fail(breaker)
+    time.sleep(0.06)
+
+    def stream():
+        with breaker.guard():
+            yield "chunk"
+            yield "chunk"
+
+    chunks = stream()
+    next(chunks)
+    chunks.close()  # GeneratorExit inside the guard
+    assert breaker.state == "half_open"
+    breaker.call(lambda: None)  # would raise CircuitOpen if the slot had leaked
+    assert breaker.state == "closed"
+    print("✅ A probe abandoned with GeneratorExit gives its slot back")
+
+
+def test_slow_calls_and_ignored_errors():
+    breaker = _breaker(failure_threshold=1, slow_call_seconds=0.01)
+    breaker.call(time.sleep, 0.02)
+    assert breaker.state == "open" and breaker.stats()["slow_calls"] == 1
+
+    response = requests.Response()
+    response.status_code = 404
+    not_found = requests.HTTPError(response=response)
+    assert not _http_failure(not_found)
+    response_503 = requests.Response()
+    response_503.status_code = 503
+    assert _http_failure(requests.HTTPError(response=response_503))
+    assert _http_failure(requests.ConnectionError())
+
+    http = _breaker(failure_threshold=1, is_failure=_http_failure)
+    _fail(http, not_found)
+    assert http.state == "closed"
+    print("✅ Slow calls count as failures; 4xx responses don't")
+
+
+def test_stream_callback_errors_are_not_gemini_failures():
+    registry = prompts.PromptRegistry()
+    registry.register("ideas", "List ideas as a JSON array.\n", "Topic: {topic}\n")
+    llm = FakeListChatModel(responses=['["not", "objects"]'])
+    breaker = _breaker(failure_threshold=1)
+    original = prompts.gemini_breaker
+    prompts.gemini_breaker = breaker
+    try:
+        registry.stream(llm, "ideas", topic="recipes", until=lambda text: text.startswith("[") and [].get("x"))
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("the callback's error should reach the caller")
+    finally:
+        prompts.gemini_breaker = original
+    assert breaker.state == "closed" and breaker.stats()["failures"] == 0, breaker.stats()
+    print("✅ An error in stream()'s until callback reaches the caller without tripping the breaker")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing circuit breakers...")
+    print("=" * 50)
+    test_opens_after_consecutive_failures()
+    test_opens_on_failure_rate()
+    test_half_open_probe_closes_or_reopens()
+    test_half_open_admits_limited_probes()
+    test_abandoned_probe_releases_its_slot()
+    test_slow_calls_and_ignored_errors()
+    test_stream_callback_errors_are_not_gemini_failures()
+    print("=" * 50)
+    print("🎉 All circuit breaker tests passed!")
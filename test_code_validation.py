@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test syntax validation of generated files (code_validation.py).
+
+The tokenizer cases run in-process; validate_files runs the process pool.
+
+    python3 test_code_validation.py
+"""
+
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append('.')
+
+import code_validation  # noqa: E402
+from code_validation import check_file, validate_files  # noqa: E402
+
+VALID = {
+    "app.py": "def main():\n    return {'ok': True}\n",
+    "package.json": '{"name": "demo", "private": true}',
+    "tsconfig.json": '{\n  // comments and trailing commas are fine here\n  "compilerOptions": {"strict": true,},\n}',
+    "src/util.ts": "export const half = (n: number) => n / 2; // divide\nconst re = /[/]+/g;\n",
+    "src/Link.tsx": "export default function P(){ return (<p>Visit https://example.com today</p>); }",
+    "src/List.tsx": (
+        "export const List = ({ items }: { items: string[] }) => (\n"
+        "  <>\n"
+        "    <ul className=\"list\" onClick={() => go('/a')}>\n"
+        "      {items.map(i => <li key={i}>{`${i}!`}</li>)}\n"
+        "    </ul>\n"
+        "    <p>Don't panic (really</p>\n"
+        "    <img src={logo} alt=\"logo\" />\n"
+        "  </>\n"
+        ");\n"
+    ),
+    "src/generic.tsx": "const id = <T,>(x: T) => x;\nconst ref = useRef<HTMLDivElement>(null);\nif (a < b && c > d) { f(); }\n",
+    "src/template.ts": "const s = `a ${b ? `nested ${c}` : '}'} z`;\n",
+    "styles.css": "body { color: red",  # not checked
+}
+
+INVALID = {
+    "broken.py": ("def main(:\n", "line 1"),
+    "broken.json": ('{"name": ', "line 1"),
+    "src/cut.ts": ("export function f() {\n  if (x) {\n    return 1;\n", "unclosed '{'"),
+    "src/quote.ts": ("const s = 'abc;\n", "unterminated string"),
+    "src/swap.ts": ("const a = [1, 2);\n", "does not match"),
+    "src/cut.tsx": ("export default function P(){ return (<div><p>hi</p>", "unclosed JSX element"),
+    "src/template.ts": ("const s = `abc ${x}\n", "unterminated template literal"),
+}
+
+
+def test_valid_files_pass():
+    for path, content in VALID.items():
+        assert check_file(path, content) is None, (path, check_file(path, content))
+    print(f"✅ {len(VALID)} valid files pass, including JSX text with // and quotes")
+
+
+def test_broken_files_fail():
+    for path, (content, expected) in INVALID.items():
+        error = check_file(path, content)
+        assert error and expected in error, (path, error)
+    print(f"✅ {len(INVALID)} broken files are reported with a line and reason")
+
+
+def test_tokenizer_without_node():
+    node = code_validation.NODE
+    code_validation.NODE = None
+    try:
+        assert check_file("index.js", "const a = 1 / 2; function f() { return <b>x // y</b>; }") is None
+        assert "unclosed" in check_file("index.js", "function f() {")
+    finally:
+        code_validation.NODE = node
+    print("✅ .js falls back to the tokenizer when node is missing")
+
+
+def test_validate_files_in_workers():
+    files = [{"path": path, "content": content} for path, content in VALID.items()]
+    files.append({"path": "broken.py", "content": INVALID["broken.py"][0]})
+    files.append({"path": "binary.py", "content": None})
+    report = validate_files(files, timeout=30)
+    assert report["timed_out"] == [], report
+    assert report["unchecked"] == 2  # styles.css and the file without text content
+    assert report["passed"] == len(VALID) - 1
+    assert [f["path"] for f in report["failed"]] == ["broken.py"]
+    print(f"✅ validate_files checked {report['checked']} files in worker processes "
+          f"in {report['elapsed_seconds']}s")
+
+
+def test_workers_do_not_import_main():
+    main_file, modules = code_validation._get_pool().submit(
+        eval, "getattr(__import__('sys').modules['__main__'], '__file__', None), sorted(__import__('sys').modules)"
+    ).result(timeout=30)
+    assert main_file is None and "test_code_validation" not in modules, main_file
+    print("✅ Spawned workers don't re-import the caller's __main__")
+
+
+def test_overrunning_checks_are_killed():
+    pool = code_validation._get_pool()
+    stuck = pool.submit(time.sleep, 60)
+    time.sleep(0.5)
+    assert stuck.running()
+    started = time.monotonic()
+    code_validation._kill_pool(pool)
+    try:
+        stuck.result(timeout=10)
+    except BrokenProcessPool:
+        pass
+    assert time.monotonic() - started < 10
+    assert code_validation._get_pool() is not pool
+    report = validate_files([{"path": "app.py", "content": VALID["app.py"]}], timeout=30)
+    assert report["passed"] == 1, report
+    print("✅ A check still running at the deadline is killed and the next batch gets a fresh pool")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing code validation...")
+    print("=" * 50)
+    test_valid_files_pass()
+    test_broken_files_fail()
+    test_tokenizer_without_node()
+    test_validate_files_in_workers()
+    test_workers_do_not_import_main()
+    test_overrunning_checks_are_killed()
+    print("=" * 50)
+    print("🎉 All code validation tests passed!")
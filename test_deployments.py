@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test asynchronous deployment tracking (deployments.py).
+
+The tracker's HTTP session is replaced by a scripted stub and polling
+delays are shortened, so no Vercel account or network is needed.
+
+    python3 test_deployments.py
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append('.')
+
+import requests  # noqa: E402
+
+import deployments  # noqa: E402
+from deployments import DeploymentTracker, deployment_stage  # noqa: E402
+
+deployments.POLL_INITIAL = 0.01
+deployments.POLL_MAX = 0.02
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=None):
+        self.status_code = status
+        self.body = body or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self):
+        return self.body
+
+
+class ScriptedSession:
+    """Answers the hook POST with `hook` (once `opened` is set), then each deployments GET with the next scripted item."""
+
+    def __init__(self, hook=None, polls=()):
+        self.hook = hook or FakeResponse(201)
+        self.polls = list(polls)
+        self.requests = []
+        self.opened = threading.Event()
+        self.opened.set()
+
+    def post(self, url, **kwargs):
+        self.opened.wait(5)
+        self.requests.append(("POST", url))
+        return self.hook
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.requests.append(("GET", url, params, headers))
+        item = self.polls.pop(0) if len(self.polls) > 1 else self.polls[0]
+        if isinstance(item, Exception):
+            raise item
+        return FakeResponse(200, {"deployments": [item] if item else []})
+
+
+@contextmanager
+def _env(**values):
+    saved = {key: os.environ.get(key) for key in values}
+    for key, value in values.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _tracker(session):
+    tracker = DeploymentTracker()
+    tracker._session = session
+    return tracker
+
+
+def _wait_final(tracker, deployment_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    record = tracker.get(deployment_id)
+    while record["status"] not in deployments.FINAL_STATES:
+        assert time.monotonic() < deadline, record
+        record = tracker.wait_for_change(deployment_id, record["version"], timeout=0.5)
+    return record
+
+
+def test_polls_until_ready():
+    session = ScriptedSession(polls=[
+        None,  # the build isn't listed yet
+        {"uid": "dpl_1", "readyState": "QUEUED"},
+        requests.ConnectionError("flaky"),  # poll errors are retried
+        {"uid": "dpl_1", "readyState": "BUILDING", "url": "demo-abc.vercel.app"},
+        {"uid": "dpl_1", "readyState": "READY", "url": "demo-abc.vercel.app"},
+    ])
+    session.opened.clear()
+    tracker = _tracker(session)
+    with _env(VERCEL_DEPLOY_HOOK_URL="https://hooks.example/deploy", VERCEL_TOKEN="token", VERCEL_PROJECT_ID="prj"):
+        deployment_id = tracker.trigger("demo")
+        assert tracker.get(deployment_id)["status"] == "pending"  # returned before the hook answered
+        session.opened.set()
+        record = _wait_final(tracker, deployment_id)
+    assert record["status"] == "ready" and record["deployment_url"] == "https://demo-abc.vercel.app"
+    assert record["vercel_id"] == "dpl_1"
+    assert [e["message"] for e in record["events"]] == [
+        "Deploy hook accepted", "Vercel state: building", "Vercel state: ready"]  # QUEUED is no change
+    method, url, params, headers = session.requests[1]
+    assert url.endswith("/v6/deployments") and params["projectId"] == "prj"
+    assert params["since"] == record["triggered_at"] - 5000 and headers["Authorization"] == "Bearer token"
+    print("✅ pending → queued → building → ready, with the real URL from the Vercel API")
+
+
+def test_without_token_stops_at_triggered():
+    session = ScriptedSession(polls=[None])
+    tracker = _tracker(session)
+    with _env(VERCEL_DEPLOY_HOOK_URL="https://hooks.example/deploy", VERCEL_TOKEN=None):
+        record = _wait_final(tracker, tracker.trigger("demo"))
+    assert record["status"] == "triggered" and record["deployment_url"] is None
+    assert [r[0] for r in session.requests] == ["POST"]
+    print("✅ Without VERCEL_TOKEN the state stops at triggered and no URL is made up")
+
+
+def test_hook_errors_fail_the_deployment():
+    tracker = _tracker(ScriptedSession(hook=FakeResponse(404)))
+    with _env(VERCEL_DEPLOY_HOOK_URL="https://hooks.example/deploy", VERCEL_TOKEN="token"):
+        record = _wait_final(tracker, tracker.trigger("demo"))
+    assert record["status"] == "failed" and "404" in record["error"]
+    with _env(VERCEL_DEPLOY_HOOK_URL=None):
+        record = _wait_final(tracker, tracker.trigger("demo"))
+    assert record["status"] == "failed" and "VERCEL_DEPLOY_HOOK_URL" in record["error"]
+    print("✅ A rejected or missing deploy hook marks the deployment failed")
+
+
+def test_polling_gives_up_after_the_timeout():
+    tracker = _tracker(ScriptedSession(polls=[{"uid": "dpl_2", "readyState": "BUILDING"}]))
+    poll_timeout, deployments.POLL_TIMEOUT = deployments.POLL_TIMEOUT, 0.2
+    try:
+        with _env(VERCEL_DEPLOY_HOOK_URL="https://hooks.example/deploy", VERCEL_TOKEN="token"):
+            record = _wait_final(tracker, tracker.trigger("demo"))
+    finally:
+        deployments.POLL_TIMEOUT = poll_timeout
+    assert record["status"] == "failed" and record["error"] == "Timed out waiting for the build"
+    print("✅ A build that never finishes fails after DEPLOY_POLL_TIMEOUT_SECONDS")
+
+
+def test_stage_without_auto_deploy():
+    result = deployment_stage("demo")
+    assert result["deployment_status"] == "not_deployed" and result["deployment_url"] is None
+    print("✅ The pipeline stage deploys nothing unless AUTO_DEPLOY and a hook are set")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing deployment tracking...")
+    print("=" * 50)
+    test_polls_until_ready()
+    test_without_token_stops_at_triggered()
+    test_hook_errors_fail_the_deployment()
+    test_polling_gives_up_after_the_timeout()
+    test_stage_without_auto_deploy()
+    print("=" * 50)
+    print("🎉 All deployment tests passed!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test stage budgets and template fallbacks (fallbacks.run_stage).
+
+Agents are plain functions here; no API keys or network needed.
+
+    python3 test_fallbacks.py
+"""
+
+import contextvars
+import sys
+import time
+
+sys.path.append('.')
+
+import fallbacks  # noqa: E402
+from circuit_breakers import CircuitOpen  # noqa: E402
+from fallbacks import FALLBACKS, PipelineDeadline, run_stage  # noqa: E402
+
+RESEARCH = {"market_analysis": {"target_audience": "cooks"}}
+
+
+def _run(agent, deadline=None, congested=None):
+    degraded = []
+    payload = run_stage("research", agent, "AI recipe app", "research", "AI recipe app", deadline, degraded, congested)
+    return payload, degraded
+
+
+def test_success_passes_through():
+    payload, degraded = _run(lambda text: {"success": True, "research": RESEARCH})
+    assert payload == RESEARCH and degraded == []
+    print("✅ A good payload is returned as is")
+
+
+def test_failures_use_the_template():
+    template = FALLBACKS["research"]("AI recipe app")
+
+    def boom(text):
+        raise RuntimeError("quota exceeded")
+
+    for agent in (
+        lambda text: {"success": False, "error": "bad JSON", "research": {}},
+        lambda text: {"success": True, "research": {}},            # empty
+        lambda text: {"success": True, "research": ["not", "a", "dict"]},  # wrong shape
+        boom,
+    ):
+        congested = []
+        payload, degraded = _run(agent, congested=congested)
+        assert payload == template, payload
+        assert degraded == ["research"] and congested == []
+    print("✅ Errors, empty and malformed payloads fall back to the template (not counted as congestion)")
+
+
+def test_timeout_uses_the_template():
+    budgets = dict(fallbacks.STAGE_BUDGETS)
+    fallbacks.STAGE_BUDGETS["research"] = 0.1
+    congested = []
+    try:
+        started = time.monotonic()
+        payload, degraded = _run(lambda text: time.sleep(1) or {"success": True, "research": RESEARCH},
+                                 congested=congested)
+        elapsed = time.monotonic() - started
+    finally:
+        fallbacks.STAGE_BUDGETS.update(budgets)
+    assert degraded == ["research"] and congested == ["research"] and payload != RESEARCH
+    assert elapsed < 0.5, elapsed
+    print(f"✅ A slow agent is cut off at its budget ({elapsed:.2f}s)")
+
+
+def test_exhausted_pipeline_budget_skips_the_agent():
+    calls, congested = [], []
+    payload, degraded = _run(lambda text: calls.append(text), PipelineDeadline(0), congested)
+    assert calls == [] and degraded == ["research"] and congested == ["research"]
+    print("✅ No agent call once the pipeline budget is spent")
+
+
+def test_open_breaker_counts_as_congestion():
+    def refused(text):
+        raise CircuitOpen("gemini", 30)
+
+    congested = []
+    payload, degraded = _run(refused, congested=congested)
+    assert degraded == ["research"] and congested == ["research"]
+    print("✅ An open breaker falls back and is reported as congestion")
+
+
+def test_context_follows_the_agent():
+    marker = contextvars.ContextVar("marker", default=None)
+    marker.set("caller")
+    payload, _ = _run(lambda text: {"success": True, "research": {"seen": marker.get()}})
+    assert payload == {"seen": "caller"}
+    print("✅ The caller's context variables reach the stage thread")
+
+
+def test_every_stage_has_a_budget_and_template():
+    assert set(FALLBACKS) == set(fallbacks.STAGE_BUDGETS) == set(fallbacks.STAGE_TYPES)
+    for stage, template in FALLBACKS.items():
+        assert isinstance(template("AI recipe app"), fallbacks.STAGE_TYPES[stage]), stage
+    print("✅ Every stage has a budget and a template of the right shape")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing stage budgets and fallbacks...")
+    print("=" * 50)
+    test_success_passes_through()
+    test_failures_use_the_template()
+    test_timeout_uses_the_template()
+    test_exhausted_pipeline_budget_skips_the_agent()
+    test_open_breaker_counts_as_congestion()
+    test_context_follows_the_agent()
+    test_every_stage_has_a_budget_and_template()
+    print("=" * 50)
+    print("🎉 All fallback tests passed!")
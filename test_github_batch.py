@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test bulk GitHub commits against a local GitHub API stub.
+
+No network or token needed: a small http.server implements the Git Data API
+endpoints used by github_batch and records every request.
+
+    python3 test_github_batch.py
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+
+
+class GitHubStub(BaseHTTPRequestHandler):
+    """Just enough of api.github.com for repo creation, trees, commits, refs and pulls."""
+
+    calls = []
+    trees = {}
+    refs = {"refs/heads/main": "c0"}
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body or {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _handle(self, method):
+        body = self._body()
+        path = self.path
+        GitHubStub.calls.append((method, path))
+        if method == "POST" and path == "/user/repos":
+            return self._reply(201, {
+                "html_url": f"https://github.com/octo/{body['name']}",
+                "clone_url": f"https://github.com/octo/{body['name']}.git",
+                "full_name": f"octo/{body['name']}",
+                "default_branch": "main",
+            })
+        if method == "GET" and path.endswith("/git/ref/heads/main"):
+            return self._reply(200, {"object": {"sha": GitHubStub.refs["refs/heads/main"]}})
+        if method == "GET" and "/git/commits/" in path:
+            return self._reply(200, {"sha": path.rsplit("/", 1)[-1], "tree": {"sha": "t0"}})
+        if method == "GET" and path.count("/") == 3:
+            return self._reply(200, {"default_branch": "main"})
+        if method == "POST" and path.endswith("/git/trees"):
+            sha = f"t{len(GitHubStub.trees) + 1}"
+            GitHubStub.trees[sha] = body["tree"]
+            return self._reply(201, {"sha": sha})
+        if method == "POST" and path.endswith("/git/commits"):
+            return self._reply(201, {"sha": f"c-{body['tree']}"})
+        if method == "POST" and path.endswith("/git/refs"):
+            GitHubStub.refs[body["ref"]] = body["sha"]
+            return self._reply(201, {"ref": body["ref"]})
+        if method == "PATCH" and "/git/refs/heads/" in path:
+            GitHubStub.refs["refs/heads/" + path.rsplit("/", 1)[-1]] = body["sha"]
+            return self._reply(200, {})
+        if method == "POST" and path.endswith("/pulls"):
+            return self._reply(201, {"number": 1, "html_url": "https://github.com/octo/demo/pull/1"})
+        return self._reply(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), GitHubStub)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["GITHUB_API_URL"] = f"http://127.0.0.1:{server.server_port}"
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import github_batch  # noqa: E402
+from github_batch import GitHubClient, GitHubError  # noqa: E402
+
+github_batch.GITHUB_API_URL = os.environ["GITHUB_API_URL"]  # in case another test imported it first
+
+
+def make_files(n):
+    return [{"path": f"src/file_{i}.ts", "content": f"export const n = {i};\n"} for i in range(n)]
+
+
+def test_constant_api_calls():
+    """One file or fifty, a PR branch costs the same number of requests."""
+    counts = []
+    for n in (1, 50):
+        client = GitHubClient("token")
+        result = client.commit_files("octo/demo", make_files(n), "Add files", branch=f"gen-{n}",
+                                     pull_request={"title": "Generated code"})
+        assert result["files"] == n
+        assert result["pull_request_number"] == 1
+        counts.append(client.calls)
+    # repo, ref, commit, tree, commit, ref, pull
+    assert counts == [7, 7], counts
+    print(f"✅ 1 file and 50 files both took {counts[0]} API calls")
+
+
+def test_single_commit_with_whole_tree():
+    GitHubStub.trees.clear()
+    result = GitHubClient("token").commit_files("octo/demo", make_files(3) + [{"path": "", "content": "x"}],
+                                                "Add files", base="main")
+    tree = GitHubStub.trees[result["commit_sha"].split("-", 1)[1]]
+    assert [entry["path"] for entry in tree] == ["src/file_0.ts", "src/file_1.ts", "src/file_2.ts"]
+    assert all(entry["mode"] == "100644" and "content" in entry for entry in tree)
+    assert GitHubStub.refs["refs/heads/main"] == result["commit_sha"]
+    print("✅ Tree committed in one commit and main fast-forwarded")
+
+
+def test_errors_surface_status():
+    try:
+        GitHubClient("token").commit_files("octo/demo", make_files(1), "Add files", base="missing")
+    except GitHubError as e:
+        assert e.status == 404
+        print("✅ Missing base branch raises GitHubError(404)")
+    else:
+        raise AssertionError("expected GitHubError")
+
+
+def test_create_github_repo_endpoint():
+    os.environ["GITHUB_TOKEN"] = "token"
+    from backend_api import app
+
+    GitHubStub.calls.clear()
+    response = app.test_client().post("/api/create-github-repo", json={"name": "demo", "files": make_files(20)})
+    data = response.get_json()
+    assert response.status_code == 200, data
+    assert data["files_committed"] == 20
+    # create repo, then ref, commit, tree, commit, ref update
+    assert len(GitHubStub.calls) == 6, GitHubStub.calls
+    print(f"✅ /api/create-github-repo pushed 20 files in {len(GitHubStub.calls)} requests")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing bulk GitHub commits against a local stub...")
+    print("=" * 50)
+    test_constant_api_calls()
+    test_single_commit_with_whole_tree()
+    test_errors_surface_status()
+    test_create_github_repo_endpoint()
+    print("=" * 50)
+    print("🎉 All GitHub batch tests passed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the linear pipeline graph (graph.build_linear_workflow).
+
+Worker agents are replaced by instant stubs that record the order they run
+in, so no API calls are made.
+
+    python3 test_graph.py
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.append('.')
+_tmp = tempfile.mkdtemp(prefix="graph-test-")
+os.environ.setdefault("ARTIFACT_DIR", _tmp)
+os.environ.setdefault("CHECKPOINT_DB", os.path.join(_tmp, "checkpoints.sqlite"))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+from agents import AgentName  # noqa: E402
+from graph import _make_worker_node, build_linear_workflow, build_supervisor_workflow  # noqa: E402
+from routing import PIPELINE_ORDER  # noqa: E402
+from state import get_initial_state  # noqa: E402
+
+STAGES = PIPELINE_ORDER[:-1]  # without FINISH
+SUPERVISOR = AgentName.SUPERVISOR.value
+APPROVAL = AgentName.HUMAN_IN_THE_LOOP.value
+
+
+def _stub_workers(calls):
+    def stub(stage):
+        def agent(state):
+            calls.append(stage)
+            return {"messages": [{"role": "assistant", "content": f'{{"stage": "{stage}"}}'}]}
+        return agent
+    return {stage: _make_worker_node(stage, stub(stage)) for stage in STAGES}
+
+
+def _config():
+    return {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": 100}
+
+
+def test_linear_graph_has_no_supervisor():
+    edges = {(e.source, e.target) for e in build_linear_workflow(_stub_workers([])).compile().get_graph().edges}
+    assert not any(SUPERVISOR in edge for edge in edges)
+    for stage, nxt in zip(STAGES, STAGES[1:]):
+        assert (stage, nxt) in edges, (stage, nxt)
+    assert (AgentName.RESEARCH_PLANNING.value, APPROVAL) in edges  # the optional approval step
+    print("✅ Stages are wired to each other in PIPELINE_ORDER, without a supervisor node")
+
+
+def test_stub_workers_run_in_order():
+    calls = []
+    graph = build_linear_workflow(_stub_workers(calls)).compile(checkpointer=MemorySaver())
+    steps = [next(iter(update)) for update in graph.stream(get_initial_state("AI recipe app"), config=_config())]
+    assert calls == STAGES
+    assert steps == [AgentName.IDEATION.value, AgentName.RESEARCH_PLANNING.value, AgentName.CODING.value,
+                     AgentName.DEPLOYMENT.value, AgentName.PRESENTATION.value]
+    print("✅ A run without approval takes one step per stage, in order")
+
+
+def test_fewer_steps_than_the_supervisor_graph():
+    linear = build_linear_workflow(_stub_workers([])).compile(checkpointer=MemorySaver())
+    calls = []
+    supervisor = build_supervisor_workflow(_stub_workers(calls)).compile(checkpointer=MemorySaver())
+    linear_steps = sum(1 for _ in linear.stream(get_initial_state("AI recipe app"), config=_config()))
+    supervisor_steps = sum(1 for _ in supervisor.stream(get_initial_state("AI recipe app"), config=_config()))
+    assert calls == STAGES  # same work either way
+    assert linear_steps == len(STAGES) < supervisor_steps
+    print(f"✅ {linear_steps} steps on the linear graph vs {supervisor_steps} with supervisor hops")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the linear pipeline graph...")
+    print("=" * 50)
+    test_linear_graph_has_no_supervisor()
+    test_stub_workers_run_in_order()
+    test_fewer_steps_than_the_supervisor_graph()
+    print("=" * 50)
+    print("🎉 All graph tests passed!")
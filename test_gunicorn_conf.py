@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the production server mode (gunicorn.conf.py, wsgi.py).
+
+Reads the config with different environments, runs post_fork by hand, and
+starts a real two-worker gunicorn on a free local port to hit /api/health.
+No Gemini call is made.
+
+    python3 test_gunicorn_conf.py
+"""
+
+import os
+import runpy
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import requests  # noqa: E402
+
+CONF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+ENV_KEYS = ("WEB_WORKERS", "WEB_THREADS", "WEB_PRELOAD", "WEB_TIMEOUT", "PIPELINE_BUDGET_SECONDS", "PORT", "WEB_BIND")
+
+
+def _load(**env):
+    saved = {key: os.environ.pop(key, None) for key in ENV_KEYS}
+    os.environ.update(env)
+    try:
+        return runpy.run_path(CONF)
+    finally:
+        for key in ENV_KEYS:
+            os.environ.pop(key, None)
+            if saved[key] is not None:
+                os.environ[key] = saved[key]
+
+
+def test_defaults():
+    conf = _load()
+    assert conf["workers"] == 1 and conf["worker_class"] == "gthread" and conf["threads"] >= 8
+    assert conf["preload_app"] is True
+    assert conf["bind"] == "0.0.0.0:3001"
+    assert conf["timeout"] == conf["graceful_timeout"] == 180  # PIPELINE_BUDGET_SECONDS (150) + 30
+    print("✅ One gthread worker by default, timeouts sized from the pipeline budget")
+
+
+def test_environment_overrides():
+    conf = _load(WEB_WORKERS="3", WEB_THREADS="4", WEB_PRELOAD="false", PIPELINE_BUDGET_SECONDS="60", PORT="8080")
+    assert (conf["workers"], conf["threads"], conf["preload_app"]) == (3, 4, False)
+    assert conf["timeout"] == 90 and conf["bind"] == "0.0.0.0:8080"
+    assert _load(WEB_TIMEOUT="30")["timeout"] == 30
+    print("✅ WEB_* and PIPELINE_BUDGET_SECONDS override the settings")
+
+
+def test_post_fork_rebuilds_the_gemini_client():
+    import prompts
+    import simple_agents
+
+    before = simple_agents.llm
+    prompts.with_output_budget(before, 123)
+    assert prompts._budgeted_models
+    _load()["post_fork"](None, None)
+    assert simple_agents.llm is not before
+    assert not prompts._budgeted_models
+    print("✅ post_fork gives the worker its own Gemini client and drops the capped copies")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_preloaded_workers_serve_requests():
+    port = _free_port()
+    tmp = tempfile.mkdtemp(prefix="gunicorn-test-")
+    env = dict(os.environ, WEB_BIND=f"127.0.0.1:{port}", WEB_WORKERS="2", WEB_THREADS="2", WEB_ACCESS_LOG="",
+               ARTIFACT_DIR=tmp, CHECKPOINT_DB=os.path.join(tmp, "checkpoints.sqlite"))
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", CONF, "wsgi:app"],
+                              cwd=os.path.dirname(CONF), env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                # An idle keep-alive connection would hold its worker open through the graceful shutdown
+                response = requests.get(f"http://127.0.0.1:{port}/api/health", timeout=5, headers={"Connection": "close"})
+                break
+            except requests.ConnectionError:
+                assert server.poll() is None, "gunicorn exited during startup"
+                assert time.monotonic() < deadline, "gunicorn did not start in 60s"
+                time.sleep(0.5)
+        assert response.status_code == 200, response.text
+        assert response.json()["status"] in ("ready", "degraded")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    print("✅ gunicorn with the preloaded app answers /api/health and stops on SIGTERM")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the production server config...")
+    print("=" * 50)
+    test_defaults()
+    test_environment_overrides()
+    test_post_fork_rebuilds_the_gemini_client()
+    test_preloaded_workers_serve_requests()
+    print("=" * 50)
+    print("🎉 All production server tests passed!")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test Idempotency-Key handling (idempotency.py) on a small Flask app.
+
+The decorated views count their calls; no pipeline runs.
+
+    python3 test_idempotency.py
+"""
+
+import sys
+import threading
+import time
+
+sys.path.append('.')
+
+from flask import Flask, jsonify, request  # noqa: E402
+
+import idempotency  # noqa: E402
+from idempotency import IdempotencyStore, idempotent  # noqa: E402
+
+app = Flask(__name__)
+calls = {"create": 0, "flaky": 0, "slow": 0}
+
+
+@app.route("/create", methods=["POST"])
+@idempotent
+def create():
+    calls["create"] += 1
+    return jsonify({"run": calls["create"], "idea": request.get_json().get("idea")})
+
+
+@app.route("/flaky", methods=["POST"])
+@idempotent
+def flaky():
+    calls["flaky"] += 1
+    if calls["flaky"] == 1:
+        return jsonify({"error": "upstream down"}), 503
+    return jsonify({"run": calls["flaky"]})
+
+
+@app.route("/slow", methods=["POST"])
+@idempotent
+def slow():
+    calls["slow"] += 1
+    time.sleep(0.2)
+    return jsonify({"run": calls["slow"]})
+
+
+def _post(path, key, body=None, client="a"):
+    headers = {"X-API-Key": client}
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return app.test_client().post(path, json=body or {"idea": "recipes"}, headers=headers)
+
+
+def _reset():
+    idempotency.idempotency_store = IdempotencyStore()
+    for name in calls:
+        calls[name] = 0
+
+
+def test_replay_runs_once():
+    _reset()
+    first = _post("/create", "k1")
+    second = _post("/create", "k1")
+    assert calls["create"] == 1
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert _post("/create", None).get_json()["run"] == 2  # no header: runs as usual
+    print("✅ A retried key replays the stored response without running again")
+
+
+def test_key_scope_and_mismatch():
+    _reset()
+    _post("/create", "k1")
+    assert _post("/create", "k1", client="b").get_json()["run"] == 2  # other client, own key space
+    mismatch = _post("/create", "k1", body={"idea": "something else"})
+    assert mismatch.status_code == 422
+    assert _post("/create", "").status_code == 400
+    assert _post("/create", "x" * 300).status_code == 400
+    print("✅ Keys are per client; reuse with another body is 422, bad keys 400")
+
+
+def test_retryable_failures_are_not_stored():
+    _reset()
+    assert _post("/flaky", "k2").status_code == 503
+    retry = _post("/flaky", "k2")
+    assert retry.status_code == 200 and calls["flaky"] == 2
+    assert "Idempotent-Replayed" not in retry.headers
+    print("✅ After a 5xx the key is released and the retry really runs")
+
+
+def test_concurrent_duplicate_joins_the_first_run():
+    _reset()
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(_post("/slow", "k3"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls["slow"] == 1
+    assert [r.get_json()["run"] for r in responses] == [1, 1, 1]
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 2
+    print("✅ Duplicates arriving mid-run wait for it instead of running again")
+
+
+def test_store_bounds():
+    store = IdempotencyStore(max_keys=2, max_bytes=1024, ttl=60)
+    with app.test_request_context():
+        for key in ("a", "b", "c"):
+            state, entry = store.begin(key, "fp")
+            assert state == "new"
+            store.finish(key, entry, jsonify({"key": key}))
+        in_flight = store.begin("d", "fp")[1]
+        assert store.stats()["keys"] == 3  # a evicted; d is in flight and never evicted
+        assert store.begin("a", "fp")[0] == "new"
+        store.abandon("d", in_flight)
+        assert store.stats()["evicted"] >= 1
+    print("✅ The store stays within max_keys and never evicts in-flight keys")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Idempotency-Key handling...")
+    print("=" * 50)
+    test_replay_runs_once()
+    test_key_scope_and_mismatch()
+    test_retryable_failures_are_not_stored()
+    test_concurrent_duplicate_joins_the_first_run()
+    test_store_bounds()
+    print("=" * 50)
+    print("🎉 All idempotency tests passed!")
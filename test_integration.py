@@ -14,6 +14,10 @@ sys.path.append('.')
 # Load environment variables
 load_dotenv()
 
+# CASSETTE_MODE=record|replay|once records/replays LLM and HTTP calls (cassettes.py)
+from cassettes import install_from_env
+install_from_env("integration")
+
 def test_hackathon_workflow():
     """Test the complete hackathon workflow."""
     print("🧪 Testing HackathonAgent Integration...")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test approval interrupts and resumes on the SQLite checkpointer (graph.py, jobs.py).
+
+Worker agents are stubs and checkpoints go to a temporary database, so no
+API calls are made.
+
+    python3 test_jobs.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append('.')
+_tmp = tempfile.mkdtemp(prefix="jobs-test-")
+os.environ.setdefault("ARTIFACT_DIR", _tmp)
+os.environ.setdefault("CHECKPOINT_DB", os.path.join(_tmp, "checkpoints.sqlite"))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from langgraph.checkpoint.sqlite import SqliteSaver  # noqa: E402
+from langgraph.types import Command  # noqa: E402
+
+import graph  # noqa: E402
+import jobs  # noqa: E402
+from agents import AgentName  # noqa: E402
+from graph import _make_worker_node, build_linear_workflow  # noqa: E402
+from routing import PIPELINE_ORDER  # noqa: E402
+from state import get_initial_state  # noqa: E402
+
+STAGES = PIPELINE_ORDER[:-1]
+APPROVAL = AgentName.HUMAN_IN_THE_LOOP.value
+DB = os.path.join(_tmp, "approval.sqlite")
+calls = []
+
+
+def _stub(stage):
+    def agent(state):
+        calls.append(stage)
+        return {"messages": [{"role": "assistant", "content": f'{{"stage": "{stage}"}}'}]}
+    return agent
+
+
+STUB_WORKERS = {stage: _make_worker_node(stage, _stub(stage)) for stage in STAGES}
+
+
+def _open_app():
+    """A fresh connection to the checkpoint file, as a restarted process would have."""
+    default, graph.CHECKPOINT_DB = graph.CHECKPOINT_DB, DB
+    try:
+        checkpointer = graph.make_checkpointer()
+    finally:
+        graph.CHECKPOINT_DB = default
+    assert isinstance(checkpointer, SqliteSaver)
+    return build_linear_workflow(STUB_WORKERS).compile(checkpointer=checkpointer), checkpointer
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}, "recursion_limit": 100}
+
+
+def test_interrupt_survives_a_restart_and_resumes():
+    calls.clear()
+    thread_id = str(uuid.uuid4())
+    app, checkpointer = _open_app()
+    for _ in app.stream(get_initial_state("AI recipe app", require_approval=True), config=_config(thread_id)):
+        pass
+    paused = app.get_state(_config(thread_id))
+    assert calls == STAGES[:2] and paused.next == (APPROVAL,)
+    assert paused.tasks[0].interrupts[0].value["stage"] == AgentName.RESEARCH_PLANNING.value
+    checkpointer.conn.close()
+
+    app, checkpointer = _open_app()  # nothing in memory carries over
+    for _ in app.stream(Command(resume={"approved": True, "feedback": " ship it "}), config=_config(thread_id)):
+        pass
+    done = app.get_state(_config(thread_id))
+    assert calls == STAGES and not done.next
+    assert done.values["status"] == "approved" and done.values["human_feedback"] == "ship it"
+    assert done.values["completed_stages"] == STAGES
+    checkpointer.conn.close()
+    print("✅ A run paused for approval resumes from the SQLite checkpoint after a restart")
+
+
+def test_rejection_ends_the_run():
+    calls.clear()
+    thread_id = str(uuid.uuid4())
+    app, checkpointer = _open_app()
+    for _ in app.stream(get_initial_state("AI recipe app", require_approval=True), config=_config(thread_id)):
+        pass
+    for _ in app.stream(Command(resume={"approved": False, "feedback": "no"}), config=_config(thread_id)):
+        pass
+    done = app.get_state(_config(thread_id))
+    assert calls == STAGES[:2] and not done.next and done.values["status"] == "rejected"
+    checkpointer.conn.close()
+    print("✅ Rejecting the research ends the run before coding")
+
+
+def _wait_for(job_id, status, timeout=10):
+    """The job's status once it is `status` and its run has let go of its scheduler ticket."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = jobs.get_job(job_id)
+        if job and job["status"] == status and job_id not in jobs._tickets:
+            return job
+        assert time.monotonic() < deadline, job
+        time.sleep(0.02)
+
+
+def test_jobs_pause_and_approve():
+    calls.clear()
+    original = jobs.linear_app
+    jobs.linear_app, checkpointer = _open_app()
+    try:
+        job_id = jobs.start_job("AI recipe app", require_approval=True)
+        job = _wait_for(job_id, "awaiting_approval")
+        assert job["approval"]["research"] == {"stage": AgentName.RESEARCH_PLANNING.value}
+        assert job_id in jobs._owners  # kept for the resume; the paused job holds no worker or slot
+        assert jobs.approve_job(job_id, approved=True, feedback="ok")
+        assert not jobs.approve_job(job_id)  # already resuming or done
+        job = _wait_for(job_id, "completed")
+        assert job["completed_stages"] == STAGES
+        assert job["result"]["presentation"] == {"stage": AgentName.PRESENTATION.value}
+        assert job_id not in jobs._owners
+        assert jobs.get_job(str(uuid.uuid4())) is None
+    finally:
+        jobs.linear_app = original
+        checkpointer.conn.close()
+    print("✅ Jobs wait for approval without a worker, then resume to completion")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing approval interrupts and job resumes...")
+    print("=" * 50)
+    test_interrupt_survives_a_restart_and_resumes()
+    test_rejection_ends_the_run()
+    test_jobs_pause_and_approve()
+    print("=" * 50)
+    print("🎉 All job tests passed!")
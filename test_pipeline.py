@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test the pipeline engine's executors (pipeline.py) with fake stage agents.
+
+Agents are swapped for functions returning the stage templates, so no
+LLM is called.
+
+    python3 test_pipeline.py
+"""
+
+import dataclasses
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append('.')
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import fallbacks  # noqa: E402
+import pipeline  # noqa: E402
+from admission import admission_controller  # noqa: E402
+import simple_agents  # noqa: E402
+from pipeline import EXECUTORS, STAGES, Stage, run_pipeline  # noqa: E402
+
+IDEA = "AI recipe generator web app"
+
+
+def _fake_stages(delay: float = 0.0, log: list = None):
+    def make_agent(stage):
+        payload = fallbacks.FALLBACKS[stage.name](IDEA)
+
+        def agent(job):
+            if log is not None:
+                log.append(stage.name)
+            time.sleep(delay)
+            if stage.name == "validation":
+                return {"success": True, "validation": {"status": "passed", "repairs": {}}}
+            return {"success": True, stage.result_key: payload}
+        return agent
+
+    return tuple(dataclasses.replace(stage, agent=make_agent(stage)) for stage in STAGES)
+
+
+def test_every_executor_gives_the_same_result():
+    results = {}
+    for name in EXECUTORS:
+        log = []
+        result = run_pipeline(IDEA, executor=name, stages=_fake_stages(log=log))
+        assert result["degraded"] == [], (name, result["degraded"])
+        assert sorted(log) == sorted(stage.name for stage in STAGES), (name, log)
+        # Dependencies first: coding after research, deployment after validation
+        assert log.index("research") < log.index("coding") < log.index("validation") < log.index("deployment"), log
+        results[name] = {k: v for k, v in result.items() if k != "timings"}
+    assert all(r == results["sync"] for r in results.values())
+    print(f"✅ {', '.join(EXECUTORS)} executors run every stage after its dependencies")
+
+
+def test_independent_stages_overlap():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow(name):
+        def agent(text):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+            return {"success": True, name: {"ok": True}}
+        return agent
+
+    # research and deployment both only need ideation: a diamond
+    stages = (
+        Stage("ideation", "ideas", lambda text: {"success": True, "ideas": [{"title": "x"}]}, lambda run: IDEA),
+        Stage("research", "research", slow("research"), lambda run: run.title, ("ideation",)),
+        Stage("deployment", "deployment", slow("deployment"), lambda run: run.title, ("ideation",)),
+        Stage("presentation", "presentation", slow("presentation"), lambda run: run.title, ("research", "deployment")),
+    )
+    for name in ("threaded", "asyncio", "langgraph"):
+        peak[0] = 0
+        result = run_pipeline(IDEA, executor=name, stages=stages)
+        assert result["degraded"] == [] and peak[0] == 2, (name, peak[0])
+    peak[0] = 0
+    run_pipeline(IDEA, executor="sync", stages=stages)
+    assert peak[0] == 1
+    print("✅ Stages whose dependencies are done run concurrently (not with sync)")
+
+
+def test_validation_repairs_are_merged_into_code():
+    stages = list(_fake_stages())
+    index = next(i for i, s in enumerate(stages) if s.name == "validation")
+    path = fallbacks.FALLBACKS["coding"](IDEA)["files"][0]["path"]
+    stages[index] = dataclasses.replace(stages[index], agent=lambda job: {
+        "success": True, "validation": {"status": "repaired", "repaired": [path], "repairs": {path: "fixed"}},
+    })
+    result = run_pipeline(IDEA, executor="sync", stages=tuple(stages))
+    files = {f["path"]: f["content"] for f in result["code"]["files"]}
+    assert files[path] == "fixed"
+    assert "repairs" not in result["validation"]
+    print("✅ Repaired files replace the generated ones")
+
+
+def test_shed_runs_use_templates_only():
+    calls = []
+    stages = tuple(dataclasses.replace(s, agent=lambda text: calls.append(text)) for s in STAGES)
+    result = run_pipeline(IDEA, stages=stages, shed=True)
+    assert calls == [] and result["shed"] is True
+    assert result["ideas"] == fallbacks.fallback_ideas(IDEA)
+    print("✅ A shed run returns the templates without calling any agent")
+
+
+def test_bad_configuration_is_rejected():
+    for call in (
+        lambda: pipeline.get_executor("threads"),
+        lambda: run_pipeline(IDEA, executor="sync", stages=(Stage("coding", "code", None, None, ("missing",)),)),
+    ):
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError("expected ValueError")
+    print("✅ Unknown executors and dependencies raise ValueError")
+
+
+def test_bad_answers_do_not_cut_the_admission_limit():
+    stages = tuple(dataclasses.replace(s, agent=lambda text: {"success": False, "error": "bad JSON"}) for s in STAGES)
+    decreases = admission_controller.decreases
+    result = run_pipeline(IDEA, executor="sync", stages=stages)
+    assert len(result["degraded"]) == len(STAGES)
+    assert admission_controller.decreases == decreases
+    print("✅ Fast malformed answers fall back without cutting the admission limit")
+
+
+def test_graph_nodes_share_one_deadline():
+    calls = []
+    original = simple_agents.ideation_agent
+    simple_agents.ideation_agent = lambda text: calls.append(text) or {"success": True, "ideas": [{"title": "Live"}]}
+    try:
+        node = pipeline.langgraph_agent("ideation")
+        state = {"messages": [{"role": "user", "content": IDEA}]}
+        expired = node({**state, "pipeline_expires_at": time.time() - 1})
+        assert calls == [] and expired["degraded"] == ["ideation"]
+        assert json.loads(expired["messages"][0]["content"]) == fallbacks.fallback_ideas(IDEA)
+        live = node({**state, "pipeline_expires_at": time.time() + 60})
+        assert calls == [IDEA] and live["degraded"] == []
+    finally:
+        simple_agents.ideation_agent = original
+    print("✅ Graph nodes draw on the run's pipeline_expires_at instead of a fresh budget each")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the pipeline executors...")
+    print("=" * 50)
+    test_every_executor_gives_the_same_result()
+    test_independent_stages_overlap()
+    test_validation_repairs_are_merged_into_code()
+    test_shed_runs_use_templates_only()
+    test_bad_configuration_is_rejected()
+    test_bad_answers_do_not_cut_the_admission_limit()
+    test_graph_nodes_share_one_deadline()
+    print("=" * 50)
+    print("🎉 All pipeline tests passed!")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test the prompt template registry, output budgets and streamed JSON parsing (prompts.py).
+
+Uses a private PromptRegistry and fake model responses, so no API calls are made.
+
+    python3 test_prompts.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.append('.')
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from langchain_core.language_models import FakeListChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+
+import prompts  # noqa: E402
+import simple_agents  # noqa: E402
+from prompts import JsonArrayStream, PromptRegistry, estimate_tokens, prompt_registry  # noqa: E402
+
+PREFIX = """
+    You are an ideation expert.
+
+    Return ONLY valid JSON:
+    [{"title": "Project Name"}]
+"""
+SUFFIX = """
+    Topic: "{topic}"
+    Audience: {audience}
+"""
+
+
+def _registry():
+    registry = PromptRegistry()
+    registry.register("ideas", PREFIX, SUFFIX)
+    return registry
+
+
+def test_compiled_once_into_prefix_and_suffix():
+    template = _registry()["ideas"]
+    assert template.prefix == 'You are an ideation expert.\n\nReturn ONLY valid JSON:\n[{"title": "Project Name"}]\n\n'
+    assert template.fields == ("topic", "audience")
+    assert template.prefix_tokens == estimate_tokens(template.prefix)
+    # The example JSON's braces are in the prefix, which is never formatted
+    assert template.render(topic="recipes", audience="cooks") == template.prefix + 'Topic: "recipes"\nAudience: cooks'
+    print("✅ Templates compile to a dedented static prefix and a small format suffix")
+
+
+def test_every_call_starts_with_the_same_prefix():
+    registry = _registry()
+    first = registry.messages("ideas", topic="recipes", audience="cooks")[0].content
+    second = registry.messages("ideas", topic="a fitness tracker for runners", audience="athletes")[0].content
+    prefix = registry["ideas"].prefix
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert first[len(prefix):] == 'Topic: "recipes"\nAudience: cooks'
+    # All variable parts come after the shared prefix
+    common = len(os.path.commonprefix([first, second]))
+    assert common >= len(prefix) and "recipes" not in first[:common]
+    print("✅ Calls differ only after the shared static prefix (what prefix caching matches on)")
+
+
+def test_pipeline_templates_render():
+    for name, values in {
+        "ideation": {"user_input": "AI recipes"},
+        "research": {"sources": "", "idea": "AI recipes"},
+        "coding": {"idea": "AI recipes"},
+        "presentation": {"idea": "AI recipes"},
+    }.items():
+        template = prompt_registry[name]
+        assert set(template.fields) == set(values), name
+        assert "AI recipes" in template.render_suffix(**values), name
+        assert "{" in template.prefix  # example JSON kept verbatim
+    print("✅ The pipeline templates render with their own fields")
+
+
+def test_token_accounting():
+    registry = _registry()
+    registry.messages("ideas", topic="recipes", audience="cooks")
+    response = AIMessage(content="[]", usage_metadata={
+        "input_tokens": 100, "output_tokens": 20, "total_tokens": 120,
+        "input_token_details": {"cache_read": 60},
+    })
+    registry.record_usage("ideas", response)
+    registry.record_usage("ideas", AIMessage(content="no usage"))  # ignored
+    stats = registry.stats()["ideas"]
+    assert stats["calls"] == 1 and stats["static_tokens"] == registry["ideas"].prefix_tokens
+    assert stats["avg_input_tokens"] == 100.0 and stats["output_tokens"] == 20
+    assert stats["cached_token_ratio"] == 0.6 and stats["billed_input_tokens"] == 40
+    print("✅ Per-template stats count calls, reported tokens and the cached share")
+
+
+def test_invoke_counts_the_call():
+    registry = _registry()
+    llm = FakeListChatModel(responses=['[{"title": "Recipes"}]'])
+    response = registry.invoke(llm, "ideas", topic="recipes", audience="cooks")
+    assert response.content == '[{"title": "Recipes"}]'
+    assert registry.stats()["ideas"]["calls"] == 1
+    print("✅ invoke() renders, calls the model and records the call")
+
+
+IDEAS = [{"title": f"Idea {i}", "pitch": f'Pitch {i} with {{braces}}, "quotes" and a \\ backslash', "tech": "React"}
+         for i in range(6)]
+STREAMED = "```json\n" + json.dumps(IDEAS, indent=2) + "\n```"
+
+
+class CountingModel(FakeListChatModel):
+    """FakeListChatModel (one chunk per character) that counts the chunks actually pulled."""
+
+    chunks_sent: int = 0
+
+    def _stream(self, *args, **kwargs):
+        for chunk in super()._stream(*args, **kwargs):
+            self.chunks_sent += 1
+            yield chunk
+
+
+def test_json_array_stream_parses_incrementally():
+    stream = JsonArrayStream()
+    seen = []
+    for end in range(1, len(STREAMED) + 1):
+        count = len(stream.feed(STREAMED[:end]))
+        if not seen or count != seen[-1][1]:
+            seen.append((end, count))
+    assert stream.items == IDEAS
+    # Each idea is available as soon as its closing brace arrives, not at the end of the array
+    first_done = STREAMED.index("\n  }") + 4
+    assert seen[1] == (first_done, 1)
+    assert stream.feed(STREAMED) == IDEAS  # feeding the same text again adds nothing
+    print("✅ Objects are parsed as soon as they close; fences, braces and quotes in strings are skipped")
+
+
+def test_json_array_stream_skips_broken_items():
+    stream = JsonArrayStream()
+    assert stream.feed('Sure! Here you go: [{"title": "A"}, {"title": bad}, 7, {"title": "B"}') == [
+        {"title": "A"}, {"title": "B"}]
+    assert JsonArrayStream().feed('{"title": "no array"}') == []
+    print("✅ Prose before the array, invalid objects and non-objects are ignored")
+
+
+def test_stream_stops_early():
+    registry = _registry()
+    llm = CountingModel(responses=[STREAMED])
+    stream = JsonArrayStream()
+    text, stopped = registry.stream(llm, "ideas", topic="recipes", audience="cooks",
+                                    until=lambda so_far: len(stream.feed(so_far)) >= 2)
+    assert stopped and stream.items == IDEAS[:2]
+    assert llm.chunks_sent == len(text) < len(STREAMED) // 2  # the rest was never pulled
+    stats = registry.stats()["ideas"]
+    assert stats["early_stops"] == 1 and stats["output_tokens"] == estimate_tokens(text)
+    print(f"✅ Streaming stopped after {len(text)} of {len(STREAMED)} characters")
+
+
+def test_ideation_stops_after_enough_ideas():
+    llm = CountingModel(responses=[STREAMED])
+    original, simple_agents.llm = simple_agents.llm, llm
+    try:
+        result = simple_agents.ideation_agent("an underwater drone that maps coral reefs")
+    finally:
+        simple_agents.llm = original
+    assert result["success"] and result["ideas"] == IDEAS[:simple_agents.IDEATION_STOP_AFTER]
+    assert llm.chunks_sent < len(STREAMED)
+    print(f"✅ Ideation keeps the first {simple_agents.IDEATION_STOP_AFTER} ideas and stops generating")
+
+
+def test_output_budgets():
+    llm = simple_agents.make_llm()
+    capped = prompts.with_output_budget(llm, 123)
+    assert capped.max_output_tokens == 123 and llm.max_output_tokens != 123
+    assert prompts.with_output_budget(llm, 123) is capped  # one copy per model and cap
+    assert prompts.with_output_budget(llm, 0) is llm
+    assert prompt_registry.model_for(llm, "coding").max_output_tokens == prompts.OUTPUT_TOKEN_BUDGETS["coding"]
+
+    registry = _registry()
+    registry.messages("ideas", topic="recipes", audience="cooks")
+    registry.record_usage("ideas", AIMessage(content="[", response_metadata={"finish_reason": "MAX_TOKENS"},
+                                             usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}))
+    assert registry.stats()["ideas"]["truncated"] == 1
+    print("✅ Templates get a cached capped model copy; responses cut at the cap are counted")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the prompt registry...")
+    print("=" * 50)
+    test_compiled_once_into_prefix_and_suffix()
+    test_every_call_starts_with_the_same_prefix()
+    test_pipeline_templates_render()
+    test_token_accounting()
+    test_invoke_counts_the_call()
+    test_json_array_stream_parses_incrementally()
+    test_json_array_stream_skips_broken_items()
+    test_stream_stops_early()
+    test_ideation_stops_after_enough_ideas()
+    test_output_budgets()
+    print("=" * 50)
+    print("🎉 All prompt tests passed!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the supervisor routing policies (routing.py).
+
+The LLM policy is replaced by a stub, so no API calls are made.
+
+    python3 test_routing.py
+"""
+
+import os
+import sys
+
+sys.path.append('.')
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import routing  # noqa: E402
+from agents import AgentName  # noqa: E402
+from routing import HybridRoutingPolicy, RoutingDecision, RoutingMetrics, TransitionTablePolicy  # noqa: E402
+
+IDEATION = AgentName.IDEATION.value
+RESEARCH = AgentName.RESEARCH_PLANNING.value
+CODING = AgentName.CODING.value
+FINISH = AgentName.FINISH.value
+
+
+class StubLLMPolicy:
+    name = "llm"
+
+    def __init__(self, next_agent=None, error=None):
+        self.next_agent, self.error, self.calls = next_agent, error, 0
+
+    def decide(self, state):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return RoutingDecision(self.next_agent, "stub", self.name)
+
+
+def _hybrid(llm):
+    policy = HybridRoutingPolicy()
+    policy.llm = llm
+    return policy
+
+
+def test_table_follows_pipeline_order():
+    table = TransitionTablePolicy()
+    assert table.decide({}).next_agent == IDEATION
+    assert table.decide({"last_agent": IDEATION}).next_agent == RESEARCH
+    assert table.decide({"completed_stages": [IDEATION, RESEARCH]}).next_agent == CODING
+    assert table.decide({"last_agent": AgentName.HUMAN_IN_THE_LOOP.value}).next_agent == CODING
+    assert table.decide({"last_agent": CODING, "status": "rejected"}).next_agent == FINISH
+    print("✅ The transition table walks the pipeline; rejection finishes")
+
+
+def test_hybrid_only_asks_the_llm_when_ambiguous():
+    llm = StubLLMPolicy(next_agent=CODING)
+    policy = _hybrid(llm)
+    assert policy.decide({"last_agent": RESEARCH}).policy == "table"
+    # A stage that errored with an "Error:" message but no degraded marker is not a failure signal
+    assert policy.decide({"last_agent": RESEARCH, "messages": [{"content": "Error: x"}]}).policy == "table"
+    assert llm.calls == 0
+
+    decision = policy.decide({"last_agent": CODING, "last_degraded": True, "same_agent_count": 0})
+    assert decision.policy == "llm" and decision.next_agent == CODING
+    feedback = {"last_agent": AgentName.HUMAN_IN_THE_LOOP.value, "human_feedback": "more detail"}
+    assert policy.decide(feedback).policy == "llm"
+    assert llm.calls == 2
+    print("✅ Hybrid routing consults the LLM only after degraded stages or feedback")
+
+
+def test_hybrid_caps_retries_and_survives_llm_errors():
+    llm = StubLLMPolicy(error=RuntimeError("supervisor down"))
+    policy = _hybrid(llm)
+    retried = {"last_agent": CODING, "last_degraded": True, "same_agent_count": routing.MAX_RETRIES}
+    assert policy.decide(retried).policy == "table" and llm.calls == 0
+    decision = policy.decide({"last_agent": CODING, "last_degraded": True, "same_agent_count": 0})
+    assert decision.policy == "table" and decision.next_agent == AgentName.DEPLOYMENT.value
+    assert llm.calls == 1
+    print("✅ Retries are capped and LLM errors fall back to the table")
+
+
+def test_unknown_policy_is_rejected():
+    assert isinstance(routing.make_policy("table"), TransitionTablePolicy)
+    try:
+        routing.make_policy("hybird")
+    except ValueError as e:
+        assert "hybird" in str(e)
+        print("✅ Unknown SUPERVISOR_ROUTING values raise ValueError")
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_metrics_keep_recent_decisions():
+    metrics = RoutingMetrics(history=2)
+    for agent in (IDEATION, RESEARCH, CODING):
+        metrics.record(RoutingDecision(agent, "", "table", latency_us=5.0))
+    assert [d["next_agent"] for d in metrics.recent_decisions()] == [RESEARCH, CODING]
+    assert metrics.snapshot()["table"]["count"] == 3
+    print("✅ Metrics count every decision and keep the most recent ones")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing supervisor routing...")
+    print("=" * 50)
+    test_table_follows_pipeline_order()
+    test_hybrid_only_asks_the_llm_when_ambiguous()
+    test_hybrid_caps_retries_and_survives_llm_errors()
+    test_unknown_policy_is_rejected()
+    test_metrics_keep_recent_decisions()
+    print("=" * 50)
+    print("🎉 All routing tests passed!")
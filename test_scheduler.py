@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test fair-share scheduling of pipeline runs (scheduler.py).
+
+Tickets are submitted and released by hand; nothing runs.
+
+    python3 test_scheduler.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+from flask import Flask, request  # noqa: E402
+
+from scheduler import FairScheduler, QueueFull, request_priority  # noqa: E402
+
+
+def _running(scheduler):
+    return sorted((t.client, t.priority) for t in scheduler._running.values())
+
+
+def test_interactive_before_batch_and_batch_share():
+    scheduler = FairScheduler(max_concurrent=4, batch_slots=2, per_client=4)
+    batch = [scheduler.submit("jobs", "batch") for _ in range(4)]
+    assert [t.state for t in batch] == ["running", "running", "queued", "queued"]
+    interactive = [scheduler.submit(f"user{i}") for i in range(3)]
+    assert [t.state for t in interactive] == ["running", "running", "queued"]
+    scheduler.release(batch[0])
+    # The freed slot goes to the waiting interactive run, not the next batch run
+    assert interactive[2].state == "running" and batch[2].state == "queued"
+    print("✅ Interactive runs go first; batch stays within its slots")
+
+
+def test_round_robin_across_clients():
+    scheduler = FairScheduler(max_concurrent=1, batch_slots=0, per_client=1)
+    first = scheduler.submit("heavy")
+    heavy = [scheduler.submit("heavy") for _ in range(3)]
+    light = scheduler.submit("light")
+    scheduler.release(first)
+    assert heavy[0].state == "running"
+    scheduler.release(heavy[0])
+    # The newcomer waits behind one run of the heavy client, not all of them
+    assert light.state == "running"
+    print("✅ Clients take turns instead of first come, first served")
+
+
+def test_per_client_caps():
+    scheduler = FairScheduler(max_concurrent=4, per_client=1, max_queued=2)
+    scheduler.submit("a")
+    scheduler.submit("a")
+    scheduler.submit("a")
+    assert _running(scheduler) == [("a", "interactive")]
+    try:
+        scheduler.submit("a")
+    except QueueFull as e:
+        assert e.retry_after > 0
+        print("✅ Per-client running and queued caps apply (QueueFull)")
+    else:
+        raise AssertionError("expected QueueFull")
+
+
+def test_batch_never_takes_the_last_slot():
+    scheduler = FairScheduler(max_concurrent=4, batch_slots=2)
+    assert [scheduler._batch_limit(n) for n in (1, 2, 3, 4, 8)] == [0, 1, 2, 2, 4]
+    scheduler.set_limit(1)
+    batch = scheduler.submit("jobs", "batch")
+    assert batch.state == "queued"
+    interactive = scheduler.submit("user")
+    assert interactive.state == "running"
+    scheduler.set_limit(2)
+    assert batch.state == "running"
+    print("✅ At a limit of 1 the slot is kept for interactive runs")
+
+
+def test_wait_timeout_withdraws_the_ticket():
+    scheduler = FairScheduler(max_concurrent=1)
+    scheduler.submit("a")
+    late = scheduler.submit("b")
+    assert scheduler.wait(late, timeout=0.05) is False
+    assert late.state == "timed_out"
+    assert scheduler.load()["queued"]["interactive"] == 0
+    print("✅ A ticket that times out leaves the queue")
+
+
+def test_clients_cannot_raise_their_priority():
+    app = Flask(__name__)
+    cases = [
+        ({}, {}, "interactive", "interactive"),
+        ({"priority": "batch"}, {}, "interactive", "batch"),
+        ({}, {"X-Priority": "batch"}, "interactive", "batch"),
+        ({"priority": "interactive"}, {}, "batch", "batch"),
+        ({}, {"X-Priority": "interactive"}, "batch", "batch"),
+        ({"priority": "urgent"}, {}, "interactive", "interactive"),
+    ]
+    for body, headers, default, expected in cases:
+        with app.test_request_context(json=body, headers=headers):
+            assert request_priority(request, body, default=default) == expected, (body, headers, default)
+    print("✅ The endpoint sets the priority; clients can only lower theirs to batch")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the fair-share scheduler...")
+    print("=" * 50)
+    test_interactive_before_batch_and_batch_share()
+    test_round_robin_across_clients()
+    test_per_client_caps()
+    test_batch_never_takes_the_last_slot()
+    test_wait_timeout_withdraws_the_ticket()
+    test_clients_cannot_raise_their_priority()
+    print("=" * 50)
+    print("🎉 All scheduler tests passed!")
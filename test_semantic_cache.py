@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the semantic near-duplicate cache (semantic_cache.py).
+
+Pure in-memory: no API keys or network needed.
+
+    python3 test_semantic_cache.py
+"""
+
+import sys
+import time
+
+sys.path.append('.')
+
+from semantic_cache import SemanticCache, embed  # noqa: E402
+
+
+def test_near_duplicates_hit():
+    cache = SemanticCache(threshold=0.85)
+    cache.store("ideation", "AI recipe app", ["idea"])
+    assert cache.lookup("ideation", "an AI recipe app") == ["idea"]
+    assert cache.lookup("ideation", "AI recipes web app") == ["idea"]
+    print("✅ Near-duplicate prompts reuse the stored result")
+
+
+def test_unrelated_prompts_miss():
+    cache = SemanticCache(threshold=0.85)
+    cache.store("ideation", "AI recipe app", ["idea"])
+    assert cache.lookup("ideation", "blockchain voting platform") is None
+    stats = cache.stats()["ideation"]
+    assert stats["misses"] == 1 and stats["hits"] == 0
+    print("✅ Unrelated prompts miss")
+
+
+def test_product_words_keep_projects_apart():
+    cache = SemanticCache(threshold=0.85)
+    cache.store("research", "code generator", ["generator research"])
+    assert cache.lookup("research", "code review tool") is None
+    cache.store("research", "code review tool", ["review research"])
+    assert cache.lookup("research", "code generator") == ["generator research"]
+    assert cache.lookup("research", "AI recipe generator") is None
+    print("✅ \"code generator\" and \"code review tool\" don't hit each other")
+
+
+def test_namespaces_are_separate():
+    cache = SemanticCache()
+    cache.store("ideation", "AI recipe app", ["idea"])
+    assert cache.lookup("research", "AI recipe app") is None
+    print("✅ Namespaces don't share entries")
+
+
+def test_lru_eviction():
+    cache = SemanticCache(capacity=2)
+    cache.store("ideation", "recipe planner", 1)
+    time.sleep(0.01)
+    cache.store("ideation", "fitness tracker", 2)
+    time.sleep(0.01)
+    assert cache.lookup("ideation", "recipe planner") == 1  # now the most recently used
+    cache.store("ideation", "weather dashboard", 3)
+    assert cache.lookup("ideation", "fitness tracker") is None
+    assert cache.lookup("ideation", "recipe planner") == 1
+    assert cache.stats()["ideation"]["evictions"] == 1
+    print("✅ The least recently used entry is evicted at capacity")
+
+
+def test_ttl_expiry():
+    cache = SemanticCache(ttl_seconds=0.05)
+    cache.store("ideation", "AI recipe app", ["idea"])
+    time.sleep(0.1)
+    assert cache.lookup("ideation", "AI recipe app") is None
+    assert cache.stats()["ideation"]["expired"] == 1
+    print("✅ Entries expire after the TTL")
+
+
+def test_disabled_cache():
+    cache = SemanticCache(enabled=False)
+    cache.store("ideation", "AI recipe app", ["idea"])
+    assert cache.lookup("ideation", "AI recipe app") is None
+    print("✅ A disabled cache never hits")
+
+
+def test_embedding_is_normalized():
+    vector = embed("AI recipe generator")
+    assert abs(float(vector @ vector) - 1.0) < 1e-5
+    assert not embed("for the").any()  # stopwords only
+    print("✅ Embeddings are unit vectors; stopword-only prompts embed to zero")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the semantic cache...")
+    print("=" * 50)
+    test_near_duplicates_hit()
+    test_unrelated_prompts_miss()
+    test_product_words_keep_projects_apart()
+    test_namespaces_are_separate()
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_disabled_cache()
+    test_embedding_is_normalized()
+    print("=" * 50)
+    print("🎉 All semantic cache tests passed!")
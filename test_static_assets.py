@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test precompressed static frontend serving (static_assets.py).
+
+A small fake `next export` tree is written to a temporary directory and
+served through a throwaway Flask app; no build or network needed.
+
+    python3 test_static_assets.py
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+
+sys.path.append('.')
+
+from flask import Flask, request  # noqa: E402
+
+import static_assets  # noqa: E402
+from static_assets import IMMUTABLE, REVALIDATE, StaticAssetIndex, precompress  # noqa: E402
+
+CHUNK = b"export const answer = () => 42;\n" * 200  # compressible, above MIN_COMPRESS_BYTES
+FILES = {
+    "index.html": b"<html><body>shell</body></html>",
+    "about.html": b"<html><body>about</body></html>",
+    "docs/index.html": b"<html><body>docs</body></html>",
+    "_next/static/chunks/app-1a2b.js": CHUNK,
+    "_next/static/chunks/app-1a2b.js.br": b"pretend-brotli",  # precompressed ahead of time
+    "logo.png": os.urandom(2048),
+    "big.json": b'{"rows": [' + b'"row",' * 400 + b'"end"]}',
+}
+
+
+def _build(tmp):
+    for rel, content in FILES.items():
+        path = os.path.join(tmp, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+
+_tmp = tempfile.mkdtemp(prefix="static-test-")
+_build(_tmp)
+_max_memory = static_assets.MAX_MEMORY_BYTES
+static_assets.MAX_MEMORY_BYTES = 2000  # big.json is then streamed from disk
+index = StaticAssetIndex(_tmp)
+static_assets.MAX_MEMORY_BYTES = _max_memory
+
+app = Flask(__name__)
+
+
+@app.route("/", defaults={"path": ""})
+@app.route("/<path:path>")
+def serve(path):
+    return index.serve(path, request)
+
+
+client = app.test_client()
+JS = "/_next/static/chunks/app-1a2b.js"
+
+
+def test_encoding_negotiation():
+    br = client.get(JS, headers={"Accept-Encoding": "gzip, br"})
+    assert br.headers["Content-Encoding"] == "br" and br.get_data() == b"pretend-brotli"
+    gz = client.get(JS, headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["Content-Encoding"] == "gzip" and gzip.decompress(gz.get_data()) == CHUNK
+    plain = client.get(JS)
+    assert "Content-Encoding" not in plain.headers and plain.get_data() == CHUNK
+    assert br.headers["Vary"] == gz.headers["Vary"] == "Accept-Encoding"
+    assert len({br.headers["ETag"], gz.headers["ETag"], plain.headers["ETag"]}) == 3
+    print("✅ br, then gzip, then identity by Accept-Encoding, each with its own ETag")
+
+
+def test_conditional_requests():
+    gz = client.get(JS, headers={"Accept-Encoding": "gzip"})
+    same = client.get(JS, headers={"Accept-Encoding": "gzip", "If-None-Match": gz.headers["ETag"]})
+    assert same.status_code == 304 and not same.get_data()
+    assert same.headers["ETag"] == gz.headers["ETag"] and same.headers["Cache-Control"] == IMMUTABLE
+    # A cached gzip ETag doesn't validate the identity body
+    other = client.get(JS, headers={"If-None-Match": gz.headers["ETag"]})
+    assert other.status_code == 200 and other.get_data() == CHUNK
+    print("✅ If-None-Match gives 304 only for the same encoding")
+
+
+def test_cache_control_and_routes():
+    assert client.get("/").headers["Cache-Control"] == REVALIDATE
+    assert client.get("/about").get_data() == FILES["about.html"]
+    assert client.get("/docs/").get_data() == FILES["docs/index.html"]
+    assert client.get("/dashboard/settings").get_data() == FILES["index.html"]  # SPA fallback
+    assert client.get("/missing.js").status_code == 404
+    logo = client.get("/logo.png", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in logo.headers and logo.get_data() == FILES["logo.png"]
+    print("✅ Clean URLs and SPA fallback resolve; hashed assets are immutable, HTML revalidates")
+
+
+def test_large_files_stream_from_disk():
+    assert index.assets["big.json"].data is None
+    response = client.get("/big.json")
+    assert response.get_data() == FILES["big.json"]
+    assert response.content_length == len(FILES["big.json"])
+    print("✅ Files above STATIC_MAX_MEMORY_BYTES are streamed from disk")
+
+
+def test_precompress_writes_variants():
+    tmp = tempfile.mkdtemp(prefix="static-precompress-")
+    _build(tmp)
+    assert precompress(tmp) >= 2  # the chunk and big.json; html is too small, png not compressible
+    with open(os.path.join(tmp, "big.json.gz"), "rb") as f:
+        assert gzip.decompress(f.read()) == FILES["big.json"]
+    assert not os.path.exists(os.path.join(tmp, "logo.png.gz"))
+    print("✅ precompress writes .gz files next to compressible assets")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing static asset serving...")
+    print("=" * 50)
+    test_encoding_negotiation()
+    test_conditional_requests()
+    test_cache_control_and_routes()
+    test_large_files_stream_from_disk()
+    test_precompress_writes_variants()
+    print("=" * 50)
+    print("🎉 All static asset tests passed!")
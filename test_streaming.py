@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test token streaming through the LangGraph app (stream_mode="messages", main.stream_tokens).
+
+The ideation node runs the real pipeline stage with a FakeListChatModel in
+place of Gemini; the other stages are stubs. No API calls are made.
+
+    python3 test_streaming.py
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import redirect_stdout
+
+sys.path.append('.')
+_tmp = tempfile.mkdtemp(prefix="streaming-test-")
+os.environ.setdefault("ARTIFACT_DIR", _tmp)
+os.environ.setdefault("CHECKPOINT_DB", os.path.join(_tmp, "checkpoints.sqlite"))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from langchain_core.language_models import FakeListChatModel  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+import main  # noqa: E402
+import simple_agents  # noqa: E402
+from agents import AgentName  # noqa: E402
+from graph import _make_worker_node, build_linear_workflow  # noqa: E402
+from pipeline import langgraph_agent  # noqa: E402
+from routing import PIPELINE_ORDER  # noqa: E402
+from state import get_initial_state  # noqa: E402
+
+IDEATION = AgentName.IDEATION.value
+IDEAS = [{"title": f"Kite {i}", "pitch": f"A wind-measuring kite, take {i}", "tech": "ESP32"} for i in range(2)]
+RESPONSE = json.dumps(IDEAS)
+
+
+def _stub(stage):
+    return lambda state: {"messages": [{"role": "assistant", "content": f'{{"stage": "{stage}"}}'}]}
+
+
+def _app():
+    workers = {stage: _make_worker_node(stage, _stub(stage)) for stage in PIPELINE_ORDER[:-1]}
+    workers[IDEATION] = _make_worker_node(IDEATION, langgraph_agent("ideation"))
+    return build_linear_workflow(workers).compile(checkpointer=MemorySaver())
+
+
+def _run(func):
+    """Run with the fake model in place of Gemini (a new idea each time, so the semantic cache misses)."""
+    original, simple_agents.llm = simple_agents.llm, FakeListChatModel(responses=[RESPONSE])
+    try:
+        return func(get_initial_state(f"a kite that measures wind for sailors {uuid.uuid4()}"),
+                    {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": 100})
+    finally:
+        simple_agents.llm = original
+
+
+def test_tokens_reach_the_graph_stream():
+    app = _app()
+    events = _run(lambda state, config: list(app.stream(state, config=config, stream_mode=["messages", "updates"])))
+    tokens = []
+    for mode, payload in events:
+        if mode == "messages" and payload[0].content:
+            tokens.append((payload[0].content, payload[1]["langgraph_node"]))
+    assert len(tokens) > 10 and {node for _, node in tokens} == {IDEATION}
+    assert "".join(text for text, _ in tokens) == RESPONSE
+    modes = [(mode, next(iter(payload)) if mode == "updates" else None) for mode, payload in events]
+    first_token = modes.index(("messages", None))
+    assert first_token < modes.index(("updates", IDEATION))  # tokens arrive before the node finishes
+    print(f"✅ {len(tokens)} token chunks from the ideation stage's thread reach stream_mode='messages'")
+
+
+def test_cli_prints_tokens_as_they_come():
+    main_app, main.app = main.app, _app()
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            _run(main.stream_tokens)
+    finally:
+        main.app = main_app
+    printed = out.getvalue()
+    assert f"💬 [{IDEATION}] {RESPONSE}" in printed
+    assert f"✅ [{IDEATION}] done" in printed
+    assert f"[{AgentName.CODING.value}]: " in printed  # stages without an LLM call print their update
+    print("✅ The CLI prints streamed tokens labelled by node, then the other nodes' updates")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing token streaming...")
+    print("=" * 50)
+    test_tokens_reach_the_graph_stream()
+    test_cli_prints_tokens_as_they_come()
+    print("=" * 50)
+    print("🎉 All streaming tests passed!")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test the parallel tool-calling loop (tool_executor.py).
+
+The model is a scripted stub that asks for tool calls, so no API calls are made.
+
+    python3 test_tool_executor.py
+"""
+
+import sys
+import time
+
+sys.path.append('.')
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+from tool_executor import FINAL_ANSWER_PROMPT, ToolExecutor, ToolMetrics, _as_plain_history  # noqa: E402
+
+DELAY = 0.2
+
+
+@tool
+def search(query: str) -> str:
+    """Search the web."""
+    time.sleep(DELAY)
+    return f"results for {query}"
+
+
+@tool
+def hang(query: str) -> str:
+    """Never answers in time."""
+    time.sleep(2)
+    return "late"
+
+
+@tool
+def broken(query: str) -> str:
+    """Always fails."""
+    raise RuntimeError("boom")
+
+
+class ScriptedModel:
+    """Answers with the scripted messages in order and keeps what it was sent."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.received = []
+        self.bound_tools = None
+
+    def bind_tools(self, tools):
+        bound = ScriptedModel()
+        bound.responses, bound.received, bound.bound_tools = self.responses, self.received, tools
+        return bound
+
+    def invoke(self, messages):
+        self.received.append((self.bound_tools is not None, list(messages)))
+        return self.responses.pop(0)
+
+
+def _calls(*specs):
+    return AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"query": query}, "id": f"call-{i}"} for i, (name, query) in enumerate(specs)
+    ])
+
+
+def test_tool_calls_run_in_parallel():
+    llm = ScriptedModel(_calls(("search", "a"), ("search", "b"), ("search", "c")), AIMessage(content="done"))
+    metrics = ToolMetrics()
+    started = time.perf_counter()
+    answer = ToolExecutor(llm, [search], metrics=metrics).invoke([HumanMessage(content="research")])
+    elapsed = time.perf_counter() - started
+    assert answer.content == "done"
+    assert elapsed < 2 * DELAY, f"{elapsed:.2f}s: tool calls ran one after another"
+    results = llm.received[1][1][2:]
+    assert [(m.tool_call_id, m.content) for m in results] == [
+        ("call-0", "results for a"), ("call-1", "results for b"), ("call-2", "results for c")]
+    snapshot = metrics.snapshot()
+    assert snapshot["rounds"] == 1 and snapshot["avg_calls_per_round"] == 3.0
+    assert snapshot["tools"]["search"]["count"] == 3
+    print(f"✅ 3 tool calls of {DELAY * 1000:.0f}ms each took {elapsed * 1000:.0f}ms in one round")
+
+
+def test_errors_and_timeouts_become_results():
+    metrics = ToolMetrics()
+    executor = ToolExecutor(ScriptedModel(), [search, hang, broken], timeouts={"hang": 0.3}, metrics=metrics)
+    started = time.perf_counter()
+    results = executor.run_tools([
+        {"name": "hang", "args": {"query": "x"}, "id": "1"},
+        {"name": "broken", "args": {"query": "x"}, "id": "2"},
+        {"name": "missing", "args": {}, "id": "3"},
+        {"name": "search", "args": {"query": "x"}, "id": "4"},
+    ])
+    assert time.perf_counter() - started < 1.0
+    assert [m.content for m in results] == [
+        "Error: hang timed out after 0.3s", "Error: boom", "Error: unknown tool 'missing'", "results for x"]
+    tools = metrics.snapshot()["tools"]
+    assert tools["hang"]["timeouts"] == 1 and tools["broken"]["errors"] == 1 and tools["search"]["errors"] == 0
+    print("✅ Timeouts, tool errors and unknown tools come back as tool results")
+
+
+def test_out_of_rounds_answers_without_tools():
+    llm = ScriptedModel(_calls(("search", "a")), _calls(("search", "b")), AIMessage(content="final"))
+    answer = ToolExecutor(llm, [search], max_iterations=2).invoke([HumanMessage(content="research")])
+    assert answer.content == "final"
+    assert [bound for bound, _ in llm.received] == [True, True, False]
+    final_history = llm.received[-1][1]
+    assert not any(isinstance(m, ToolMessage) or getattr(m, "tool_calls", None) for m in final_history)
+    print("✅ After max_iterations the unbound model answers from a plain-text history")
+
+
+def test_plain_history():
+    history = _as_plain_history([
+        HumanMessage(content="research"),
+        _calls(("search", "a"), ("search", "b")),
+        ToolMessage(content="A", tool_call_id="call-0", name="search"),
+        ToolMessage(content="B", tool_call_id="call-1", name="search"),
+    ])
+    assert [type(m).__name__ for m in history] == ["HumanMessage", "AIMessage", "HumanMessage"]
+    assert history[1].content == 'Calling tools: search({"query": "a"}); search({"query": "b"})'
+    assert not history[1].tool_calls
+    assert history[2].content == f"Result of search:\nA\n\nResult of search:\nB\n\n{FINAL_ANSWER_PROMPT}"
+    print("✅ Tool calls and their results are rewritten as text, results grouped in one message")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the tool-calling loop...")
+    print("=" * 50)
+    test_tool_calls_run_in_parallel()
+    test_errors_and_timeouts_become_results()
+    test_out_of_rounds_answers_without_tools()
+    test_plain_history()
+    print("=" * 50)
+    print("🎉 All tool executor tests passed!")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test grounded web research (web_research.py) against a local Tavily stub.
+
+No network or API key needed: a small http.server answers /search and
+records every query; the disk cache goes to a temporary directory.
+
+    python3 test_web_research.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+
+
+class TavilyStub(BaseHTTPRequestHandler):
+    """Two usable results per query, one URL shared by every query; 'paper' queries are slow, 'broken' ones fail."""
+
+    queries = []
+    delay = 0.2
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        query = body["query"]
+        TavilyStub.queries.append(query)
+        if "broken" in query:
+            status, payload = 400, {"detail": "bad query"}
+        else:
+            time.sleep(5 if "paper" in query else TavilyStub.delay)
+            slug = query.split()[-1]
+            status, payload = 200, {"results": [
+                {"title": f"About {slug}", "url": f"https://example.com/{slug}", "content": "word " * 100},
+                {"title": "Shared", "url": "https://www.Example.com/shared/", "content": "shared"},
+                {"title": "No URL", "content": "dropped"},
+            ]}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), TavilyStub)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["TAVILY_API_URL"] = f"http://127.0.0.1:{server.server_port}/search"
+os.environ["TAVILY_API_KEY"] = "test"
+
+import web_research  # noqa: E402
+from web_research import SearchCache, build_queries, gather, make_digest, research_digest  # noqa: E402
+
+web_research.TAVILY_URL = os.environ["TAVILY_API_URL"]  # in case another test imported it first
+web_research.search_cache = SearchCache(tempfile.mkdtemp(prefix="search-test-"))
+
+
+def test_fan_out_runs_in_parallel_and_dedups():
+    TavilyStub.queries.clear()
+    queries = [f"recipes {slug}" for slug in ("market", "libraries", "api")]
+    started = time.perf_counter()
+    gathered = gather(queries, timeout=3)
+    elapsed = time.perf_counter() - started
+    assert sorted(TavilyStub.queries) == sorted(queries)
+    assert elapsed < 3 * TavilyStub.delay, f"{elapsed:.2f}s: queries ran one after another"
+    urls = [hit["url"] for hit in gathered["results"]]
+    assert urls == ["https://example.com/market", "https://www.Example.com/shared/",
+                    "https://example.com/libraries", "https://example.com/api"]  # query order, shared URL once
+    assert gathered["results"][0]["query"] == "recipes market" and not gathered["failed"]
+    print(f"✅ {len(queries)} queries in {elapsed * 1000:.0f}ms, results deduplicated by URL")
+
+
+def test_failed_and_slow_queries_are_reported():
+    gathered = gather(["recipes broken", "recipes paper", "recipes market"], timeout=1)
+    failed = {f["query"]: f["error"] for f in gathered["failed"]}
+    assert failed["recipes paper"] == "timeout" and "400" in failed["recipes broken"]
+    assert [hit["url"] for hit in gathered["results"]][0] == "https://example.com/market"
+    print("✅ Failed and timed-out queries are reported; the rest of the fan-out is kept")
+
+
+def test_cache_serves_repeats():
+    cache = web_research.search_cache
+    TavilyStub.queries.clear()
+    hits = cache.stats()["hits"]
+    gather(["recipes market", "RECIPES   market"], timeout=3)
+    assert TavilyStub.queries == [] and cache.stats()["hits"] == hits + 2  # cached above, key is normalized
+    print("✅ Repeated queries are answered from the disk cache")
+
+
+def test_cache_ttl_and_prune():
+    root = tempfile.mkdtemp(prefix="search-ttl-")
+    cache = SearchCache(root, ttl_seconds=60)
+    cache.put("old", 5, [{"url": "u"}])
+    assert cache.get("old", 5) == [{"url": "u"}] and cache.get("old", 3) is None
+    old_path = cache._path("old", 5)
+    with open(old_path, encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["stored_at"] -= 120
+    with open(old_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.utime(old_path, (time.time() - 120, time.time() - 120))
+    assert cache.get("old", 5) is None  # expired
+
+    cache.put("new", 5, [])
+    assert os.path.exists(old_path)  # pruned at most once per interval, and put("old") just did
+    restarted = SearchCache(root, ttl_seconds=60)
+    restarted.put("new", 5, [])  # its first write prunes
+    assert not os.path.exists(old_path) and restarted.stats()["pruned"] == 1
+    assert os.path.exists(cache._path("new", 5))
+    assert SearchCache(root, ttl_seconds=0).get("new", 5) is None  # TTL 0 disables the cache
+    print("✅ Entries expire after the TTL and expired files are deleted on write")
+
+
+def test_digest():
+    gathered = gather(build_queries("AI   recipe app")[:3], timeout=3)
+    assert gathered["queries"][0] == "AI recipe app market size competitors"
+    digest = make_digest(gathered["results"], max_results=2)
+    lines = digest.splitlines()
+    assert len(lines) == 4 and lines[0].startswith("[1] About competitors — https://example.com/competitors")
+    assert lines[1].endswith("…") and len(lines[1]) < web_research.DIGEST_SNIPPET_CHARS + 10
+    os.environ.pop("TAVILY_API_KEY")
+    try:
+        assert research_digest("AI recipe app") == ""  # search unavailable
+    finally:
+        os.environ["TAVILY_API_KEY"] = "test"
+    print("✅ The digest is a short numbered source list; no key means no search")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing web research...")
+    print("=" * 50)
+    test_fan_out_runs_in_parallel_and_dedups()
+    test_failed_and_slow_queries_are_reported()
+    test_cache_serves_repeats()
+    test_cache_ttl_and_prune()
+    test_digest()
+    print("=" * 50)
+    print("🎉 All web research tests passed!")
@@ -0,0 +1,172 @@
+"""
+Tool-calling loop for worker agents.
+
+Each round the model may request several tool calls at once (a handful of
+searches, one commit per file). They are independent by construction, so
+they run concurrently. Each call has its own timeout, and the round takes as
+long as its slowest call instead of the sum. The loop stops when the model
+answers without tool calls, or after `max_iterations` rounds. At that point
+the model is asked to answer with what it has, from a history where the tool
+calls and results are plain text (the model is called without tools then).
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from circuit_breakers import gemini_breaker
+
+MAX_TOOL_ITERATIONS = int(os.getenv("AGENT_MAX_TOOL_ITERATIONS", "4"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "20"))
+
+# Timed-out tool calls keep their thread until they return, so leave headroom
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TOOL_THREADS", "16")), thread_name_prefix="tool")
+
+
+# =====================================================================
+# === Metrics ===
+# =====================================================================
+
+class ToolMetrics:
+    """Per-tool call counts, failures and latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_tool: dict[str, dict] = {}
+        self.rounds = 0
+        self.parallel_calls = 0
+
+    def record(self, tool: str, latency_ms: float, outcome: str) -> None:
+        with self._lock:
+            stats = self._by_tool.setdefault(
+                tool, {"count": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["count"] += 1
+            if outcome == "error":
+                stats["errors"] += 1
+            elif outcome == "timeout":
+                stats["timeouts"] += 1
+            stats["total_ms"] += latency_ms
+            stats["max_ms"] = max(stats["max_ms"], latency_ms)
+
+    def record_round(self, calls: int) -> None:
+        with self._lock:
+            self.rounds += 1
+            self.parallel_calls += calls
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "avg_calls_per_round": round(self.parallel_calls / self.rounds, 2) if self.rounds else 0.0,
+                "tools": {
+                    tool: {
+                        "count": s["count"],
+                        "errors": s["errors"],
+                        "timeouts": s["timeouts"],
+                        "avg_ms": round(s["total_ms"] / s["count"], 1) if s["count"] else 0.0,
+                        "max_ms": round(s["max_ms"], 1),
+                    }
+                    for tool, s in self._by_tool.items()
+                },
+            }
+
+
+tool_metrics = ToolMetrics()
+
+
+# =====================================================================
+# === Executor ===
+# =====================================================================
+
+FINAL_ANSWER_PROMPT = "No more tool calls are available. Answer now, using the tool results above."
+
+
+def _as_plain_history(messages: list) -> list:
+    """Messages for a model call without tools bound: tool calls and their results become text."""
+    plain, results = [], []
+
+    def flush():
+        if results:
+            plain.append(HumanMessage(content="\n\n".join(results)))
+            results.clear()
+
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            results.append(f"Result of {message.name}:\n{message.content}")
+            continue
+        flush()
+        if isinstance(message, AIMessage) and message.tool_calls:
+            text = message.content if isinstance(message.content, str) else ""
+            calls = "; ".join(f"{c['name']}({json.dumps(c.get('args', {}))})" for c in message.tool_calls)
+            plain.append(AIMessage(content=f"{text}\nCalling tools: {calls}".strip()))
+        else:
+            plain.append(message)
+    results.append(FINAL_ANSWER_PROMPT)
+    flush()
+    return plain
+
+
+class ToolExecutor:
+    """Runs a model with tools bound until it stops asking for tool calls."""
+
+    def __init__(self, llm, tools: list, max_iterations: int = MAX_TOOL_ITERATIONS,
+                 timeout: float = TOOL_TIMEOUT, timeouts: dict = None, metrics: ToolMetrics = tool_metrics):
+        self.llm = llm
+        self.tools = {t.name: t for t in tools}
+        self.bound = llm.bind_tools(tools) if tools else llm
+        self.max_iterations = max_iterations
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.metrics = metrics
+
+    def _call(self, call: dict):
+        """Invoke one tool; returns (output, outcome, latency in ms)."""
+        started = time.perf_counter()
+        try:
+            tool = self.tools.get(call["name"])
+            if tool is None:
+                raise ValueError(f"unknown tool {call['name']!r}")
+            content, outcome = str(tool.invoke(call.get("args", {}))), "ok"
+        except Exception as e:
+            content, outcome = f"Error: {e}", "error"
+        return content, outcome, (time.perf_counter() - started) * 1000
+
+    def run_tools(self, tool_calls: list) -> list[ToolMessage]:
+        """Execute one round of tool calls concurrently; errors become tool results."""
+        started = time.perf_counter()
+        futures = [(call, _executor.submit(self._call, call)) for call in tool_calls]
+
+        results = []
+        for call, future in futures:
+            # All calls were submitted at `started`; each deadline is relative to that
+            limit = self.timeouts.get(call["name"], self.timeout)
+            try:
+                content, outcome, latency_ms = future.result(timeout=max(0.0, started + limit - time.perf_counter()))
+            except FutureTimeout:
+                future.cancel()
+                content, outcome, latency_ms = f"Error: {call['name']} timed out after {limit:g}s", "timeout", limit * 1000
+            self.metrics.record(call["name"], latency_ms, outcome)
+            results.append(ToolMessage(content=content, tool_call_id=call["id"], name=call["name"]))
+
+        self.metrics.record_round(len(tool_calls))
+        return results
+
+    def invoke(self, messages: list):
+        """Run the loop and return the final AI message."""
+        messages = list(messages)
+        for _ in range(self.max_iterations):
+            with gemini_breaker.guard():
+                response = self.bound.invoke(messages)
+            if not getattr(response, "tool_calls", None):
+                return response
+            messages.append(response)
+            messages.extend(self.run_tools(response.tool_calls))
+        # Out of rounds: answer from the tool results gathered so far. The unbound model
+        # would reject function calls/results for tools it wasn't given, so pass them as text
+        with gemini_breaker.guard():
+            return self.llm.invoke(_as_plain_history(messages))
@@ -0,0 +1,231 @@
+"""
+Grounded web research: one parallel Tavily fan-out per idea.
+
+The research stage used to be pure model output; the search tool was listed
+but never called. Here a handful of queries derived from the idea run
+concurrently, results are deduplicated by URL, and a compact digest (title,
+URL, short snippet) is handed to the research prompt. Search responses are
+cached on disk with a TTL, so repeated or restarted runs don't pay for the
+same queries twice.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+import xxhash
+
+from circuit_breakers import tavily_breaker
+
+TAVILY_URL = os.getenv("TAVILY_API_URL", "https://api.tavily.com/search")
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "5"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "8"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+SEARCH_CACHE_DIR = os.getenv(
+    "SEARCH_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".search_cache"),
+)
+
+# Digest limits: enough for the model to cite sources, small enough to keep the prompt cheap
+DIGEST_MAX_RESULTS = int(os.getenv("SEARCH_DIGEST_RESULTS", "12"))
+DIGEST_SNIPPET_CHARS = 240
+
+# One query per section of the research output
+QUERY_TEMPLATES = (
+    "{idea} market size competitors",
+    "{idea} open source libraries",
+    "{idea} public API",
+    "{idea} research paper",
+)
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SEARCH_THREADS", "8")), thread_name_prefix="search")
+_session = requests.Session()
+
+
+# =====================================================================
+# === Disk cache ===
+# =====================================================================
+
+class SearchCache:
+    """Query -> results cache, one JSON file per query, expired by TTL.
+
+    Expired files are deleted on write, at most once per PRUNE_INTERVAL (or TTL if shorter).
+    """
+
+    PRUNE_INTERVAL = 3600.0
+
+    def __init__(self, root: str = None, ttl_seconds: float = SEARCH_CACHE_TTL):
+        self.root = root
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+
+    def _path(self, query: str, max_results: int) -> str:
+        key = xxhash.xxh3_64_hexdigest(f"{max_results}:{' '.join(query.lower().split())}".encode("utf-8"))
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, query: str, max_results: int):
+        if not self.root or self.ttl <= 0:
+            return None
+        try:
+            with open(self._path(query, max_results), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            entry = None
+        fresh = entry is not None and time.time() - entry.get("stored_at", 0) < self.ttl
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry["results"] if fresh else None
+
+    def put(self, query: str, max_results: int, results: list) -> None:
+        if not self.root or self.ttl <= 0:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(query, max_results)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"query": query, "stored_at": time.time(), "results": results}, f)
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Delete cache files older than the TTL (their mtime is their stored_at)."""
+        now = time.time()
+        with self._lock:
+            if now - self._pruned_at < min(self.PRUNE_INTERVAL, self.ttl):
+                return
+            self._pruned_at = now
+        removed = 0
+        for entry in os.scandir(self.root):
+            try:
+                if entry.name.endswith(".json") and now - entry.stat().st_mtime >= self.ttl:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:  # pruned concurrently (another worker process)
+                pass
+        with self._lock:
+            self.pruned += removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "pruned": self.pruned,
+                "ttl_seconds": self.ttl,
+            }
+
+
+search_cache = SearchCache(SEARCH_CACHE_DIR)
+
+
+# =====================================================================
+# === Search ===
+# =====================================================================
+
+def tavily_search(query: str, max_results: int = SEARCH_MAX_RESULTS) -> list:
+    """Run one Tavily query (disk-cached). Returns [{title, url, content}]."""
+    cached = search_cache.get(query, max_results)
+    if cached is not None:
+        return cached
+
+    api_key = os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        raise ValueError("TAVILY_API_KEY environment variable is required")
+    with tavily_breaker.guard():
+        response = _session.post(
+            TAVILY_URL,
+            json={"api_key": api_key, "query": query, "max_results": max_results},
+            timeout=SEARCH_TIMEOUT,
+        )
+        response.raise_for_status()
+    results = [
+        {"title": r.get("title", ""), "url": r.get("url", ""), "content": r.get("content", "")}
+        for r in response.json().get("results", [])
+        if r.get("url")
+    ]
+    search_cache.put(query, max_results, results)
+    return results
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower().removeprefix("www."), path, parts.query, ""))
+
+
+def build_queries(idea: str) -> list[str]:
+    idea = " ".join(idea.split())
+    return [template.format(idea=idea) for template in QUERY_TEMPLATES]
+
+
+def gather(queries: list[str], max_results: int = SEARCH_MAX_RESULTS, timeout: float = SEARCH_TIMEOUT) -> dict:
+    """Run all queries concurrently and merge their results, deduplicated by URL.
+
+    Queries that fail or miss the shared timeout are reported in `failed`;
+    the rest of the fan-out is still used.
+    """
+    started = time.perf_counter()
+    futures = {_executor.submit(tavily_search, q, max_results): q for q in queries}
+    done, _pending = wait(futures, timeout=timeout)
+
+    seen = set()
+    results = []
+    failed = []
+    # Keep query order so the digest interleaves sections predictably
+    for future, query in futures.items():
+        if future not in done:
+            future.cancel()
+            failed.append({"query": query, "error": "timeout"})
+            continue
+        try:
+            hits = future.result()
+        except Exception as e:
+            failed.append({"query": query, "error": str(e)})
+            continue
+        for hit in hits:
+            url = _normalize_url(hit["url"])
+            if url in seen:
+                continue
+            seen.add(url)
+            results.append({**hit, "query": query})
+
+    return {
+        "queries": queries,
+        "results": results,
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def make_digest(results: list, max_results: int = DIGEST_MAX_RESULTS) -> str:
+    """Compact, numbered source list for the research prompt."""
+    lines = []
+    for i, hit in enumerate(results[:max_results], 1):
+        snippet = " ".join(hit.get("content", "").split())
+        if len(snippet) > DIGEST_SNIPPET_CHARS:
+            snippet = snippet[:DIGEST_SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+        lines.append(f"[{i}] {hit.get('title') or hit['url']} — {hit['url']}\n    {snippet}")
+    return "\n".join(lines)
+
+
+def research_digest(topic: str) -> str:
+    """Search for the topic (a project title, not a whole prompt) and return a digest, or "" when search is unavailable."""
+    if not os.getenv("TAVILY_API_KEY"):
+        return ""
+    gathered = gather(build_queries(topic))
+    print(f"🔎 Web research: {len(gathered['results'])} sources from {len(gathered['queries'])} queries "
+          f"in {gathered['elapsed_ms']}ms ({len(gathered['failed'])} failed)")
+    return make_digest(gathered["results"])
@@ -0,0 +1,7 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from backend_api import app  # noqa: F401